@@ -0,0 +1,112 @@
+"""
+Generator configuration of the AAU5636m antenna model, shared by AAU5636m.ipynb and the batch runner:
+
+    python -m common.batch_generator antenna_scripts/configs/AAU5636m.py -o antenna_scripts/output
+"""
+import re
+
+from common.consts import PATTERN_FILE_FORMAT__MSI, PATTERN_TYPE__BROADCAST, PATTERN_TYPE__BEAMSWITCHING_SERVICE
+from common.re_filter import ReFilter
+from common.pattern_name_param_extractor import PatternNameParamExtractor
+from common.pattern_payload_param_extractor import PatternPayloadParamExtractor
+from common.pattern_name_param_selector import PatternNameParamSelector
+
+params = {
+    # General parameters
+    'src_folder': r'D:\TP\mMIMO Antennas\Huawei\AAU5636m_MSI',
+    'pattern_file_format': PATTERN_FILE_FORMAT__MSI,
+    'version': '7.4',
+    'filename': 'AAU5636m.pafx',
+    'name': 'AAU5636m',
+    'type': 'Cellular',
+    'comment': 'AAU5636m',
+    'manufacturer': 'Huawei',
+    'cost': 0,
+    'cost_unit': 'USD',
+    'length_cm': 145,
+    'width_cm': 40,
+    'depth_cm': 18,
+    'weight_kg': 30,
+    'wind_load_factor': 900,
+    'supp_elec_tilt': True,
+    'supp_elec_azimuth': False,
+    'supp_elec_beamwidth': False,
+    'cont_adj_elec_tilt': False,
+
+    # Source file filter
+    'src_file_re_filter': ReFilter(
+        allow=[r'.*\.msi$'],
+        deny=['.*CSI.*'],
+    ),
+
+    # Parameter extractors
+    'pattern_name_extractor': PatternNameParamExtractor(
+        path_part='basename',
+        extract_re=r'(?P<cg>.+)\..{3}$',
+    ),
+    'scenario_extractor': PatternNameParamExtractor(
+        extract_re=r'.*SSB\\(?P<cg>.+?Scenario\d+).*',
+        post_capture_proc=lambda r: re.sub(r'\\AAU5635M\_.+?SSB\_', '-', r),
+    ),
+    'v_port_name_extractor': PatternNameParamExtractor(
+        extract_re=r'.*SSB\\(?P<cg>.+?Scenario\d+).*',
+        post_capture_proc=lambda r: re.sub(r'\\AAU5635M\_.+?SSB\_', '-', r),
+    ),
+    'pattern_type_extractor': PatternNameParamExtractor(
+        path_part='basename',
+        pre_capture_proc=lambda r: r.lower(),
+        post_capture_proc=lambda r: PATTERN_TYPE__BROADCAST if 'ssb' in r else PATTERN_TYPE__BEAMSWITCHING_SERVICE,
+    ),
+    'center_freq_extractor': PatternPayloadParamExtractor(
+        extract_fn=lambda payload: int(payload.header['FREQUENCY'])
+    ),
+    'min_freq_extractor': PatternPayloadParamExtractor(
+        extract_fn=lambda payload: int(payload.header['FREQUENCY']) - 100
+    ),
+    'max_freq_extractor': PatternPayloadParamExtractor(
+        extract_fn=lambda payload: int(payload.header['FREQUENCY']) + 100
+    ),
+    'electrical_tilt_extractor': PatternNameParamExtractor(
+        path_part='basename',
+        extract_re=r'.*\_(?P<cg>-?\d+)T\_.*',
+        post_capture_proc=lambda r: int(r),
+    ),
+    'polarization_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 'Vertical',
+    ),
+    'polarization_type_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: None,
+    ),
+    'v_port_number_of_ports_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 1,
+    ),
+    'horiz_number_of_elements_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 16,
+    ),
+    'horiz_sep_dist_cm_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 0.01,
+    ),
+    'vert_number_of_elements_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 24,
+    ),
+    'vert_sep_dist_cm_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 0.01,
+    ),
+    'beamswitching_service_name_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 'PDSCH' if 'Traffic' in r else 'None',
+    ),
+    'beamswitching_horiz_angle_extractor': PatternPayloadParamExtractor(
+        extract_fn=lambda payload: payload.horiz_pap_pattern.get_boresight_deg(),
+    ),
+    'beamswitching_vert_angle_extractor': PatternPayloadParamExtractor(
+        extract_fn=lambda payload: payload.vert_pap_pattern.get_boresight_deg(),
+    ),
+
+    # Parameter selectors
+    'scenario_selector': PatternNameParamSelector(
+        select_re=lambda pattern_name: '.*' if '_Traffic' in pattern_name else None
+    ),
+    'v_port_name_selector': PatternNameParamSelector(
+        select_re=lambda pattern_name: '.*' if '_Traffic' in pattern_name else None
+    ),
+}
@@ -0,0 +1,114 @@
+"""
+Generator configuration of the AQQA_32T32R antenna model, shared by AQQA_32T32R.ipynb and the batch runner:
+
+    python -m common.batch_generator antenna_scripts/configs/AQQA_32T32R.py -o antenna_scripts/output
+"""
+import re
+
+from common.consts import PATTERN_FILE_FORMAT__MSI, PATTERN_TYPE__BROADCAST, PATTERN_TYPE__BEAMSWITCHING_SERVICE
+from common.re_filter import ReFilter
+from common.pattern_name_param_extractor import PatternNameParamExtractor
+from common.pattern_payload_param_extractor import PatternPayloadParamExtractor
+
+params = {
+    # General parameters
+    'src_folder': r'D:\Cell Planning\Antenna model processing\Library\mMIMO\mMIMO Antennas\Nokia\AQQA Full_eTilt_Offset',
+    'pattern_file_format': PATTERN_FILE_FORMAT__MSI,
+    'version': '7.4',
+    'filename': 'AQQA_32T32R.pafx',
+    'name': 'AQQA MIMO 32T32R 96 ELEM',
+    'type': 'Cellular',
+    'comment': 'AQQA MIMO 32T32R 96 ELEM',
+    'manufacturer': 'Nokia',
+    'cost': 0,
+    'cost_unit': 'USD',
+    'length_cm': 61,
+    'width_cm': 38,
+    'depth_cm': 10,
+    'weight_kg': 27,
+    'wind_load_factor': 587,
+    'supp_elec_tilt': True,
+    'supp_elec_azimuth': False,
+    'supp_elec_beamwidth': False,
+    'cont_adj_elec_tilt': False,
+    
+    # Source file filter
+    'src_file_re_filter': ReFilter(
+        allow=[
+            r'.*Optimized.*(SSB|RefBeam|SsbBeam).*\.msi$',
+        ],
+        deny=[
+            '.*TypeApproval.*',
+            '.*3GPP.*',
+            '.*PatternEnvelope.*',
+        ],
+    ),
+    
+    # Parameter extractors
+    'pattern_name_extractor': PatternNameParamExtractor(
+        path_part='basename',
+        extract_re=r'(?P<cg>.+)\..{3}$',
+    ),
+    'scenario_extractor': PatternNameParamExtractor(
+        extract_re=r'.*-(?P<cg>\d+deg.+)-(Envelope|RefBeam|SsbBeam).*',
+        post_capture_proc=lambda r: re.sub(r'-(p|n)\d+-a(p|n)\d+-', '-', r),
+    ),
+    'v_port_name_extractor': PatternNameParamExtractor(
+        extract_re=r'.*-(?P<cg>\d+deg.+)-(Envelope|RefBeam|SsbBeam).*',
+        post_capture_proc=lambda r: re.sub(r'-(p|n)\d+-a(p|n)\d+-', '-', r),
+    ),
+    'pattern_type_extractor': PatternNameParamExtractor(
+        path_part='basename',
+        pre_capture_proc=lambda r: r.lower(),
+        post_capture_proc=lambda r: PATTERN_TYPE__BROADCAST if 'envelope' in r else PATTERN_TYPE__BEAMSWITCHING_SERVICE,
+    ),
+    'center_freq_extractor': PatternPayloadParamExtractor(
+        extract_fn=lambda payload: int(float(payload.header['FREQUENCY']))
+    ),
+    'min_freq_extractor': PatternPayloadParamExtractor(
+        extract_fn=lambda payload: int(float(payload.header['FREQUENCY']) - 100)
+    ),
+    'max_freq_extractor': PatternPayloadParamExtractor(
+        extract_fn=lambda payload: int(float(payload.header['FREQUENCY']) + 100)
+    ),
+    'electrical_tilt_extractor': PatternNameParamExtractor(
+        path_part='basename',
+        pre_capture_proc=lambda r: r.lower(),
+        extract_re=r'.*-(?P<cg>(p|n)\d+)-.*',
+        post_capture_proc=lambda r: int(r.replace('p', '').replace('n', '-')),
+    ),
+    'polarization_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 'Vertical',
+    ),
+    'polarization_type_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: None,
+    ),
+    'v_port_number_of_ports_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 1,
+    ),
+    'horiz_number_of_elements_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 4,
+    ),
+    'horiz_sep_dist_cm_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 4.3,
+    ),
+    'vert_number_of_elements_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 4,
+    ),
+    'vert_sep_dist_cm_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 17.7,
+    ),
+    'beamswitching_service_name_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 'PDSCH' if 'RefBeam' in r else 'SSB' if 'SsbBeam' in r else 'None',
+    ),
+    'beamswitching_horiz_angle_extractor': PatternPayloadParamExtractor(
+        extract_fn=lambda payload: payload.horiz_pap_pattern.get_boresight_deg(),
+    ),
+    'beamswitching_vert_angle_extractor': PatternPayloadParamExtractor(
+        extract_fn=lambda payload: payload.vert_pap_pattern.get_boresight_deg(),
+    ),
+    
+    # Parameter selectors
+    'scenario_selector': None,
+    'v_port_name_selector': None,
+}
@@ -0,0 +1,123 @@
+"""
+Generator configuration of the HAAU5323 antenna model, shared by HAAU5323.ipynb and the batch runner:
+
+    python -m common.batch_generator antenna_scripts/configs/HAAU5323.py -o antenna_scripts/output
+"""
+from common.consts import PATTERN_FILE_FORMAT__MSI, PATTERN_TYPE__BROADCAST, PATTERN_TYPE__BEAMSWITCHING_SERVICE
+from common.re_filter import ReFilter
+from common.pattern_name_param_extractor import PatternNameParamExtractor
+from common.pattern_payload_param_extractor import PatternPayloadParamExtractor
+from common.pattern_name_param_selector import PatternNameParamSelector
+
+
+def scenario_v_port_selector(pattern_name: str) -> str | None:
+    if '_PDSCH' not in pattern_name:
+        return None
+    if '4TRX' in pattern_name:
+        return '.*4TRx.*'
+    if '8TRX' in pattern_name:
+        return '.*8TRx.*'
+    return None
+
+
+params = {
+    # General parameters
+    'src_folder': 'D:\\Cell Planning\\Antenna model processing\\Library\\mMIMO\\mMIMO Antennas\\Huawei\\HAAU5323 26G',
+    'pattern_file_format': PATTERN_FILE_FORMAT__MSI,
+    'version': '7.4',
+    'filename': 'HAAU5323.pafx',
+    'name': 'HAAU5323',
+    'type': 'Cellular',
+    'comment': 'mmWave HAAU5323 (26 GHz) Antenna 32.5@8T8R, 29.5@4T4R',
+    'manufacturer': 'Huawei',
+    'cost': 0,
+    'cost_unit': 'USD',
+    'length_cm': 58.5,
+    'width_cm': 30,
+    'depth_cm': 11,
+    'weight_kg': 16,
+    'wind_load_factor': 275,
+    'supp_elec_tilt': True,
+    'supp_elec_azimuth': False,
+    'supp_elec_beamwidth': False,
+    'cont_adj_elec_tilt': False,
+
+    # Source file filter
+    'src_file_re_filter': ReFilter(
+        allow=[r'.*\.(msi|MSI)$'],
+        deny=['.*CSI.*'],
+    ),
+
+    # Parameter extractors
+    'pattern_name_extractor': PatternNameParamExtractor(
+        path_part='basename',
+        extract_re=r'(?P<cg>.+)\..{3}$',
+    ),
+    'scenario_extractor': PatternNameParamExtractor(
+        path_part='basename',
+        extract_re=r'.*(?P<cg>\d+TRx\_SSB\_Pattern\d+)\..{3}$',
+        post_capture_proc=lambda r: r.replace('_SSB_', ' '),
+    ),
+    'v_port_name_extractor': PatternNameParamExtractor(
+        path_part='basename',
+        extract_re=r'.*(?P<cg>\d+TRx\_SSB\_Pattern\d+)\..{3}$',
+        post_capture_proc=lambda r: r.replace('_SSB_', ' '),
+    ),
+    'pattern_type_extractor': PatternNameParamExtractor(
+        path_part='basename',
+        pre_capture_proc=lambda r: r.lower(),
+        post_capture_proc=lambda r: PATTERN_TYPE__BROADCAST if 'ssb' in r else PATTERN_TYPE__BEAMSWITCHING_SERVICE,
+    ),
+    'center_freq_extractor': PatternPayloadParamExtractor(
+        extract_fn=lambda payload: int(payload.header['FREQUENCY'])
+    ),
+    'min_freq_extractor': PatternPayloadParamExtractor(
+        extract_fn=lambda payload: int(payload.header['FREQUENCY']) - 100
+    ),
+    'max_freq_extractor': PatternPayloadParamExtractor(
+        extract_fn=lambda payload: int(payload.header['FREQUENCY']) + 100
+    ),
+    'electrical_tilt_extractor': PatternNameParamExtractor(
+        path_part='basename',
+        extract_re=r'.*\_(?P<cg>-?\d+)T\_.*',
+        post_capture_proc=lambda r: int(r),
+    ),
+    'polarization_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 'Plus45',
+    ),
+    'polarization_type_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: None,
+    ),
+    'v_port_number_of_ports_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 1,
+    ),
+    'horiz_number_of_elements_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 32,
+    ),
+    'horiz_sep_dist_cm_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 0.6,
+    ),
+    'vert_number_of_elements_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 32,
+    ),
+    'vert_sep_dist_cm_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 0.6,
+    ),
+    'beamswitching_service_name_extractor': PatternNameParamExtractor(
+        post_capture_proc=lambda r: 'PDSCH' if 'PDSCH' in r else 'None',
+    ),
+    'beamswitching_horiz_angle_extractor': PatternPayloadParamExtractor(
+        extract_fn=lambda payload: payload.horiz_pap_pattern.get_boresight_deg(),
+    ),
+    'beamswitching_vert_angle_extractor': PatternPayloadParamExtractor(
+        extract_fn=lambda payload: payload.vert_pap_pattern.get_boresight_deg(),
+    ),
+
+    # Parameter selectors
+    'scenario_selector': PatternNameParamSelector(
+        select_re=scenario_v_port_selector
+    ),
+    'v_port_name_selector': PatternNameParamSelector(
+        select_re=scenario_v_port_selector
+    ),
+}
@@ -0,0 +1,125 @@
+"""
+Batch runner: generates several antenna models in parallel, one process per model.
+
+Each model is described by a configuration module (a .py file or an importable
+module name) defining a `params` dict with the BeamformingAntennaGenerator
+configuration. Usage:
+
+    python -m common.batch_generator antenna_scripts/configs/*.py -o antenna_scripts/output -j 4
+"""
+import argparse
+import contextlib
+import importlib
+import os
+import runpy
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .beamforming_antenna_generator import BeamformingAntennaGenerator
+
+
+def load_model_params(config: str) -> dict:
+    """
+    :param config: Path of a .py configuration file, or importable module name, defining a `params` dict
+    """
+    if config.endswith('.py') or os.path.isfile(config):
+        return runpy.run_path(config)['params']
+    return importlib.import_module(config).params
+
+
+def generate_model(config: str, output_dir: str) -> dict:
+    """
+    Generates the .pafx model of a configuration module. The generator output is
+    written to a log file next to the .pafx, so that parallel models don't mix.
+    :param config: Configuration module, see load_model_params
+    :param output_dir: Directory of the generated .pafx and log files
+    :return: Model status: config, status ('ok' or 'error'), seconds, output_path, log_path, error
+    """
+    start_time = time.time()
+    result = {
+        'config': config,
+        'status': 'error',
+        'seconds': None,
+        'output_path': None,
+        'log_path': None,
+        'error': None,
+    }
+    try:
+        params = load_model_params(config)
+        output_path = os.path.join(output_dir, params['filename'])
+        log_path = os.path.splitext(output_path)[0] + '.log'
+        result['output_path'] = output_path
+        result['log_path'] = log_path
+
+        with open(log_path, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+            generator = BeamformingAntennaGenerator(params)
+            generator.list_extracted_tags(detailed=False)
+            # the writer reports I/O errors in the log, without raising
+            written = generator.generate(output_dir)
+
+        if written:
+            result['status'] = 'ok'
+        else:
+            result['error'] = 'The .pafx file was not generated, see ' + log_path
+    except Exception:
+        result['error'] = traceback.format_exc()
+
+    result['seconds'] = time.time() - start_time
+    return result
+
+
+def generate_models(configs: list[str], output_dir: str, num_workers: int | None = None) -> list[dict]:
+    """
+    Generates the models of several configuration modules in a process pool, printing
+    each model status as it finishes.
+    :param configs: Configuration modules, see load_model_params
+    :param output_dir: Directory of the generated .pafx and log files
+    :param num_workers: Worker processes, None uses all CPU cores
+    :return: Status of each model, in configs order
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    results = {}
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = {executor.submit(generate_model, config, output_dir): config for config in configs}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            print_model_status(result)
+
+    return [results[config] for config in configs]
+
+
+def print_model_status(result: dict):
+    if result['status'] == 'ok':
+        print('[OK] {} ({:0.1f} s) --> {}'.format(result['config'], result['seconds'], result['output_path']))
+    else:
+        print('[ERROR] {} ({:0.1f} s)'.format(result['config'], result['seconds']))
+        print(result['error'])
+
+
+def main(args: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description='Generates several .pafx antenna models in parallel')
+    arg_parser.add_argument('configs', nargs='+', help='Model configuration modules (.py files or module names)')
+    arg_parser.add_argument('-o', '--output-dir', default='output', help='Directory of the generated .pafx files')
+    arg_parser.add_argument('-j', '--jobs', type=int, default=None, help='Models generated in parallel (default: CPU cores)')
+    parsed_args = arg_parser.parse_args(args)
+
+    start_time = time.time()
+    results = generate_models(parsed_args.configs, os.path.abspath(parsed_args.output_dir), parsed_args.jobs)
+
+    print('')
+    print('===============================================================')
+    print('Batch summary')
+    print('===============================================================')
+    for result in results:
+        seconds = '{:0.1f} s'.format(result['seconds'])
+        print('{:<6} {:>9}  {}  --> {}'.format(result['status'].upper(), seconds, result['config'], result['output_path']))
+    num_failed = len([result for result in results if result['status'] != 'ok'])
+    print('{} models, {} failed, {:0.1f} s'.format(len(results), num_failed, time.time() - start_time))
+
+    return 1 if num_failed > 0 else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
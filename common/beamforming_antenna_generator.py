@@ -1,69 +1,244 @@
+import collections
+import hashlib
 import math
 import os
-from .consts import PATTERN_FILE_FORMAT__MSI
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+from .consts import PATTERN_FILE_FORMAT__MSI, SRC_FILES_ORDER__SORTED
 from .util.util import int_digits
 from .pattern_data import MsiData
 from .msi_parser import MsiParser
-from .pattern_name_param_extractor import PatternNameParamExtractor
-from .pattern_payload_param_extractor import PatternPayloadParamExtractor
+from .parse_cache import ParseCache
+from .pafx_manifest import PafxManifest, PAFX_MANIFEST_PAYLOAD_FIELDS
+from .pattern_archive import PatternArchive
+from .pattern_extraction_plan import PatternExtractionPlan
 from .pattern_name_param_selector import PatternNameParamSelector
+from .pattern_table import PatternTable, PATTERN_TAGS
+from .src_file_scanner import SrcFileScanner, SCAN_DEFAULT_NUM_WORKERS
 from .pafx_file_writer import PafxFileWriter
 
+# Upper bound of files handed to a worker process at once
+PARSE_CHUNK_MAX_SIZE = 64
+
+
+def parse_chunk(parser: MsiParser, src_items: list[tuple[str, bytes | None]]) -> list[MsiData]:
+    return [parser.parse(src_path, content) for src_path, content in src_items]
+
 
 class BeamformingAntennaGenerator:
     src_files = []
+    src_file_entries = []
     patterns = []
     parser = None
+    archive = None
+    analyzed = False
+    _pattern_table: PatternTable | None = None
 
     def __init__(self, params: dict):
         self.params = params
         pattern_file_format = self.params['pattern_file_format']
         self.parser = MsiParser() if pattern_file_format == PATTERN_FILE_FORMAT__MSI else None
-        self.find_src_files()
-        self.process_patterns()
+        src_folder = self.params['src_folder']
+        self.archive = PatternArchive(src_folder) if PatternArchive.is_archive(src_folder) else None
+        try:
+            self.find_src_files()
+            # incremental mode: the previous .pafx is only known in generate(), which processes the patterns again
+            self.process_patterns(
+                header_scan=self.params.get('header_scan', False) or self.params.get('incremental', False)
+            )
+        finally:
+            self.close_archive()
 
     def find_src_files(self):
         self.src_files = []
+        self.src_file_entries = []
 
         src_folder = self.params['src_folder']
         src_file_re_filter = self.params['src_file_re_filter']
+        src_files_order = self.params.get('src_files_order', SRC_FILES_ORDER__SORTED)
 
-        for root, subdirs, files in os.walk(src_folder):
-            for f in files:
-                file_path = os.path.join(root[len(src_folder) + 1:], f)
+        # src_folder is a .zip archive --> filter its members
+        if self.archive is not None:
+            file_paths = self.archive.list_files()
+            if src_files_order == SRC_FILES_ORDER__SORTED:
+                file_paths.sort()
+            for file_path in file_paths:
                 if src_file_re_filter.eval(file_path):
                     self.src_files.append(file_path)
+                    self.src_file_entries.append(self.archive.get_entry(file_path))
+            return
+
+        scanner = SrcFileScanner(
+            src_folder,
+            src_file_re_filter,
+            self.params.get('scan_num_workers', SCAN_DEFAULT_NUM_WORKERS),
+            src_files_order,
+        )
+        self.src_file_entries = scanner.scan()
+        self.src_files = [entry.path for entry in self.src_file_entries]
 
     def get_src_files(self) -> list[str]:
         return self.src_files
 
-    def process_patterns(self):
+    def read_src_file(self, src_file: str) -> bytes | None:
+        """
+        Reads a source file from the archive. Returns None for files on disk,
+        which are read by the parser itself.
+        """
+        return self.archive.read(src_file) if self.archive is not None else None
+
+    def close_archive(self):
+        """
+        Closes the source archive, if any. It's reopened if the source files are read again
+        """
+        if self.archive is not None:
+            self.archive.close()
+
+    def parse_src_files(
+            self,
+            header_scan: bool = False,
+            src_files: list[str] | None = None,
+            digests: list[str] | None = None,
+    ) -> Iterator[MsiData]:
+        """
+        Parses the source files, yielding the payloads in src_files order.
+        Payloads found in the parse cache (if configured) are not parsed again.
+        :param header_scan: Read only the header of each file, without gain analysis
+        :param src_files: Source files to parse. Defaults to all of them
+        :param digests: Content digests of the source files, if already computed (see get_src_digests)
+        """
+        src_folder = self.params['src_folder']
+        parse_cache: ParseCache | None = self.params.get('parse_cache')
+        src_files = self.src_files if src_files is None else src_files
+
+        if header_scan:
+            for src_file in src_files:
+                yield self.parser.parse_header(os.path.join(src_folder, src_file), self.read_src_file(src_file))
+            return
+
+        if parse_cache is None:
+            yield from self.parse_files(src_files)
+            return
+
+        src_paths = [os.path.join(src_folder, src_file) for src_file in src_files]
+        if digests is None:
+            digests = self.get_src_digests(src_files)
+        cached = [parse_cache.has(digest) for digest in digests]
+        parsed_payloads = self.parse_files([
+            src_file for src_file, is_cached in zip(src_files, cached) if not is_cached
+        ])
+        for src_path, digest, is_cached in zip(src_paths, digests, cached):
+            if is_cached:
+                payload = parse_cache.get(src_path, digest)
+            else:
+                payload = next(parsed_payloads)
+                parse_cache.put(digest, payload)
+            yield payload
+        parse_cache.commit()
+
+    def parse_files(self, src_files: list[str]) -> Iterator[MsiData]:
+        """
+        Parses the given source files in order. With num_workers other than 1 the
+        files are spread over a process pool (None uses all CPU cores), keeping a
+        bounded number of chunks in flight.
+        """
         src_folder = self.params['src_folder']
+        num_workers = self.params.get('num_workers', 1)
 
-        # extractors
-        pattern_name_extractor = self.params['pattern_name_extractor']
-        scenario_extractor = self.params['scenario_extractor']
-        v_port_name_extractor = self.params['v_port_name_extractor']
-        pattern_type_extractor = self.params['pattern_type_extractor']
-        center_freq_extractor = self.params['center_freq_extractor']
-        min_freq_extractor = self.params['min_freq_extractor']
-        max_freq_extractor = self.params['max_freq_extractor']
-        electrical_tilt_extractor = self.params['electrical_tilt_extractor']
-        polarization_extractor = self.params['polarization_extractor']
-        polarization_type_extractor = self.params['polarization_type_extractor']
-        horiz_number_of_elements_extractor = self.params['horiz_number_of_elements_extractor']
-        horiz_sep_dist_cm_extractor = self.params['horiz_sep_dist_cm_extractor']
-        vert_number_of_elements_extractor = self.params['vert_number_of_elements_extractor']
-        vert_sep_dist_cm_extractor = self.params['vert_sep_dist_cm_extractor']
-        v_port_number_of_ports_extractor = self.params['v_port_number_of_ports_extractor']
-        beamswitching_service_name_extractor = self.params['beamswitching_service_name_extractor']
-        beamswitching_horiz_angle_extractor = self.params['beamswitching_horiz_angle_extractor']
-        beamswitching_vert_angle_extractor = self.params['beamswitching_vert_angle_extractor']
+        if num_workers == 1:
+            for src_file in src_files:
+                yield self.parser.parse(os.path.join(src_folder, src_file), self.read_src_file(src_file))
+            return
+
+        num_workers = num_workers or os.cpu_count()
+        chunksize = max(1, min(PARSE_CHUNK_MAX_SIZE, len(src_files) // (4 * num_workers)))
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            pending = collections.deque()
+            for i in range(0, len(src_files), chunksize):
+                src_items = [
+                    (os.path.join(src_folder, src_file), self.read_src_file(src_file))
+                    for src_file in src_files[i:i + chunksize]
+                ]
+                pending.append(executor.submit(parse_chunk, self.parser, src_items))
+                if len(pending) >= 2 * num_workers:
+                    yield from pending.popleft().result()
+            while len(pending) > 0:
+                yield from pending.popleft().result()
+
+    def iter_pap_patterns(self, patterns: list[dict] | None = None) -> Iterator[dict]:
+        """
+        Streaming mode: re-parses the source files on demand, yielding each pattern
+        together with its horizontal/vertical gain data
+        :param patterns: Patterns to yield. Defaults to all of them
+        """
+        patterns = self.patterns if patterns is None else patterns
+        src_files = [pattern['src_file'] for pattern in patterns]
+        for pattern, payload in zip(patterns, self.parse_src_files(src_files=src_files), strict=True):
+            yield pattern | {
+                'horiz_pap_pattern': payload.horiz_pap_pattern,
+                'vert_pap_pattern': payload.vert_pap_pattern,
+            }
+
+    def get_src_digests(self, src_files: list[str]) -> list[str]:
+        """
+        Content digests of the source files. With a parse cache, files on disk whose mtime and size did not change
+        are not read again
+        """
+        src_folder = self.params['src_folder']
+        parse_cache: ParseCache | None = self.params.get('parse_cache')
+        digests = []
+        for src_file in src_files:
+            src_path = os.path.join(src_folder, src_file)
+            content = self.read_src_file(src_file)
+            if parse_cache is not None:
+                digests.append(parse_cache.get_digest(src_path, content))
+                continue
+            if content is None:
+                with open(src_path, 'rb') as file:
+                    content = file.read()
+            digests.append(hashlib.sha256(content).hexdigest())
+        return digests
+
+    def process_patterns(self, header_scan: bool = False, previous_manifest: PafxManifest | None = None):
+        """
+        Extracts the parameters of every source pattern
+        :param header_scan: Fast scan for filtering and tag listing: only the file headers are read, and the values
+                            that need the gain analysis are left empty until generate() is called
+        :param previous_manifest: Incremental mode: manifest of the previous .pafx, if any. The source files that did
+                                  not change since are not parsed, their recorded values are used instead
+        """
+        self.analyzed = not header_scan
+        incremental = self.params.get('incremental', False) and not header_scan
+
+        # extractors, compiled once into a plan that shares the work common to several of them
+        extraction_plan = PatternExtractionPlan({
+            'name': self.params['pattern_name_extractor'],
+            'scenario': self.params['scenario_extractor'],
+            'v_port_name': self.params['v_port_name_extractor'],
+            'pattern_type': self.params['pattern_type_extractor'],
+            'center_freq': self.params['center_freq_extractor'],
+            'min_freq': self.params['min_freq_extractor'],
+            'max_freq': self.params['max_freq_extractor'],
+            'electrical_tilt': self.params['electrical_tilt_extractor'],
+            'polarization': self.params['polarization_extractor'],
+            'polarization_type': self.params['polarization_type_extractor'],
+            'v_port_number_of_ports': self.params['v_port_number_of_ports_extractor'],
+            'horiz_number_of_elements': self.params['horiz_number_of_elements_extractor'],
+            'horiz_sep_dist_cm': self.params['horiz_sep_dist_cm_extractor'],
+            'vert_number_of_elements': self.params['vert_number_of_elements_extractor'],
+            'vert_sep_dist_cm': self.params['vert_sep_dist_cm_extractor'],
+            'beamswitching_service_name': self.params['beamswitching_service_name_extractor'],
+            'beamswitching_horiz_angle': self.params['beamswitching_horiz_angle_extractor'],
+            'beamswitching_vert_angle': self.params['beamswitching_vert_angle_extractor'],
+        })
 
         # selectors
         scenario_selector: PatternNameParamSelector | None = self.params['scenario_selector']
         v_port_name_selector: PatternNameParamSelector | None = self.params['v_port_name_selector']
 
+        # in streaming mode, gain data is not kept: it's produced again when writing the .pafx
+        streaming = self.params.get('streaming', False)
+
         patterns = []
 
         # keep a list of unique extracted scenarios and v_port_names to be able
@@ -71,51 +246,79 @@ class BeamformingAntennaGenerator:
         extracted_scenarios = set()
         extracted_v_port_names = set()
 
+        # incremental mode: source files hashed before parsing, only the new or changed ones are parsed
+        src_digests = self.get_src_digests(self.src_files) if incremental else None
+        previous_patterns = [None] * len(self.src_files)
+        if incremental and previous_manifest is not None:
+            for i, (src_file, src_digest) in enumerate(zip(self.src_files, src_digests)):
+                previous = previous_manifest.get_pattern(src_file, src_digest)
+                # values of payload params added since can't be reused
+                payload_param_names = set(extraction_plan.payload_param_names)
+                if previous is not None and payload_param_names <= previous['payload_values'].keys():
+                    previous_patterns[i] = previous
+        payloads = self.parse_src_files(
+            header_scan,
+            [src_file for src_file, previous in zip(self.src_files, previous_patterns) if previous is None],
+            [
+                src_digest for src_digest, previous in zip(src_digests, previous_patterns) if previous is None
+            ] if incremental else None,
+        )
+
         # extract parameters
-        for src_file in self.src_files:
+        for i, src_file in enumerate(self.src_files):
+            previous = previous_patterns[i]
+            if previous is None:
+                payload = next(payloads)
+                values = extraction_plan.extract(src_file, payload)
+                payload_fields = {field: getattr(payload, field, None) for field in PAFX_MANIFEST_PAYLOAD_FIELDS}
+            else:
+                payload = None
+                values = extraction_plan.extract(src_file, None, previous['payload_values'])
+                payload_fields = previous['payload']
             src_file_basename = os.path.basename(src_file)
             output_file_basename = self.get_pattern_output_file_basename(
                 src_file_basename,
                 self.params['pattern_file_format']
             )
-            payload = self.parser.parse(os.path.join(src_folder, src_file))
             pattern = {
                 'src_file': src_file,
                 'src_file_basename': src_file_basename,
                 'output_file_basename': output_file_basename,
-                'name': self.extract_param(pattern_name_extractor, src_file, payload),
-                'scenario': self.extract_param(scenario_extractor, src_file, payload),
-                'v_port_name': self.extract_param(v_port_name_extractor, src_file, payload),
-                'pattern_type': self.extract_param(pattern_type_extractor, src_file, payload),
-                'center_freq': self.extract_param(center_freq_extractor, src_file, payload),
-                'min_freq': self.extract_param(min_freq_extractor, src_file, payload),
-                'max_freq': self.extract_param(max_freq_extractor, src_file, payload),
-                'electrical_tilt': self.extract_param(electrical_tilt_extractor, src_file, payload),
+                'name': values['name'],
+                'scenario': values['scenario'],
+                'v_port_name': values['v_port_name'],
+                'pattern_type': values['pattern_type'],
+                'center_freq': values['center_freq'],
+                'min_freq': values['min_freq'],
+                'max_freq': values['max_freq'],
+                'electrical_tilt': values['electrical_tilt'],
                 'electrical_azimuth': 0,
                 'electrical_beamwidth': 0,
-                'polarization': self.extract_param(polarization_extractor, src_file, payload),
-                'polarization_type': self.extract_param(polarization_type_extractor, src_file, payload),
-                'v_port_number_of_ports': self.extract_param(v_port_number_of_ports_extractor, src_file, payload),
-                'horiz_number_of_elements': self.extract_param(horiz_number_of_elements_extractor, src_file, payload),
-                'horiz_sep_dist_cm': self.extract_param(horiz_sep_dist_cm_extractor, src_file, payload),
-                'vert_number_of_elements': self.extract_param(vert_number_of_elements_extractor, src_file, payload),
-                'vert_sep_dist_cm': self.extract_param(vert_sep_dist_cm_extractor, src_file, payload),
-                'beamswitching_service_name': self.extract_param(beamswitching_service_name_extractor, src_file,
-                                                                 payload),
-                'beamswitching_horiz_angle': round(
-                    self.extract_param(beamswitching_horiz_angle_extractor, src_file, payload), 1),
-                'beamswitching_vert_angle': round(
-                    self.extract_param(beamswitching_vert_angle_extractor, src_file, payload), 1),
-                'boresight_gain': payload.boresight_gain,
-                'boresight_gain_unit': payload.boresight_gain_unit,
-                'horiz_beamwidth_deg': payload.horiz_beamwidth_deg,
-                'vert_beamwidth_deg': payload.vert_beamwidth_deg,
-                'horiz_boresight_deg': payload.horiz_boresight_deg,
-                'vert_boresight_deg': payload.vert_boresight_deg,
-                'front_to_back_ratio_db': payload.front_to_back_ratio_db,
-                'horiz_pap_pattern': payload.horiz_pap_pattern,
-                'vert_pap_pattern': payload.vert_pap_pattern,
+                'polarization': values['polarization'],
+                'polarization_type': values['polarization_type'],
+                'v_port_number_of_ports': values['v_port_number_of_ports'],
+                'horiz_number_of_elements': values['horiz_number_of_elements'],
+                'horiz_sep_dist_cm': values['horiz_sep_dist_cm'],
+                'vert_number_of_elements': values['vert_number_of_elements'],
+                'vert_sep_dist_cm': values['vert_sep_dist_cm'],
+                'beamswitching_service_name': values['beamswitching_service_name'],
+                'beamswitching_horiz_angle': self.round_param(values['beamswitching_horiz_angle'], 1),
+                'beamswitching_vert_angle': self.round_param(values['beamswitching_vert_angle'], 1),
+                'boresight_gain': payload_fields['boresight_gain'],
+                'boresight_gain_unit': payload_fields['boresight_gain_unit'],
+                # gain analysis results are not available in header scan mode
+                'horiz_beamwidth_deg': payload_fields['horiz_beamwidth_deg'],
+                'vert_beamwidth_deg': payload_fields['vert_beamwidth_deg'],
+                'horiz_boresight_deg': payload_fields['horiz_boresight_deg'],
+                'vert_boresight_deg': payload_fields['vert_boresight_deg'],
+                'front_to_back_ratio_db': payload_fields['front_to_back_ratio_db'],
+                # the gain data of unchanged source files is copied from the previous .pafx
+                'horiz_pap_pattern': None if streaming else getattr(payload, 'horiz_pap_pattern', None),
+                'vert_pap_pattern': None if streaming else getattr(payload, 'vert_pap_pattern', None),
             }
+            if incremental:
+                pattern['src_digest'] = src_digests[i]
+                pattern['payload_values'] = {name: values[name] for name in extraction_plan.payload_param_names}
 
             # add selectable params values to lists
             # scenario
@@ -127,102 +330,44 @@ class BeamformingAntennaGenerator:
 
             patterns.append(pattern)
 
-        # execute selectors
+        # execute selectors, their candidate values pre-processed once
+        if scenario_selector is not None:
+            scenario_selector.set_values(list(extracted_scenarios))
+        if v_port_name_selector is not None:
+            v_port_name_selector.set_values(list(extracted_v_port_names))
         for pattern in patterns:
             # scenario
             pattern['selected_scenarios'] = scenario_selector.select(
                 pattern['src_file'],
-                list(extracted_scenarios),
             ) if scenario_selector is not None else []
             # v_port_name
             pattern['selected_v_port_names'] = v_port_name_selector.select(
                 pattern['src_file'],
-                list(extracted_v_port_names),
             ) if v_port_name_selector is not None else []
 
         self.patterns = patterns
+        self._pattern_table = None
+
+    @property
+    def pattern_table(self) -> PatternTable:
+        """
+        Columnar table of the pattern metadata with the tag index, built on first use
+        """
+        if self._pattern_table is None:
+            self._pattern_table = PatternTable(self.patterns)
+        return self._pattern_table
 
     def list_extracted_tags(self, detailed=False, full_path=False, log=True):
-        scenario = {}
-        v_port_name = {}
-        pattern_type = {}
-        freq_band = {}
-        electrical_tilt = {}
-        polarization = {}
-        polarization_type = {}
-        v_port_number_of_ports = {}
-        horiz_number_of_elements = {}
-        horiz_sep_dist_cm = {}
-        vert_number_of_elements = {}
-        vert_sep_dist_cm = {}
-        beamswitching_service_name = {}
-        beamswitching_horiz_angle = {}
-        beamswitching_vert_angle = {}
-
-        for pattern in self.patterns:
-            if detailed:
-                value = pattern['src_file'] if full_path else os.path.basename(pattern['src_file'])
-                # scenario
-                for pattern_scenario in [pattern['scenario']] + pattern['selected_scenarios']:
-                    if pattern_scenario is not None:
-                        self.push_dict_item(pattern_scenario, scenario, value)
-                # v_port_name
-                for pattern_v_port_name in [pattern['v_port_name']] + pattern['selected_v_port_names']:
-                    if pattern_v_port_name is not None:
-                        self.push_dict_item(pattern_v_port_name, v_port_name, value)
-                self.push_dict_item(pattern['pattern_type'], pattern_type, value)
-                self.push_dict_item(str(pattern['min_freq']) + '-' + str(pattern['max_freq']), freq_band, value)
-                self.push_dict_item(pattern['electrical_tilt'], electrical_tilt, value)
-                self.push_dict_item(pattern['polarization'], polarization, value)
-                self.push_dict_item(pattern['polarization_type'], polarization_type, value)
-                self.push_dict_item(pattern['v_port_number_of_ports'], v_port_number_of_ports, value)
-                self.push_dict_item(pattern['horiz_number_of_elements'], horiz_number_of_elements, value)
-                self.push_dict_item(pattern['horiz_sep_dist_cm'], horiz_sep_dist_cm, value)
-                self.push_dict_item(pattern['vert_number_of_elements'], vert_number_of_elements, value)
-                self.push_dict_item(pattern['vert_sep_dist_cm'], vert_sep_dist_cm, value)
-                self.push_dict_item(pattern['beamswitching_service_name'], beamswitching_service_name, value)
-                self.push_dict_item(pattern['beamswitching_horiz_angle'], beamswitching_horiz_angle, value)
-                self.push_dict_item(pattern['beamswitching_vert_angle'], beamswitching_vert_angle, value)
-            else:
-                # scenario
-                for pattern_scenario in [pattern['scenario']] + pattern['selected_scenarios']:
-                    if pattern_scenario is not None:
-                        self.increment_dict_item(pattern_scenario, scenario)
-                # v_port_name
-                for pattern_v_port_name in [pattern['v_port_name']] + pattern['selected_v_port_names']:
-                    if pattern_v_port_name is not None:
-                        self.increment_dict_item(pattern_v_port_name, v_port_name)
-                self.increment_dict_item(pattern['pattern_type'], pattern_type)
-                self.increment_dict_item(str(pattern['min_freq']) + '-' + str(pattern['max_freq']), freq_band)
-                self.increment_dict_item(pattern['electrical_tilt'], electrical_tilt)
-                self.increment_dict_item(pattern['polarization'], polarization)
-                self.increment_dict_item(pattern['polarization_type'], polarization_type)
-                self.increment_dict_item(pattern['v_port_number_of_ports'], v_port_number_of_ports)
-                self.increment_dict_item(pattern['horiz_number_of_elements'], horiz_number_of_elements)
-                self.increment_dict_item(pattern['horiz_sep_dist_cm'], horiz_sep_dist_cm)
-                self.increment_dict_item(pattern['vert_number_of_elements'], vert_number_of_elements)
-                self.increment_dict_item(pattern['vert_sep_dist_cm'], vert_sep_dist_cm)
-                self.increment_dict_item(pattern['beamswitching_service_name'], beamswitching_service_name)
-                self.increment_dict_item(pattern['beamswitching_horiz_angle'], beamswitching_horiz_angle)
-                self.increment_dict_item(pattern['beamswitching_vert_angle'], beamswitching_vert_angle)
-
-        extracted_tags = {
-            'scenario': scenario,
-            'v_port_name': v_port_name,
-            'pattern_type': pattern_type,
-            'freq_band': freq_band,
-            'electrical_tilt': electrical_tilt,
-            'polarization': polarization,
-            'polarization_type': polarization_type,
-            'v_port_number_of_ports': v_port_number_of_ports,
-            'horiz_number_of_elements': horiz_number_of_elements,
-            'horiz_sep_dist_cm': horiz_sep_dist_cm,
-            'vert_number_of_elements': vert_number_of_elements,
-            'vert_sep_dist_cm': vert_sep_dist_cm,
-            'beamswitching_service_name': beamswitching_service_name,
-            'beamswitching_horiz_angle': beamswitching_horiz_angle,
-            'beamswitching_vert_angle': beamswitching_vert_angle,
-        }
+        """
+        Values of each tag with their pattern counts, or with their source files if detailed
+        :param detailed: List the source files of each tag value instead of counting them
+        :param full_path: List the source file paths instead of their basenames (detailed mode)
+        :param log: Print the tags
+        """
+        if detailed:
+            extracted_tags = {tag: self.pattern_table.get_src_files(tag, full_path) for tag in PATTERN_TAGS}
+        else:
+            extracted_tags = {tag: self.pattern_table.get_counts(tag) for tag in PATTERN_TAGS}
         if log:
             print('')
             print('===============================================================')
@@ -236,40 +381,42 @@ class BeamformingAntennaGenerator:
 
         return extracted_tags
 
-    def generate(self, output_dir: str):
+    def generate(self, output_dir: str) -> bool:
+        """
+        :return: True if the .pafx file was written (I/O errors are printed, not raised)
+        """
+        try:
+            return self.write_pafx(output_dir)
+        finally:
+            # don't keep the source archive open (and locked, on Windows) once the model is written
+            self.close_archive()
+
+    def write_pafx(self, output_dir: str) -> bool:
         writer = PafxFileWriter()
         output_path = os.path.join(output_dir, self.params['filename'])
-        writer.write_beamforming_antenna(
-            output_path,
-            self.params,
-            self.patterns,
-        )
 
-    @staticmethod
-    def extract_param(
-            extractor: PatternNameParamExtractor | PatternPayloadParamExtractor,
-            src_file: str,
-            payload: MsiData,
-    ) -> str | int | float | None:
-        if isinstance(extractor, PatternNameParamExtractor):
-            return extractor.extract(src_file)
-
-        elif isinstance(extractor, PatternPayloadParamExtractor):
-            return extractor.extract(payload)
+        previous_manifest = None
+        if self.params.get('incremental', False):
+            # the source file hashes decide which source files are parsed, and which entries of the previous .pafx
+            # are reused
+            previous_manifest = PafxManifest.read_file(output_path, self.params.get('pafx_compress_level'))
+            self.process_patterns(previous_manifest=previous_manifest)
+        elif not self.analyzed:
+            # header scan mode: run the full gain analysis now
+            self.process_patterns()
 
-        print('[ERROR] Extractor type not supported')
-        return None
+        pap_patterns = None
+        if self.params.get('streaming', False):
+            pap_patterns = self.iter_pap_patterns([
+                pattern for pattern in self.patterns
+                if previous_manifest is None or previous_manifest.get_pap_digest(pattern) is None
+            ])
 
-    @staticmethod
-    def increment_dict_item(key, d: dict):
-        d[key] = d[key] + 1 if key in d else 1
+        return writer.write_beamforming_antenna(output_path, self.params, self.patterns, pap_patterns)
 
     @staticmethod
-    def push_dict_item(key, d: dict, value):
-        if key in d:
-            d[key].append(value)
-        else:
-            d[key] = [value]
+    def round_param(value: int | float | None, digits: int) -> float | None:
+        return round(value, digits) if value is not None else None
 
     @staticmethod
     def print_detailed_tags_dict(tag: str, d: dict):
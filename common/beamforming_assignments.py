@@ -0,0 +1,153 @@
+from random import random
+from typing import Callable
+
+from .consts import PATTERN_TYPE__BROADCAST, PATTERN_TYPE__BEAMFORMING_ELEMENT, PATTERN_TYPE__BEAMSWITCHING_SERVICE
+
+
+def add_rand_noise(v: float) -> float:
+    return round(v + (random() - 0.5) / 50, 5)
+
+
+class BeamformingAssignments:
+    """
+    Scenario > virtual port > virtual band > pattern assignments of a beamforming model.
+
+    The tree is built from the extracted scenario / virtual port of each pattern
+    first, then the selected ones are attached to the scenarios and virtual ports
+    that exist. Virtual bands are indexed by (scenario, virtual port, virtual band)
+    and the patterns attached to each band are tracked in sets, so membership checks
+    do not depend on the number of patterns.
+    """
+
+    def __init__(self, params: dict, patterns: list[dict], elec_controller_name: str, get_uid: Callable[[], str]):
+        """
+        :param params: Generator params
+        :param patterns: Extracted patterns
+        :param elec_controller_name: Electrical controller of the virtual bands
+        :param get_uid: Generator of the scenario and virtual port uids
+        """
+        self.params = params
+        self.elec_controller_name = elec_controller_name
+        self.get_uid = get_uid
+
+        # scenario > virtual port > virtual band tree, as written to antenna.paf
+        self.scenarios = {}
+        # (scenario, v_port_name, v_band_name) --> virtual band
+        self.v_bands: dict[tuple[str, str, str], dict] = {}
+        # (scenario, v_port_name, v_band_name, pattern_type) --> names of the patterns attached to the virtual band
+        self.attached_pattern_names: dict[tuple[str, str, str, str], set[str]] = {}
+
+        for pattern in patterns:
+            self.add_extracted_assignment(pattern)
+        for pattern in patterns:
+            self.add_selected_assignments(pattern)
+
+    def add_extracted_assignment(self, pattern: dict):
+        scenario = pattern['scenario']
+        v_port_name = pattern['v_port_name']
+        v_band_name = str(pattern['min_freq']) + '-' + str(pattern['max_freq'])
+
+        # if any extracted param is missing, the pattern cannot yet be assigned;
+        # it must be assigned considering selected params
+        if scenario is None or v_port_name is None:
+            return
+
+        if scenario not in self.scenarios:
+            self.scenarios[scenario] = {
+                'uid': self.get_uid(),
+                'name': scenario,
+                'horiz_number_of_elements': pattern['horiz_number_of_elements'],
+                'horiz_sep_dist_cm': pattern['horiz_sep_dist_cm'],
+                'vert_number_of_elements': pattern['vert_number_of_elements'],
+                'vert_sep_dist_cm': pattern['vert_sep_dist_cm'],
+                'v_ports': {},
+                'is_beamswitching': True,
+            }
+        v_ports = self.scenarios[scenario]['v_ports']
+        if v_port_name not in v_ports:
+            v_ports[v_port_name] = {
+                'uid': self.get_uid(),
+                'name': v_port_name,
+                'number_of_ports': pattern['v_port_number_of_ports'],
+                'polarization': pattern['polarization'],
+                'polarization_type': pattern['polarization_type'],
+                'v_bands': {},
+            }
+        v_bands = v_ports[v_port_name]['v_bands']
+        if v_band_name not in v_bands:
+            v_band = {
+                'min_freq': pattern['min_freq'],
+                'max_freq': pattern['max_freq'],
+                'supp_elec_tilt': self.params['supp_elec_tilt'],
+                'supp_elec_azimuth': self.params['supp_elec_azimuth'],
+                'supp_elec_beamwidth': self.params['supp_elec_beamwidth'],
+                'cont_adj_elec_tilt': self.params['cont_adj_elec_tilt'],
+                'broadcast_patterns': [],
+                'electrical_controller_name': self.elec_controller_name,
+                'use_elec_params_for_bs_service_patterns': True,
+                'beamforming_element_patterns': [],
+                'beamswitching_service_patterns': {},
+            }
+            v_bands[v_band_name] = v_band
+            self.v_bands[(scenario, v_port_name, v_band_name)] = v_band
+
+        self.attach_pattern((scenario, v_port_name, v_band_name), pattern, check_attached=False)
+
+    def add_selected_assignments(self, pattern: dict):
+        extracted_scenario = pattern['scenario']
+        extracted_v_port_name = pattern['v_port_name']
+        selected_scenarios = pattern['selected_scenarios']
+        selected_v_port_names = pattern['selected_v_port_names']
+        v_band_name = str(pattern['min_freq']) + '-' + str(pattern['max_freq'])
+
+        if len(selected_scenarios) == 0 and len(selected_v_port_names) == 0:
+            # No selected params --> ignore
+            return
+
+        pattern_scenarios = selected_scenarios + (
+            [extracted_scenario] if extracted_scenario is not None else []
+        )
+        pattern_v_port_names = selected_v_port_names + (
+            [extracted_v_port_name] if extracted_v_port_name is not None else []
+        )
+
+        for scenario in pattern_scenarios:
+            if scenario not in self.scenarios:
+                continue
+            v_ports = self.scenarios[scenario]['v_ports']
+            for v_port_name in pattern_v_port_names:
+                if v_port_name not in v_ports:
+                    continue
+                self.attach_pattern((scenario, v_port_name, v_band_name), pattern, check_attached=True)
+
+    def attach_pattern(self, v_band_key: tuple[str, str, str], pattern: dict, check_attached: bool):
+        """
+        :param v_band_key: (scenario, v_port_name, v_band_name) of the virtual band
+        :param pattern: Pattern to attach
+        :param check_attached: Skip broadcast / beamforming element patterns already attached to the virtual band
+        """
+        v_band = self.v_bands[v_band_key]
+        pattern_type = pattern['pattern_type']
+        pattern_name = pattern['name']
+
+        if pattern_type == PATTERN_TYPE__BROADCAST or pattern_type == PATTERN_TYPE__BEAMFORMING_ELEMENT:
+            attached_pattern_names = self.attached_pattern_names.setdefault(v_band_key + (pattern_type,), set())
+            if check_attached and pattern_name in attached_pattern_names:
+                return
+            attached_pattern_names.add(pattern_name)
+            if pattern_type == PATTERN_TYPE__BROADCAST:
+                v_band['broadcast_patterns'].append(pattern_name)
+            else:
+                v_band['beamforming_element_patterns'].append(pattern_name)
+
+        if pattern_type == PATTERN_TYPE__BEAMSWITCHING_SERVICE:
+            beamswitching_service_name = pattern['beamswitching_service_name']
+            if beamswitching_service_name not in v_band['beamswitching_service_patterns']:
+                v_band['beamswitching_service_patterns'][beamswitching_service_name] = []
+            v_band['beamswitching_service_patterns'][beamswitching_service_name].append({
+                # Add random noise to avoid Planet "same parameters" error
+                'horiz_angle': add_rand_noise(pattern['beamswitching_horiz_angle']),
+                # Add random noise to avoid Planet "same parameters" error
+                'vert_angle': add_rand_noise(pattern['beamswitching_vert_angle']),
+                'pattern_name': pattern_name,
+            })
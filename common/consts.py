@@ -6,5 +6,9 @@ PATTERN_TYPE__BROADCAST = 'broadcast'
 PATTERN_TYPE__BEAMFORMING_ELEMENT = 'beamforming_element'
 PATTERN_TYPE__BEAMSWITCHING_SERVICE = 'beamswitching_service'
 
+# Source files order
+SRC_FILES_ORDER__SORTED = 'sorted'
+SRC_FILES_ORDER__WALK = 'walk'
+
 # Comment fingerprint
 COMMENT_FINGERPRINT = '[beamforming_pafx_generation_script - Telecom Argentina]'
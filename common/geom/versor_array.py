@@ -0,0 +1,59 @@
+import numpy as np
+
+from .geom import ZERO_THRES
+
+
+def are_versors_on_same_half_plane(versors: np.ndarray) -> bool:
+    """
+    Array counterpart of are_vectors2d_on_same_half_plane
+    :param versors: (n, 2) array of [x, y] versors
+    """
+    # Two or fewer versors are always in the same half-plane
+    if len(versors) <= 2:
+        return True
+
+    # Get the sum of all versors (accumulated in order, as the list version does)
+    v_sum = np.cumsum(versors, axis=0)[-1]
+
+    # If the sum is zero, then the versors are not in the same half-plane
+    if abs(v_sum[0]) < ZERO_THRES and abs(v_sum[1]) < ZERO_THRES:
+        return False
+
+    # If at least one forms an angle greater than 90° with
+    # the sum, then they are not in the same half-plane
+    dot_prods = versors[:, 0] * v_sum[0] + versors[:, 1] * v_sum[1]
+    return not bool(np.any(dot_prods < 0))
+
+
+def get_angle_range_boundaries(versors: np.ndarray) -> tuple[int, int]:
+    """
+    Indexes of the versors where the angular range spanned by all of them
+    starts and ends (counterclockwise). The versors must lie on the same
+    half-plane. The range is the complement of the largest circular gap
+    between the sorted versor angles, O(n log n).
+    :param versors: (n, 2) array of [x, y] versors
+    """
+    if len(versors) < 1:
+        raise ValueError('The minimum number of vectors to consider is one')
+
+    # Only one versor --> it's both angle range start and end
+    if len(versors) == 1:
+        return 0, 0
+
+    angles = np.arctan2(versors[:, 1], versors[:, 0]) % (2 * np.pi)
+    order = np.argsort(angles, kind='stable')
+    sorted_angles = angles[order]
+    gaps = np.diff(sorted_angles, append=sorted_angles[0] + 2 * np.pi)
+    i_gap = int(np.argmax(gaps))
+
+    # The range boundaries are the versors right after and right before the
+    # largest gap. Among coincident versors, the lowest index is used.
+    i1, i2 = sorted((
+        int(order[(i_gap + 1) % len(order)]),
+        int(order[np.searchsorted(sorted_angles, sorted_angles[i_gap])]),
+    ))
+
+    # Orient them counterclockwise with the same determinant test as the list
+    # version (it also settles the order of exactly opposite versors)
+    det = versors[i1, 0] * versors[i2, 1] - versors[i1, 1] * versors[i2, 0]
+    return (i1, i2) if det > 0 else (i2, i1)
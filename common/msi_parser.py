@@ -1,20 +1,31 @@
+import locale
 import re
 
+import numpy as np
+
 from .pattern_gains_parser import PatternGainsParser
 
-from .pattern_data import MsiData
+from .pattern_data import MsiData, MsiHeaderData
+
+# Bump whenever the parsed output changes, to invalidate cached results
+MSI_PARSER_VERSION = 1
+
+# Lines opening the horizontal/vertical gain sections of an .msi file
+MSI_SECTION_RE = re.compile(rb'^(HORIZONTAL|VERTICAL)(?=[ \t\r\n]|$)', re.MULTILINE)
 
 
 class MsiParser:
 
-    def parse(self, src_file: str) -> MsiData:
-        msi_data = self.extract_msi_data(src_file)
+    def parse(self, src_file: str, content: bytes | None = None) -> MsiData:
+        """
+        :param src_file: Path of the .msi file
+        :param content: File contents, if already read (e.g. from an archive member)
+        """
+        msi_data = self.read_msi_data(src_file) if content is None else self.extract_msi_arrays(content)
         header = msi_data['header']
-        horiz_angle_loss_dict = msi_data['horizontal']
-        vert_angle_loss_dict = msi_data['vertical']
 
-        horiz_gains_parser = PatternGainsParser(horiz_angle_loss_dict)
-        vert_gains_parser = PatternGainsParser(vert_angle_loss_dict)
+        horiz_gains_parser = PatternGainsParser(angle_loss_array=msi_data['horizontal'])
+        vert_gains_parser = PatternGainsParser(angle_loss_array=msi_data['vertical'])
 
         boresight_gain = self.get_boresight_gain(header['GAIN'])
         boresight_gain_unit = 'dBi'
@@ -47,49 +58,92 @@ class MsiParser:
         data.vert_pap_pattern = vert_pap_pattern
         return data
 
-    def extract_msi_data(self, src_file: str):
+    def parse_header(self, src_file: str, content: bytes | None = None) -> MsiHeaderData:
+        """
+        Reads only the header lines (NAME, FREQUENCY, GAIN, TILT...), stopping at
+        the first HORIZONTAL/VERTICAL section. No gain analysis is done.
+        :param src_file: Path of the .msi file
+        :param content: File contents, if already read (e.g. from an archive member)
+        """
+        if content is None:
+            header_lines = []
+            with open(src_file, 'rb') as file:
+                for line in file:
+                    if MSI_SECTION_RE.match(line) is not None:
+                        break
+                    header_lines.append(line)
+            content = b''.join(header_lines)
+        # CR-only files come as a single line: the section is located again once the line endings are normalized
+        content = self.normalize_line_endings(content)
+        section = MSI_SECTION_RE.search(content)
+        content = content[:section.start()] if section is not None else content
+
+        header = self.extract_msi_header(content)
+
+        data = MsiHeaderData()
+        data.src_file = src_file
+        data.header = header
+        data.boresight_gain = self.get_boresight_gain(header['GAIN'])
+        data.boresight_gain_unit = 'dBi'
+        return data
+
+    def read_msi_data(self, src_file: str):
+        with open(src_file, 'rb') as file:
+            content = file.read()
+        return self.extract_msi_arrays(content)
+
+    def extract_msi_arrays(self, content: bytes):
+        """
+        Bulk .msi reader: locates the HORIZONTAL/VERTICAL section boundaries once
+        and loads each cut as a (n, 2) array of [angle, loss] rows
+        """
         data = {
             'header': {},
-            'horizontal': {},
-            'vertical': {},
+            'horizontal': np.empty((0, 2)),
+            'vertical': np.empty((0, 2)),
         }
 
-        with open(src_file, 'r') as file:
-            lines = file.readlines()
+        content = self.normalize_line_endings(content)
+        sections = list(MSI_SECTION_RE.finditer(content))
+        header_end = sections[0].start() if len(sections) > 0 else len(content)
+        encoding = locale.getpreferredencoding(False)
 
-        section = 'header'
-        for line in lines:
-            if str.isspace(line) or line is None or line == '':
+        # Header section: only a handful of lines, parsed as key/value pairs
+        data['header'] = self.extract_msi_header(content[:header_end])
+
+        # Pattern sections: marker line goes to the header, the rows are
+        # converted to floats in one call
+        for i, section in enumerate(sections):
+            line_end = content.find(b'\n', section.start())
+            line_end = len(content) if line_end < 0 else line_end + 1
+            section_end = sections[i + 1].start() if i + 1 < len(sections) else len(content)
+
+            r = self.parse_msi_line(content[section.start():line_end].decode(encoding).rstrip('\n'))
+            data['header'][r['key']] = r['value']
+
+            values = np.array(content[line_end:section_end].split(), dtype=np.float64)
+            data[section.group(1).decode().lower()] = values.reshape(-1, 2)
+
+        return data
+
+    def extract_msi_header(self, content: bytes) -> dict:
+        header = {}
+        header_text = content.decode(locale.getpreferredencoding(False))
+        for line in header_text.split('\n'):
+            if line == '' or str.isspace(line):
                 continue
             r = self.parse_msi_line(line)
-            key = r['key']
-            value = r['value']
-
-            # Detect current section
-            if key == 'HORIZONTAL':
-                section = 'horizontal'
-            if key == 'VERTICAL':
-                section = 'vertical'
-
-            # Header section
-            if section == 'header':
-                data['header'][key] = value
-
-            # Horizontal pattern section
-            elif section == 'horizontal':
-                if key == 'HORIZONTAL':
-                    data['header'][key] = value
-                else:
-                    data['horizontal'][key] = float(value)
-
-            # Vertical pattern section
-            elif section == 'vertical':
-                if key == 'VERTICAL':
-                    data['header'][key] = value
-                else:
-                    data['vertical'][key] = float(value)
+            header[r['key']] = r['value']
+        return header
 
-        return data
+    @staticmethod
+    def normalize_line_endings(content: bytes) -> bytes:
+        """
+        CRLF and CR-only line endings to LF, as the text mode (universal newlines) reader does
+        """
+        if b'\r' not in content:
+            return content
+        return content.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
 
     @staticmethod
     def parse_msi_line(line: str):
@@ -0,0 +1,174 @@
+import collections
+import io
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Callable
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
+
+# Unix mode of the .pafx entries (regular file, rw-r--r--)
+PAFX_ENTRY_MODE = 0o100644
+
+# Local file header of a zip entry (APPNOTE 4.3.7): signature, versions, flags, method, time, date, CRC-32, sizes,
+# file name length and extra field length
+LOCAL_FILE_HEADER = struct.Struct('<4s2B4HL2L2H')
+LOCAL_FILE_HEADER_NAME_LENGTH = 10
+LOCAL_FILE_HEADER_EXTRA_LENGTH = 11
+
+# ZipFile has no public API to append already compressed data: append_raw_entry follows ZipFile.open(..., 'w')
+# using these internals (present in CPython 3.10 to 3.13, checked by the tests). Without them the entries are
+# compressed serially, and copied entries decompressed and compressed again, through the public API
+RAW_ENTRY_ZIPFILE_ATTRS = ['_writecheck', '_didModify', 'start_dir', 'NameToInfo', 'filelist', 'fp']
+
+
+def deflate_entry(data: bytes, compress_level: int) -> tuple[bytes, int]:
+    """
+    Raw DEFLATE stream (as stored in zip entries) and CRC-32 of an entry. zlib
+    releases the GIL, so entries are compressed in parallel by the thread pool.
+    """
+    compressor = zlib.compressobj(compress_level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(), zlib.crc32(data)
+
+
+def read_raw_entry(zip_file: ZipFile, info: ZipInfo) -> bytes:
+    """
+    Data of a zip entry as stored in the archive (compressed, if it is), without checking its CRC
+    """
+    # skip the local file header (its extra field may differ from the central directory one)
+    fp = zip_file.fp
+    fp.seek(info.header_offset)
+    file_header = LOCAL_FILE_HEADER.unpack(fp.read(LOCAL_FILE_HEADER.size))
+    fp.seek(file_header[LOCAL_FILE_HEADER_NAME_LENGTH] + file_header[LOCAL_FILE_HEADER_EXTRA_LENGTH], os.SEEK_CUR)
+    return fp.read(info.compress_size)
+
+
+def supports_raw_entries(zip_file: ZipFile) -> bool:
+    """
+    Whether already compressed data can be appended to the archive (see RAW_ENTRY_ZIPFILE_ATTRS)
+    """
+    return all(hasattr(zip_file, name) for name in RAW_ENTRY_ZIPFILE_ATTRS) and hasattr(ZipInfo, 'FileHeader')
+
+
+class PafxArchiveWriter:
+    """
+    Writes the entries of a .pafx archive in order.
+
+    Without a compression level the entries are stored uncompressed, streamed
+    straight into the archive. With a level, each serialized entry is DEFLATE
+    compressed in a thread pool and then appended raw to the archive, in the
+    order the entries were written. Entries of a previous archive can also be
+    copied as they are, without decompressing them. On Python versions where
+    raw entries can't be appended (see supports_raw_entries) the entries are
+    compressed one after the other by ZipFile itself.
+    """
+
+    def __init__(self, path: str, compress_level: int | None = None, num_workers: int | None = None):
+        """
+        :param path: Path of the .pafx file to generate
+        :param compress_level: DEFLATE level (0-9), None stores the entries uncompressed
+        :param num_workers: Compression threads, None uses all CPU cores
+        """
+        self.zip_file = ZipFile(path, 'w')
+        self.compress_level = compress_level
+        self.num_workers = num_workers or os.cpu_count()
+        self.raw_entries = supports_raw_entries(self.zip_file)
+        self.executor = None
+        if compress_level is not None and self.raw_entries:
+            self.executor = ThreadPoolExecutor(max_workers=self.num_workers)
+        # (entry info, uncompressed size, compression type, future of the (compressed data, CRC)), in archive order
+        self.pending = collections.deque()
+        self.names: set[str] = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            if self.executor is not None:
+                self.executor.shutdown(cancel_futures=True)
+            self.zip_file.close()
+
+    def write(self, name: str, write_entry: Callable[[BinaryIO], None]):
+        """
+        :param name: Entry name
+        :param write_entry: Function serializing the entry into the given binary stream
+        """
+        info = self.add_entry_info(name)
+        if self.compress_level is None:
+            with self.zip_file.open(info, 'w') as f:
+                write_entry(f)
+            return
+
+        buffer = io.BytesIO()
+        write_entry(buffer)
+        data = buffer.getvalue()
+        if self.executor is None:
+            self.zip_file.writestr(info, data, ZIP_DEFLATED, self.compress_level)
+            return
+        self.pending.append(
+            (info, len(data), ZIP_DEFLATED, self.executor.submit(deflate_entry, data, self.compress_level))
+        )
+        if len(self.pending) >= 2 * self.num_workers:
+            self.append_raw_entry(*self.pending.popleft())
+
+    def copy_entry(self, name: str, src_zip_file: ZipFile, src_name: str):
+        """
+        Appends an entry of another archive, copying its compressed data as it is
+        :param name: Entry name
+        :param src_zip_file: Archive the entry is copied from
+        :param src_name: Name of the entry in src_zip_file
+        """
+        src_info = src_zip_file.getinfo(src_name)
+        if not self.raw_entries:
+            compress_level = self.compress_level if src_info.compress_type == ZIP_DEFLATED else None
+            self.zip_file.writestr(
+                self.add_entry_info(name), src_zip_file.read(src_info), src_info.compress_type, compress_level
+            )
+            return
+        compressed = read_raw_entry(src_zip_file, src_info)
+
+        copied = Future()
+        copied.set_result((compressed, src_info.CRC))
+        self.pending.append((self.add_entry_info(name), src_info.file_size, src_info.compress_type, copied))
+        if self.executor is None or len(self.pending) >= 2 * self.num_workers:
+            self.append_raw_entry(*self.pending.popleft())
+
+    def close(self):
+        while len(self.pending) > 0:
+            self.append_raw_entry(*self.pending.popleft())
+        if self.executor is not None:
+            self.executor.shutdown()
+        self.zip_file.close()
+
+    def append_raw_entry(self, info: ZipInfo, file_size: int, compress_type: int, compression: Future):
+        compressed, crc = compression.result()
+        info.compress_type = compress_type
+        info.file_size = file_size
+        info.compress_size = len(compressed)
+        info.CRC = crc
+
+        # as ZipFile.open(..., 'w') does, with the sizes and CRC known upfront (see RAW_ENTRY_ZIPFILE_ATTRS)
+        zip_file = self.zip_file
+        zip_file._writecheck(info)
+        zip_file._didModify = True
+        info.header_offset = zip_file.fp.tell()
+        zip_file.fp.write(info.FileHeader(False))
+        zip_file.fp.write(compressed)
+        zip_file.filelist.append(info)
+        zip_file.NameToInfo[info.filename] = info
+        zip_file.start_dir = zip_file.fp.tell()
+
+    def add_entry_info(self, name: str) -> ZipInfo:
+        """
+        Zip entry header of a new .pafx member, with the attributes of a regular file written just now
+        """
+        if name in self.names:
+            raise ValueError('Duplicate .pafx entry name: ' + name)
+        self.names.add(name)
+        info = ZipInfo(name, date_time=time.localtime(time.time())[:6])
+        info.external_attr = PAFX_ENTRY_MODE << 16
+        return info
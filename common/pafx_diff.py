@@ -0,0 +1,369 @@
+"""
+Structural and numeric diff between two generated .pafx models, e.g. before and after a
+library update or an extractor change. Usage:
+
+    python -m common.pafx_diff output/AQQN_64T64R_old.pafx output/AQQN_64T64R.pafx
+
+Patterns are matched by name. The report lists the added / removed patterns, the
+virtual bands added or removed, the assignment changes of each scenario / virtual band,
+the metadata fields that changed and the gain deltas of every common pattern. Beams are
+matched by pattern and angles: beam ids, which are sequential, are not compared.
+"""
+import argparse
+
+import numpy as np
+
+from .pafx_reader import PAF_PATTERN_FIELDS, PAP_CUT_FIELDS, PafxModel, PafxReader
+
+# Pattern fields compared between the models. The .pap entry name is left out: it only depends on the archive layout
+PATTERN_DIFF_FIELDS = [field for field, numeric in PAF_PATTERN_FIELDS.values() if field != 'entry_name'] + [
+    cut + '_' + field for cut in ['horiz', 'vert'] for field in list(PAP_CUT_FIELDS.values()) + ['num_gains']
+]
+
+# Gain deltas (dB) up to this value are not reported as changes
+DIFF_DEFAULT_GAIN_TOLERANCE = 0.001
+
+# Beamswitching angle deltas (deg) up to this value are not reported as changes. The generator adds up to ±0.01° of
+# random noise to every beam angle, so two generations of the same model differ by up to 0.02° (plus rounding)
+DIFF_DEFAULT_ANGLE_TOLERANCE = 0.025
+
+# Kinds of assignment change of a virtual band
+ASSIGNMENT_CHANGES = ['added', 'removed', 'reassigned_in', 'reassigned_out', 'beam_changed']
+
+
+def get_columns_changed(old_values: np.ndarray, new_values: np.ndarray) -> np.ndarray:
+    """
+    Row-wise comparison of two columns (missing numeric values, NaN, are equal to each other)
+    :return: Mask of the rows that changed
+    """
+    if old_values.dtype == object or new_values.dtype == object:
+        return np.array([old != new for old, new in zip(old_values, new_values)], dtype=bool)
+    return ~((old_values == new_values) | (np.isnan(old_values) & np.isnan(new_values)))
+
+
+def get_gain_deltas(old_gains: np.ndarray, new_gains: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Max absolute and RMS gain delta of each row, over the gains present in both matrices
+    :param old_gains: (patterns, gains) matrix, padded with NaN
+    :param new_gains: (patterns, gains) matrix of the same patterns, padded with NaN
+    :return: Max and RMS delta of each row, NaN if the rows have no gains in common
+    """
+    width = max(old_gains.shape[1], new_gains.shape[1])
+    delta = np.full((len(old_gains), width), np.nan)
+    delta[:, :old_gains.shape[1]] = old_gains
+    delta[:, :new_gains.shape[1]] -= new_gains
+    delta[:, new_gains.shape[1]:] = np.nan
+
+    valid = ~np.isnan(delta)
+    abs_delta = np.abs(delta, where=valid, out=np.zeros_like(delta))
+    num_valid = valid.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        max_delta = np.where(num_valid > 0, abs_delta.max(axis=1, initial=0), np.nan)
+        rms_delta = np.sqrt(np.einsum('ij,ij->i', abs_delta, abs_delta) / num_valid)
+    return max_delta, rms_delta
+
+
+def none_if_nan(value: float) -> float | None:
+    return None if np.isnan(value) else value
+
+
+def get_v_band_keys(model: PafxModel) -> list[tuple]:
+    """
+    Key of each virtual band, to match them between models: (scenario, virtual port, min freq, max freq)
+    """
+    v_port_scenarios = model.scenarios['name'][model.v_ports['scenario_id']]
+    v_port_names = model.v_ports['name']
+    return [
+        # missing frequencies as None: NaN keys would never match
+        (v_port_scenarios[v_port_id], v_port_names[v_port_id], none_if_nan(min_freq), none_if_nan(max_freq))
+        for v_port_id, min_freq, max_freq
+        in zip(model.v_bands['v_port_id'].tolist(), model.v_bands['min_freq'].tolist(), model.v_bands['max_freq'].tolist())
+    ]
+
+
+def get_assignments(model: PafxModel) -> dict[tuple, list[tuple]]:
+    """
+    A pattern can be assigned more than once to the same virtual band and service (e.g. as several beams)
+    :return: (v_band key, pattern type, beamswitching service, pattern name) --> (horiz angle, vert angle) of each
+             assignment, in archive order
+    """
+    v_band_keys = get_v_band_keys(model)
+    columns = model.assignments
+    beams: dict[tuple, list[tuple]] = {}
+    for v_band_id, pattern_type, service_name, pattern_name, *beam in zip(
+            columns['v_band_id'].tolist(),
+            columns['pattern_type'],
+            columns['beamswitching_service_name'],
+            columns['pattern_name'],
+            columns['horiz_angle'].tolist(),
+            columns['vert_angle'].tolist(),
+    ):
+        beams.setdefault((v_band_keys[v_band_id], pattern_type, service_name, pattern_name), []).append(tuple(beam))
+    return beams
+
+
+def is_beam_changed(old_beam: tuple, new_beam: tuple, angle_tolerance: float) -> bool:
+    """
+    :param old_beam: (horiz angle, vert angle), missing values as NaN
+    :param new_beam: (horiz angle, vert angle), missing values as NaN
+    :param angle_tolerance: Angle deltas (deg) up to this value are not changes
+    :return: Whether an angle went missing, appeared or moved beyond the tolerance
+    """
+    old_values = np.array(old_beam, dtype=np.float64)
+    new_values = np.array(new_beam, dtype=np.float64)
+    if not np.array_equal(np.isnan(old_values), np.isnan(new_values)):
+        return True
+    return bool(np.any(np.abs(np.nan_to_num(old_values - new_values)) > angle_tolerance))
+
+
+def match_beams(old_beams: list[tuple], new_beams: list[tuple], angle_tolerance: float) -> tuple[int, int, int]:
+    """
+    Matches the assignments of a pattern to a virtual band and service: each new beam with the first unmatched old
+    beam within the angle tolerance. The beams left unmatched on both sides are paired as moved beams.
+    :return: Number of moved, added and removed beams
+    """
+    unmatched_old = list(old_beams)
+    unmatched_new = []
+    for new_beam in new_beams:
+        i = next(
+            (i for i, old_beam in enumerate(unmatched_old) if not is_beam_changed(old_beam, new_beam, angle_tolerance)),
+            None,
+        )
+        if i is None:
+            unmatched_new.append(new_beam)
+        else:
+            del unmatched_old[i]
+    num_moved = min(len(unmatched_old), len(unmatched_new))
+    return num_moved, len(unmatched_new) - num_moved, len(unmatched_old) - num_moved
+
+
+def format_v_band_key(v_band_key: tuple) -> str:
+    scenario, v_port_name, min_freq, max_freq = v_band_key
+    freqs = ['{:g}'.format(freq) if freq is not None else '?' for freq in [min_freq, max_freq]]
+    return '{} / {} / {}-{} MHz'.format(scenario, v_port_name, *freqs)
+
+
+def format_delta(value: float) -> str:
+    return '{:0.3f}'.format(value) if not np.isnan(value) else '-'
+
+
+class PafxDiff:
+    """
+    Differences between two .pafx models, patterns matched by name.
+
+    - added_patterns / removed_patterns: names only in the new / old model
+    - added_v_bands / removed_v_bands: virtual bands only in the new / old model
+    - v_band_changes: v_band key --> assignment changes (see ASSIGNMENT_CHANGES) as pattern name lists.
+      added / removed are patterns only in one of the models, reassigned_in / reassigned_out patterns
+      of both models attached to / detached from the virtual band, and beam_changed beamswitching
+      patterns whose angles changed by more than the angle tolerance. Beams are matched by pattern and
+      angles, so the beam ids renumbered when a beam is added or removed are not changes
+    - common: columns of the patterns of both models (name, old_id, new_id, horiz_max_delta, horiz_rms_delta,
+      vert_max_delta, vert_rms_delta)
+    - field_changes: pattern field --> mask of the common patterns whose field changed
+    """
+
+    def __init__(
+            self,
+            old: PafxModel,
+            new: PafxModel,
+            gain_tolerance: float = DIFF_DEFAULT_GAIN_TOLERANCE,
+            angle_tolerance: float = DIFF_DEFAULT_ANGLE_TOLERANCE,
+    ):
+        """
+        :param old: Reference model
+        :param new: Model compared with the reference
+        :param gain_tolerance: Gain deltas (dB) up to this value are not reported as changes
+        :param angle_tolerance: Beamswitching angle deltas (deg) up to this value are not reported as changes
+        """
+        self.old = old
+        self.new = new
+        self.gain_tolerance = gain_tolerance
+        self.angle_tolerance = angle_tolerance
+
+        self.added_patterns = [name for name in new.pattern_ids if name not in old.pattern_ids]
+        self.removed_patterns = [name for name in old.pattern_ids if name not in new.pattern_ids]
+
+        common_names = [name for name in old.pattern_ids if name in new.pattern_ids]
+        old_ids = np.array([old.pattern_ids[name] for name in common_names], dtype=np.int64)
+        new_ids = np.array([new.pattern_ids[name] for name in common_names], dtype=np.int64)
+        self.common: dict[str, np.ndarray] = {
+            'name': np.array(common_names, dtype=object),
+            'old_id': old_ids,
+            'new_id': new_ids,
+        }
+        for cut in ['horiz', 'vert']:
+            max_delta, rms_delta = get_gain_deltas(
+                getattr(old, cut + '_gains')[old_ids], getattr(new, cut + '_gains')[new_ids]
+            )
+            self.common[cut + '_max_delta'] = max_delta
+            self.common[cut + '_rms_delta'] = rms_delta
+
+        self.field_changes: dict[str, np.ndarray] = {
+            field: get_columns_changed(old.patterns[field][old_ids], new.patterns[field][new_ids])
+            for field in PATTERN_DIFF_FIELDS
+        }
+
+        old_v_band_keys = get_v_band_keys(old)
+        new_v_band_keys = get_v_band_keys(new)
+        old_v_band_key_set = set(old_v_band_keys)
+        new_v_band_key_set = set(new_v_band_keys)
+        self.added_v_bands = [key for key in new_v_band_keys if key not in old_v_band_key_set]
+        self.removed_v_bands = [key for key in old_v_band_keys if key not in new_v_band_key_set]
+        self.v_band_changes: dict[tuple, dict[str, list[str]]] = {}
+        self.diff_assignments()
+
+    def diff_assignments(self):
+        old_assignments = get_assignments(self.old)
+        new_assignments = get_assignments(self.new)
+
+        def push_change(key: tuple, change: str, count: int):
+            v_band_key, pattern_type, service_name, pattern_name = key
+            changes = self.v_band_changes.setdefault(v_band_key, {change: [] for change in ASSIGNMENT_CHANGES})
+            changes[change].extend([pattern_name] * count)
+
+        for key, new_beams in new_assignments.items():
+            num_moved, num_added, num_removed = match_beams(
+                old_assignments.get(key, []), new_beams, self.angle_tolerance
+            )
+            if num_added > 0:
+                push_change(key, 'reassigned_in' if key[3] in self.old.pattern_ids else 'added', num_added)
+            if num_moved > 0:
+                push_change(key, 'beam_changed', num_moved)
+            if num_removed > 0:
+                push_change(key, 'reassigned_out' if key[3] in self.new.pattern_ids else 'removed', num_removed)
+        for key, old_beams in old_assignments.items():
+            if key not in new_assignments:
+                push_change(key, 'reassigned_out' if key[3] in self.new.pattern_ids else 'removed', len(old_beams))
+
+    def get_gain_changed(self) -> np.ndarray:
+        """
+        :return: Mask of the common patterns with a gain delta above the tolerance, or a different number of gains
+        """
+        changed = self.field_changes['horiz_num_gains'] | self.field_changes['vert_num_gains']
+        for cut in ['horiz', 'vert']:
+            changed |= self.common[cut + '_max_delta'] > self.gain_tolerance
+        return changed
+
+    def get_changed_patterns(self) -> list[str]:
+        """
+        :return: Names of the common patterns whose metadata or gains changed
+        """
+        changed = self.get_gain_changed()
+        for field_changed in self.field_changes.values():
+            changed = changed | field_changed
+        return self.common['name'][changed].tolist()
+
+    @property
+    def has_changes(self) -> bool:
+        return (
+                len(self.added_patterns) > 0
+                or len(self.removed_patterns) > 0
+                or len(self.added_v_bands) > 0
+                or len(self.removed_v_bands) > 0
+                or len(self.v_band_changes) > 0
+                or len(self.get_changed_patterns()) > 0
+        )
+
+    def print_report(self, max_items: int = 20):
+        """
+        :param max_items: Names listed at most per section, the rest are only counted
+        """
+
+        def print_names(title: str, names: list, indent: str = ''):
+            if len(names) == 0:
+                return
+            print('{}{} ({}):'.format(indent, title, len(names)))
+            for name in names[:max_items]:
+                print('{}   {}'.format(indent, name))
+            if len(names) > max_items:
+                print('{}   ... {} more'.format(indent, len(names) - max_items))
+
+        print('')
+        print('===============================================================')
+        print('Patterns')
+        print('===============================================================')
+        print('{} old, {} new, {} in common'.format(
+            len(self.old.pattern_ids), len(self.new.pattern_ids), len(self.common['name']))
+        )
+        print_names('Added patterns', self.added_patterns)
+        print_names('Removed patterns', self.removed_patterns)
+
+        print('')
+        print('===============================================================')
+        print('Assignments')
+        print('===============================================================')
+        print_names('Added virtual bands', [format_v_band_key(key) for key in self.added_v_bands])
+        print_names('Removed virtual bands', [format_v_band_key(key) for key in self.removed_v_bands])
+        for v_band_key, changes in self.v_band_changes.items():
+            print('-> ' + format_v_band_key(v_band_key))
+            for change in ASSIGNMENT_CHANGES:
+                print_names(change.replace('_', ' ').capitalize(), changes[change], '   ')
+        if len(self.v_band_changes) == 0:
+            print('No assignment changes')
+
+        print('')
+        print('===============================================================')
+        print('Pattern changes')
+        print('===============================================================')
+        for field, field_changed in self.field_changes.items():
+            print_names(field, self.common['name'][field_changed].tolist())
+
+        gain_changed = np.flatnonzero(self.get_gain_changed())
+        max_delta = np.fmax(self.common['horiz_max_delta'], self.common['vert_max_delta'])[gain_changed]
+        # largest deltas first
+        gain_changed = gain_changed[np.argsort(-np.nan_to_num(max_delta, nan=np.inf), kind='stable')]
+        print('Gain changes above {:g} dB ({}):'.format(self.gain_tolerance, len(gain_changed)))
+        if len(gain_changed) > 0:
+            print('   {:<48} {:>10} {:>10} {:>10} {:>10}'.format('name', 'H max', 'H rms', 'V max', 'V rms'))
+        for i in gain_changed[:max_items]:
+            print('   {:<48} {:>10} {:>10} {:>10} {:>10}'.format(
+                self.common['name'][i],
+                *[format_delta(self.common[column][i]) for column in
+                  ['horiz_max_delta', 'horiz_rms_delta', 'vert_max_delta', 'vert_rms_delta']],
+            ))
+        if len(gain_changed) > max_items:
+            print('   ... {} more'.format(len(gain_changed) - max_items))
+
+
+def diff_pafx(
+        old_path: str,
+        new_path: str,
+        gain_tolerance: float = DIFF_DEFAULT_GAIN_TOLERANCE,
+        angle_tolerance: float = DIFF_DEFAULT_ANGLE_TOLERANCE,
+) -> PafxDiff:
+    """
+    :param old_path: Path of the reference .pafx file
+    :param new_path: Path of the .pafx file compared with the reference
+    :param gain_tolerance: Gain deltas (dB) up to this value are not reported as changes
+    :param angle_tolerance: Beamswitching angle deltas (deg) up to this value are not reported as changes
+    """
+    reader = PafxReader()
+    return PafxDiff(reader.read(old_path), reader.read(new_path), gain_tolerance, angle_tolerance)
+
+
+def main(args: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description='Compares two .pafx antenna models')
+    arg_parser.add_argument('old', help='Reference .pafx file')
+    arg_parser.add_argument('new', help='.pafx file compared with the reference')
+    arg_parser.add_argument(
+        '-t', '--tolerance', type=float, default=DIFF_DEFAULT_GAIN_TOLERANCE,
+        help='Gain deltas (dB) up to this value are not reported (default: {:g})'.format(DIFF_DEFAULT_GAIN_TOLERANCE),
+    )
+    arg_parser.add_argument(
+        '-a', '--angle-tolerance', type=float, default=DIFF_DEFAULT_ANGLE_TOLERANCE,
+        help='Beamswitching angle deltas (deg) up to this value are not reported (default: {:g})'.format(
+            DIFF_DEFAULT_ANGLE_TOLERANCE
+        ),
+    )
+    arg_parser.add_argument('-n', '--max-items', type=int, default=20, help='Names listed at most per section')
+    parsed_args = arg_parser.parse_args(args)
+
+    diff = diff_pafx(parsed_args.old, parsed_args.new, parsed_args.tolerance, parsed_args.angle_tolerance)
+    diff.print_report(parsed_args.max_items)
+
+    return 1 if diff.has_changes else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
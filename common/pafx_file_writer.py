@@ -1,23 +1,23 @@
+import contextlib
+import hashlib
 import json
 import os.path
-from random import random
-import tempfile
-from zipfile import ZipFile
-from xml.dom import minidom
-import xml.etree.ElementTree as ET
+from typing import BinaryIO, Iterable
+from zipfile import ZipFile, is_zipfile
+from .beamforming_assignments import BeamformingAssignments
+from .pafx_archive_writer import PafxArchiveWriter
+from .pafx_manifest import PafxManifest, PAFX_MANIFEST_ENTRY
 from .pattern_data import PapPatternData
-from .consts import PATTERN_TYPE__BROADCAST, PATTERN_TYPE__BEAMFORMING_ELEMENT, PATTERN_TYPE__BEAMSWITCHING_SERVICE, \
-    COMMENT_FINGERPRINT
+from .xml_stream_writer import XmlStreamWriter
+from .consts import COMMENT_FINGERPRINT
+
+PAF_XML_INDENT = '  '
 
 
 def xml_bool(value: bool) -> str:
     return 'true' if value else 'false'
 
 
-def add_rand_noise(v: float) -> float:
-    return round(v + (random() - 0.5) / 50, 5)
-
-
 class PafxFileWriter:
     uid_counter = 0
 
@@ -26,55 +26,172 @@ class PafxFileWriter:
             output_path: str,
             params: dict,
             patterns: list[dict],
-    ):
+            pap_patterns: Iterable[dict] | None = None,
+    ) -> bool:
+        """
+        I/O errors are reported (printed) instead of raised: the return value tells whether the file was written
+        :param output_path: Path of the .pafx file to generate
+        :param params: Generator params
+        :param patterns: Extracted patterns
+        :param pap_patterns: Patterns carrying the gain data, produced on demand (streaming mode). Defaults to patterns.
+                             In incremental mode, only the patterns whose .pap entry can't be reused are expected
+        """
         self.reset_uid_generator()
+        dedup_pap_files = params.get('dedup_pap_files', False)
+        incremental = params.get('incremental', False)
+        compress_level = params.get('pafx_compress_level')
+
+        # output file basename --> index of the pattern whose .pap entry is written under it. As when the entries
+        # were written to a folder, the last source file with a given basename replaces the previous ones
+        last_patterns = {pattern['output_file_basename']: i for i, pattern in enumerate(patterns)}
+        if len(last_patterns) < len(patterns):
+            print('[NOTICE] {} source files share their .pap entry name with a later one, which replaces them'.format(
+                len(patterns) - len(last_patterns)
+            ))
+
+        # output file basename --> .pap entry with the same content, written under another basename
+        pap_entry_names = {}
+        # pattern content digest --> .pap entry basename
+        pap_entries = {}
+
+        # incremental mode: unchanged entries are copied from the previous .pafx, the new one is written aside
+        previous_pafx = ZipFile(output_path) if incremental and is_zipfile(output_path) else None
+        previous_manifest = PafxManifest.read(previous_pafx, compress_level) if previous_pafx is not None else None
+        manifest = PafxManifest(compress_level) if incremental else None
+        write_path = output_path + '.tmp' if previous_pafx is not None else output_path
+        written = False
 
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            for pattern in patterns:
-                self.write_pap_file(os.path.join(tmp_dir, pattern['output_file_basename']), pattern)
-            self.write_beamforming_paf_file(os.path.join(tmp_dir, 'antenna.paf'), params, patterns)
-            self.generate_pafx(tmp_dir, output_path)
+        try:
+            with PafxArchiveWriter(write_path, compress_level) as pafx_file:
+                pap_patterns = iter(pap_patterns) if pap_patterns is not None else None
+                for i, pattern in enumerate(patterns):
+                    basename = pattern['output_file_basename']
+                    pap_digest = previous_manifest.get_pap_digest(pattern) if previous_manifest is not None else None
+                    reused = pap_digest is not None
+                    if not reused:
+                        pap_pattern = next(pap_patterns) if pap_patterns is not None else pattern
+                    if last_patterns[basename] != i:
+                        if manifest is not None:
+                            manifest.add_pattern(pattern)
+                        continue
+                    if not reused and (dedup_pap_files or incremental):
+                        pap_digest = self.get_pap_digest(pap_pattern)
+
+                    entry_name = basename
+                    if dedup_pap_files and pap_digest in pap_entries:
+                        entry_name = pap_entries[pap_digest]
+                        pap_entry_names[basename] = entry_name
+                    elif reused:
+                        pafx_file.copy_entry(basename, previous_pafx, previous_manifest.entries[pap_digest])
+                    else:
+                        pafx_file.write(basename, lambda f: self.write_pap_file(f, pap_pattern))
+                    if pap_digest is not None:
+                        pap_entries.setdefault(pap_digest, entry_name)
+                    if manifest is not None:
+                        manifest.add_pattern(pattern, pap_digest, entry_name)
+
+                pafx_file.write(
+                    'antenna.paf',
+                    lambda f: self.write_beamforming_paf_file(f, params, patterns, pap_entry_names),
+                )
+                if manifest is not None:
+                    pafx_file.write(PAFX_MANIFEST_ENTRY, lambda f: f.write(manifest.to_json().encode('utf-8')))
+
+            if previous_pafx is not None:
+                previous_pafx.close()
+                os.replace(write_path, output_path)
+            written = True
+            print('')
+            print('===============================================================')
+            print('The .pafx file was generated successfully')
+            print('--> ' + os.path.basename(output_path))
+            print('===============================================================')
 
-    def write_pap_file(self, path: str, pattern: dict):
+        except OSError as e:
+            print('')
+            print('===============================================================')
+            print('[Error] Could not generate .pafx file')
+            print('')
+            print('Details:')
+            print(e)
+            print('===============================================================')
+
+        finally:
+            if previous_pafx is not None:
+                previous_pafx.close()
+            # don't leave a partial archive next to the previous .pafx
+            if not written and write_path != output_path:
+                with contextlib.suppress(OSError):
+                    os.remove(write_path)
+
+        return written
+
+    @staticmethod
+    def get_pap_digest(pattern: dict) -> str:
+        """
+        Hash of the .pap content of a pattern (cut angles and gains), patterns with equal digests share one .pap entry
+        """
+        digest = hashlib.sha256()
+        for pap in (pattern['horiz_pap_pattern'], pattern['vert_pap_pattern']):
+            digest.update(repr((pap.inclination, pap.orientation, pap.start_angle, pap.end_angle, pap.step)).encode())
+            digest.update(pap.gains.tobytes())
+        return digest.hexdigest()
+
+    def write_pap_file(self, file: BinaryIO, pattern: dict, indent: str | None = PAF_XML_INDENT):
+        """
+        :param file: Binary stream the .pap entry is written to
+        :param pattern: Pattern carrying the gain data
+        :param indent: Indentation of the XML elements, None writes the document on a single line
+        """
         hp: PapPatternData = pattern['horiz_pap_pattern']
         vp: PapPatternData = pattern['vert_pap_pattern']
 
-        # build xml
-        antenna_patterns = ET.Element('AntennaPatterns')
-        antenna_patterns.set('xmlns:xsd', 'http://www.w3.org/2001/XMLSchema')
-        antenna_patterns.set('xmlns:xsi', 'http://www.w3.org/2001/XMLSchema-instance')
-
-        horizontal_patterns = ET.SubElement(antenna_patterns, 'HorizontalPatterns')
-        horizontal_pattern = ET.SubElement(horizontal_patterns, 'HorizontalPattern')
-        inclination = ET.SubElement(horizontal_pattern, 'Inclination')
-        inclination.text = str(hp.inclination)
-        start_angle = ET.SubElement(horizontal_pattern, 'StartAngle')
-        start_angle.text = str(hp.start_angle)
-        start_angle = ET.SubElement(horizontal_pattern, 'EndAngle')
-        start_angle.text = str(hp.end_angle)
-        start_angle = ET.SubElement(horizontal_pattern, 'Step')
-        start_angle.text = str(hp.step)
-        start_angle = ET.SubElement(horizontal_pattern, 'Gains')
-        start_angle.text = str(hp.gains)
-
-        vertical_patterns = ET.SubElement(antenna_patterns, 'VerticalPatterns')
-        vertical_pattern = ET.SubElement(vertical_patterns, 'VerticalPattern')
-        orientation = ET.SubElement(vertical_pattern, 'Orientation')
-        orientation.text = str(vp.orientation)
-        start_angle = ET.SubElement(vertical_pattern, 'StartAngle')
-        start_angle.text = str(vp.start_angle)
-        start_angle = ET.SubElement(vertical_pattern, 'EndAngle')
-        start_angle.text = str(vp.end_angle)
-        start_angle = ET.SubElement(vertical_pattern, 'Step')
-        start_angle.text = str(vp.step)
-        start_angle = ET.SubElement(vertical_pattern, 'Gains')
-        start_angle.text = str(vp.gains)
-
-        xmlstr = minidom.parseString(ET.tostring(antenna_patterns)).toprettyxml(indent="  ", encoding="utf-8")
-        with open(path, 'wb') as f:
-            f.write(xmlstr)
-
-    def write_beamforming_paf_file(self, path: str, params: dict, patterns: list[dict]):
+        # write xml
+        xml = XmlStreamWriter(file, indent)
+        xml.start('AntennaPatterns', {
+            'xmlns:xsd': 'http://www.w3.org/2001/XMLSchema',
+            'xmlns:xsi': 'http://www.w3.org/2001/XMLSchema-instance',
+        })
+
+        xml.start('HorizontalPatterns')
+        xml.start('HorizontalPattern')
+        xml.element('Inclination', str(hp.inclination))
+        xml.element('StartAngle', str(hp.start_angle))
+        xml.element('EndAngle', str(hp.end_angle))
+        xml.element('Step', str(hp.step))
+        xml.element('Gains', hp.serialize_gains())
+        xml.end()
+        xml.end()
+
+        xml.start('VerticalPatterns')
+        xml.start('VerticalPattern')
+        xml.element('Orientation', str(vp.orientation))
+        xml.element('StartAngle', str(vp.start_angle))
+        xml.element('EndAngle', str(vp.end_angle))
+        xml.element('Step', str(vp.step))
+        xml.element('Gains', vp.serialize_gains())
+        xml.end()
+        xml.end()
+
+        xml.close()
+
+    def write_beamforming_paf_file(
+            self,
+            file: BinaryIO,
+            params: dict,
+            patterns: list[dict],
+            pap_entry_names: dict[str, str] | None = None,
+            indent: str | None = PAF_XML_INDENT,
+    ):
+        """
+        :param file: Binary stream the antenna.paf entry is written to
+        :param params: Generator params
+        :param patterns: Extracted patterns
+        :param pap_entry_names: .pap entry of the patterns whose content is shared with another pattern, by output file basename
+        :param indent: Indentation of the XML elements, None writes the document on a single line
+        """
+        pap_entry_names = pap_entry_names or {}
+
         # create electrical controllers dictionary
         elec_controllers_dict = {
             0: {
@@ -84,411 +201,181 @@ class PafxFileWriter:
             }
         }
 
-        # build xml
-        antenna_model_se = ET.Element('AntennaModel')
-        antenna_model_se.set('xmlns:xsd', 'http://www.w3.org/2001/XMLSchema')
-        antenna_model_se.set('xmlns:xsi', 'http://www.w3.org/2001/XMLSchema-instance')
-
-        version_se = ET.SubElement(antenna_model_se, 'Version')
-        version_se.text = str(params['version'])
-
-        name_se = ET.SubElement(antenna_model_se, 'Name')
-        name_se.text = str(params['name'])
-
-        type_se = ET.SubElement(antenna_model_se, 'Type')
-        type_se.text = str(params['type'])
-
-        comment_se = ET.SubElement(antenna_model_se, 'Comment')
-        comment_se.text = COMMENT_FINGERPRINT + ' - ' + str(params['comment'])
-
-        manufacturer_se = ET.SubElement(antenna_model_se, 'Manufacturer')
-        manufacturer_se.text = str(params['manufacturer'])
-
-        cost_se = ET.SubElement(antenna_model_se, 'Cost')
-        cost_se.text = str(params['cost'])
-
-        cost_unit_se = ET.SubElement(antenna_model_se, 'CostUnit')
-        cost_unit_se.text = str(params['cost_unit'])
-
-        length_cm_se = ET.SubElement(antenna_model_se, 'LengthCm')
-        length_cm_se.text = str(params['length_cm'])
-
-        width_cm_se = ET.SubElement(antenna_model_se, 'WidthCm')
-        width_cm_se.text = str(params['width_cm'])
-
-        depth_cm_se = ET.SubElement(antenna_model_se, 'DepthCm')
-        depth_cm_se.text = str(params['depth_cm'])
-
-        weight_kg_se = ET.SubElement(antenna_model_se, 'WeightKg')
-        weight_kg_se.text = str(params['weight_kg'])
-
-        wind_load_factor_se = ET.SubElement(antenna_model_se, 'WindLoadFactor')
-        wind_load_factor_se.text = str(params['wind_load_factor'])
-
-        q_factor_db_se = ET.SubElement(antenna_model_se, 'QFactorDB')
-        q_factor_db_se.set('xsi:nil', 'true')
-
-        user_data2_se = ET.SubElement(antenna_model_se, 'UserData2')
-        user_data2_se.text = str(params['name'])
+        xml = XmlStreamWriter(file, indent)
+
+        # write xml
+        xml.start('AntennaModel', {
+            'xmlns:xsd': 'http://www.w3.org/2001/XMLSchema',
+            'xmlns:xsi': 'http://www.w3.org/2001/XMLSchema-instance',
+        })
+        xml.element('Version', str(params['version']))
+        xml.element('Name', str(params['name']))
+        xml.element('Type', str(params['type']))
+        xml.element('Comment', COMMENT_FINGERPRINT + ' - ' + str(params['comment']))
+        xml.element('Manufacturer', str(params['manufacturer']))
+        xml.element('Cost', str(params['cost']))
+        xml.element('CostUnit', str(params['cost_unit']))
+        xml.element('LengthCm', str(params['length_cm']))
+        xml.element('WidthCm', str(params['width_cm']))
+        xml.element('DepthCm', str(params['depth_cm']))
+        xml.element('WeightKg', str(params['weight_kg']))
+        xml.element('WindLoadFactor', str(params['wind_load_factor']))
+        xml.element('QFactorDB', attrs={'xsi:nil': 'true'})
+        xml.element('UserData2', str(params['name']))
 
         # add ports
-        ports_se = ET.SubElement(antenna_model_se, 'Ports')
+        xml.element('Ports')
 
         # add electrical controllers
         ec = elec_controllers_dict[0]
-        electrical_controllers_se = ET.SubElement(antenna_model_se, 'ElectricalControllers')
-        electrical_controller_se = ET.SubElement(electrical_controllers_se, 'ElectricalController')
-
-        uid_se = ET.SubElement(electrical_controller_se, 'Uid')
-        uid_se.text = self.get_uid()
-
-        name_se = ET.SubElement(electrical_controller_se, 'Name')
-        name_se.text = str(ec['name'])
-
-        supp_remote_control_se = ET.SubElement(electrical_controller_se, 'SupportsRemoteControl')
-        supp_remote_control_se.text = xml_bool(ec['supp_remote_control'])
+        xml.start('ElectricalControllers')
+        xml.start('ElectricalController')
+        xml.element('Uid', self.get_uid())
+        xml.element('Name', str(ec['name']))
+        xml.element('SupportsRemoteControl', xml_bool(ec['supp_remote_control']))
+        xml.end()
+        xml.end()
 
         # add patterns
-        patterns_se = ET.SubElement(antenna_model_se, 'Patterns')
+        xml.start('Patterns')
         for pat in patterns:
-            pattern_se = ET.SubElement(patterns_se, 'Pattern')
-
-            name_se = ET.SubElement(pattern_se, 'Name')
-            name_se.text = str(pat['name'])
-
-            comment_se = ET.SubElement(pattern_se, 'Comment')
-
-            min_freq_mhz_se = ET.SubElement(pattern_se, 'MinimumFrequencyMHz')
-            min_freq_mhz_se.text = str(pat['min_freq'])
-
-            max_freq_mhz_se = ET.SubElement(pattern_se, 'MaximumFrequencyMHz')
-            max_freq_mhz_se.text = str(pat['max_freq'])
-
-            meas_freq_mhz_se = ET.SubElement(pattern_se, 'MeasurementFrequencyMHz')
-            meas_freq_mhz_se.text = str(pat['center_freq'])
-
-            polarization_se = ET.SubElement(pattern_se, 'Polarization')
-            polarization_se.text = str(pat['polarization'])
-
+            xml.start('Pattern')
+            xml.element('Name', str(pat['name']))
+            xml.element('Comment')
+            xml.element('MinimumFrequencyMHz', str(pat['min_freq']))
+            xml.element('MaximumFrequencyMHz', str(pat['max_freq']))
+            xml.element('MeasurementFrequencyMHz', str(pat['center_freq']))
+            xml.element('Polarization', str(pat['polarization']))
             if pat['polarization_type'] is not None:
-                polarization_type_se = ET.SubElement(pattern_se, 'PolarizationType')
-                polarization_type_se.text = str(pat['polarization_type'])
-
-            elec_tilt_deg_se = ET.SubElement(pattern_se, 'ElectricalTiltDegrees')
-            elec_tilt_deg_se.text = str(pat['electrical_tilt'])
-
-            elec_az_deg_se = ET.SubElement(pattern_se, 'ElectricalAzimuthDegrees')
-            elec_az_deg_se.text = str(pat['electrical_azimuth'])
-
-            elec_beamwidth_deg_se = ET.SubElement(pattern_se, 'ElectricalBeamwidthDegrees')
-            elec_beamwidth_deg_se.text = str(pat['electrical_beamwidth'])
-
-            boresight_gain_se = ET.SubElement(pattern_se, 'BoresightGain')
-            boresight_gain_se.text = str(pat['boresight_gain'])
-
-            boresight_gain_unit_se = ET.SubElement(pattern_se, 'BoresightGainUnit')
-            boresight_gain_unit_se.text = str(pat['boresight_gain_unit'])
-
-            horiz_beamwidth_deg_se = ET.SubElement(pattern_se, 'HorizontalBeamwidthDegrees')
-            horiz_beamwidth_deg_se.text = str(pat['horiz_beamwidth_deg'])
-
-            vert_beamwidth_deg_se = ET.SubElement(pattern_se, 'VerticalBeamwidthDegrees')
-            vert_beamwidth_deg_se.text = str(pat['vert_beamwidth_deg'])
-
-            horiz_boresight_deg_se = ET.SubElement(pattern_se, 'HorizontalBoresightDegrees')
-            horiz_boresight_deg_se.text = str(pat['horiz_boresight_deg'])
-
-            vert_boresight_deg_se = ET.SubElement(pattern_se, 'VerticalBoresightDegrees')
-            vert_boresight_deg_se.text = str(pat['vert_boresight_deg'])
-
-            front_to_back_ratio_db_se = ET.SubElement(pattern_se, 'FrontToBackRatioDB')
-            front_to_back_ratio_db_se.text = str(pat['front_to_back_ratio_db'])
-
-            antenna_pattern_entry_name_se = ET.SubElement(pattern_se, 'AntennaPatternsEntryName')
-            antenna_pattern_entry_name_se.text = str(pat['output_file_basename'])
-
-        # group data by scenario > virtual port > virtual band
-        scenarios = {}
-        for pattern in patterns:
-            scenario = pattern['scenario']
-            v_port_name = pattern['v_port_name']
-            min_freq = pattern['min_freq']
-            max_freq = pattern['max_freq']
-            v_band_name = str(min_freq) + '-' + str(max_freq)
-            pattern_type = pattern['pattern_type']
-            pattern_name = pattern['name']
-            beamswitching_service_name = pattern['beamswitching_service_name']
-
-            # if any extracted param is missing, the pattern cannot yet be assigned;>
-            # it must be assigned considering selected params in the next loop
-            if scenario is None or v_port_name is None:
-                continue
-
-            if scenario not in scenarios:
-                scenarios[scenario] = {
-                    'uid': self.get_uid(),
-                    'name': scenario,
-                    'horiz_number_of_elements': pattern['horiz_number_of_elements'],
-                    'horiz_sep_dist_cm': pattern['horiz_sep_dist_cm'],
-                    'vert_number_of_elements': pattern['vert_number_of_elements'],
-                    'vert_sep_dist_cm': pattern['vert_sep_dist_cm'],
-                    'v_ports': {},
-                    'is_beamswitching': True,
-                }
-            if v_port_name not in scenarios[scenario]['v_ports']:
-                scenarios[scenario]['v_ports'][v_port_name] = {
-                    'uid': self.get_uid(),
-                    'name': v_port_name,
-                    'number_of_ports': pattern['v_port_number_of_ports'],
-                    'polarization': pattern['polarization'],
-                    'polarization_type': pattern['polarization_type'],
-                    'v_bands': {},
-                }
-            if v_band_name not in scenarios[scenario]['v_ports'][v_port_name]['v_bands']:
-                scenarios[scenario]['v_ports'][v_port_name]['v_bands'][v_band_name] = {
-                    'min_freq': pattern['min_freq'],
-                    'max_freq': pattern['max_freq'],
-                    'supp_elec_tilt': params['supp_elec_tilt'],
-                    'supp_elec_azimuth': params['supp_elec_azimuth'],
-                    'supp_elec_beamwidth': params['supp_elec_beamwidth'],
-                    'cont_adj_elec_tilt': params['cont_adj_elec_tilt'],
-                    'broadcast_patterns': [],
-                    'electrical_controller_name': elec_controllers_dict[0]['name'],
-                    'use_elec_params_for_bs_service_patterns': True,
-                    'beamforming_element_patterns': [],
-                    'beamswitching_service_patterns': {},
-                }
-            v_band = scenarios[scenario]['v_ports'][v_port_name]['v_bands'][v_band_name]
-
-            if pattern_type == PATTERN_TYPE__BROADCAST:
-                v_band['broadcast_patterns'].append(pattern_name)
-            if pattern_type == PATTERN_TYPE__BEAMFORMING_ELEMENT:
-                v_band['beamforming_element_patterns'].append(pattern_name)
-            if pattern_type == PATTERN_TYPE__BEAMSWITCHING_SERVICE:
-                if beamswitching_service_name not in v_band['beamswitching_service_patterns']:
-                    v_band['beamswitching_service_patterns'][beamswitching_service_name] = []
-                v_band['beamswitching_service_patterns'][beamswitching_service_name].append({
-                    # Add random noise to avoid Planet "same parameters" error
-                    'horiz_angle': add_rand_noise(pattern['beamswitching_horiz_angle']),
-                    # Add random noise to avoid Planet "same parameters" error
-                    'vert_angle': add_rand_noise(pattern['beamswitching_vert_angle']),
-                    'pattern_name': pattern_name,
-                })
-
-        # assign selected params
-        for pattern in patterns:
-            extracted_scenario = pattern['scenario']
-            extracted_v_port_name = pattern['v_port_name']
-            selected_scenarios = pattern['selected_scenarios']
-            selected_v_port_names = pattern['selected_v_port_names']
-
-            min_freq = pattern['min_freq']
-            max_freq = pattern['max_freq']
-            v_band_name = str(min_freq) + '-' + str(max_freq)
-            pattern_type = pattern['pattern_type']
-            pattern_name = pattern['name']
-            beamswitching_service_name = pattern['beamswitching_service_name']
-
-            if len(selected_scenarios) == 0 and len(selected_v_port_names) == 0:
-                # No selected params --> ignore
-                continue
-
-            pattern_scenarios = selected_scenarios + (
-                [extracted_scenario] if extracted_scenario is not None else []
-            )
-            pattern_v_port_names = selected_v_port_names + (
-                [extracted_v_port_name] if extracted_v_port_name is not None else []
+                xml.element('PolarizationType', str(pat['polarization_type']))
+            xml.element('ElectricalTiltDegrees', str(pat['electrical_tilt']))
+            xml.element('ElectricalAzimuthDegrees', str(pat['electrical_azimuth']))
+            xml.element('ElectricalBeamwidthDegrees', str(pat['electrical_beamwidth']))
+            xml.element('BoresightGain', str(pat['boresight_gain']))
+            xml.element('BoresightGainUnit', str(pat['boresight_gain_unit']))
+            xml.element('HorizontalBeamwidthDegrees', str(pat['horiz_beamwidth_deg']))
+            xml.element('VerticalBeamwidthDegrees', str(pat['vert_beamwidth_deg']))
+            xml.element('HorizontalBoresightDegrees', str(pat['horiz_boresight_deg']))
+            xml.element('VerticalBoresightDegrees', str(pat['vert_boresight_deg']))
+            xml.element('FrontToBackRatioDB', str(pat['front_to_back_ratio_db']))
+            xml.element(
+                'AntennaPatternsEntryName',
+                str(pap_entry_names.get(pat['output_file_basename'], pat['output_file_basename'])),
             )
+            xml.end()
+        xml.end()
 
-            for scenario in pattern_scenarios:
-                if not scenario in scenarios:
-                    continue
-                for v_port_name in pattern_v_port_names:
-                    if not v_port_name in scenarios[scenario]['v_ports']:
-                        continue
+        self.write_beamforming_configurations(xml, params, patterns, elec_controllers_dict)
+        xml.close()
 
-                    v_band = scenarios[scenario]['v_ports'][v_port_name]['v_bands'][v_band_name]
-
-                    if (
-                            pattern_type == PATTERN_TYPE__BROADCAST
-                            and pattern_name not in v_band['broadcast_patterns']
-                    ):
-                        v_band['broadcast_patterns'].append(pattern_name)
-
-                    if (
-                            pattern_type == PATTERN_TYPE__BEAMFORMING_ELEMENT
-                            and pattern_name not in v_band['beamforming_element_patterns']
-                    ):
-                        v_band['beamforming_element_patterns'].append(pattern_name)
-
-                    if pattern_type == PATTERN_TYPE__BEAMSWITCHING_SERVICE:
-                        if beamswitching_service_name not in v_band['beamswitching_service_patterns']:
-                            v_band['beamswitching_service_patterns'][beamswitching_service_name] = []
-                        v_band['beamswitching_service_patterns'][beamswitching_service_name].append({
-                            # Add random noise to avoid Planet "same parameters" error
-                            'horiz_angle': add_rand_noise(pattern['beamswitching_horiz_angle']),
-                            # Add random noise to avoid Planet "same parameters" error
-                            'vert_angle': add_rand_noise(pattern['beamswitching_vert_angle']),
-                            'pattern_name': pattern_name,
-                        })
+    def write_beamforming_configurations(
+            self,
+            xml: XmlStreamWriter,
+            params: dict,
+            patterns: list[dict],
+            elec_controllers_dict: dict,
+    ):
+        """
+        Assigns the patterns to scenario > virtual port > virtual band and writes the Beamforming section
+        """
+        assignments = BeamformingAssignments(params, patterns, elec_controllers_dict[0]['name'], self.get_uid)
+        scenarios = assignments.scenarios
 
         # log assignments
-        print()
-        print('===============================================================')
-        print('Scenario > Virutal port > Virutal band > Pattern assignments')
-        print('===============================================================')
-        print(json.dumps(scenarios, indent=2))
+        if params.get('print_assignments', False):
+            print()
+            print('===============================================================')
+            print('Scenario > Virutal port > Virutal band > Pattern assignments')
+            print('===============================================================')
+            print(json.dumps(scenarios, indent=2))
 
         # add beamforming configurations
-        beamforming_se = ET.SubElement(antenna_model_se, 'Beamforming')
+        xml.start('Beamforming')
 
         for beamforming_config_key in scenarios.keys():
             beamforming_config = scenarios[beamforming_config_key]
 
-            beamforming_config_se = ET.SubElement(beamforming_se, 'BeamformingConfiguration')
-
-            uid_se = ET.SubElement(beamforming_config_se, 'Uid')
-            uid_se.text = beamforming_config['uid']
-
-            name_se = ET.SubElement(beamforming_config_se, 'Name')
-            name_se.text = beamforming_config['name']
-
-            horiz_number_of_elements_se = ET.SubElement(beamforming_config_se, 'HorizontalNumberOfElements')
-            horiz_number_of_elements_se.text = str(beamforming_config['horiz_number_of_elements'])
-
-            horiz_sep_dist_cm_se = ET.SubElement(beamforming_config_se, 'HorizontalSeparationDistanceCm')
-            horiz_sep_dist_cm_se.text = str(beamforming_config['horiz_sep_dist_cm'])
-
-            vert_number_of_elements_se = ET.SubElement(beamforming_config_se, 'VerticalNumberOfElements')
-            vert_number_of_elements_se.text = str(beamforming_config['vert_number_of_elements'])
-
-            vert_sep_dist_cm_se = ET.SubElement(beamforming_config_se, 'VerticalSeparationDistanceCm')
-            vert_sep_dist_cm_se.text = str(beamforming_config['vert_sep_dist_cm'])
-
-            v_ports_se = ET.SubElement(beamforming_config_se, 'VirtualPorts')
-
-            is_beamswitching_se = ET.SubElement(beamforming_config_se, 'IsBeamswitching')
-            is_beamswitching_se.text = xml_bool(beamforming_config['is_beamswitching'])
+            xml.start('BeamformingConfiguration')
+            xml.element('Uid', beamforming_config['uid'])
+            xml.element('Name', beamforming_config['name'])
+            xml.element('HorizontalNumberOfElements', str(beamforming_config['horiz_number_of_elements']))
+            xml.element('HorizontalSeparationDistanceCm', str(beamforming_config['horiz_sep_dist_cm']))
+            xml.element('VerticalNumberOfElements', str(beamforming_config['vert_number_of_elements']))
+            xml.element('VerticalSeparationDistanceCm', str(beamforming_config['vert_sep_dist_cm']))
 
             # add virtual ports
+            xml.start('VirtualPorts')
             for v_port_key in beamforming_config['v_ports'].keys():
                 v_port = beamforming_config['v_ports'][v_port_key]
 
-                v_port_se = ET.SubElement(v_ports_se, 'VirtualPort')
-
-                uid_se = ET.SubElement(v_port_se, 'Uid')
-                uid_se.text = v_port['uid']
-
-                name_se = ET.SubElement(v_port_se, 'Name')
-                name_se.text = v_port['name']
-
-                number_of_ports_se = ET.SubElement(v_port_se, 'NumberOfPorts')
-                number_of_ports_se.text = str(v_port['number_of_ports'])
-
-                polarization_se = ET.SubElement(v_port_se, 'Polarization')
-                polarization_se.text = v_port['polarization']
-
+                xml.start('VirtualPort')
+                xml.element('Uid', v_port['uid'])
+                xml.element('Name', v_port['name'])
+                xml.element('NumberOfPorts', str(v_port['number_of_ports']))
+                xml.element('Polarization', v_port['polarization'])
                 if v_port['polarization_type'] is not None:
-                    polarization_type_se = ET.SubElement(v_port_se, 'PolarizationType')
-                    polarization_type_se.text = v_port['polarization_type']
-
-                v_bands_se = ET.SubElement(v_port_se, 'VirtualBands')
+                    xml.element('PolarizationType', v_port['polarization_type'])
 
                 # add virtual bands
+                xml.start('VirtualBands')
                 for v_band_key in v_port['v_bands'].keys():
                     v_band = v_port['v_bands'][v_band_key]
 
-                    v_band_se = ET.SubElement(v_bands_se, 'VirtualBand')
-
-                    min_freq_se = ET.SubElement(v_band_se, 'MinimumFrequencyMHz')
-                    min_freq_se.text = str(v_band['min_freq'])
-
-                    max_freq_se = ET.SubElement(v_band_se, 'MaximumFrequencyMHz')
-                    max_freq_se.text = str(v_band['max_freq'])
-
-                    supp_elec_tilt_se = ET.SubElement(v_band_se, 'SupportsElectricalTilt')
-                    supp_elec_tilt_se.text = xml_bool(v_band['supp_elec_tilt'])
-
-                    supp_elec_azimuth_se = ET.SubElement(v_band_se, 'SupportsElectricalAzimuth')
-                    supp_elec_azimuth_se.text = xml_bool(v_band['supp_elec_azimuth'])
-
-                    supp_elec_beamwidth_se = ET.SubElement(v_band_se, 'SupportsElectricalBeamwidth')
-                    supp_elec_beamwidth_se.text = xml_bool(v_band['supp_elec_beamwidth'])
-
-                    cont_adj_elec_tilt_se = ET.SubElement(v_band_se, 'ContinuouslyAdjustableElectricalTilt')
-                    cont_adj_elec_tilt_se.text = xml_bool(v_band['cont_adj_elec_tilt'])
-
-                    broadcast_patterns_se = ET.SubElement(v_band_se, 'AttachedBroadcastPatterns')
-
-                    electrical_controller_name_se = ET.SubElement(v_band_se, 'ElectricalControllerName')
-                    electrical_controller_name_se.text = v_band['electrical_controller_name']
-
-                    use_elec_params_for_bs_service_patterns_se = (
-                        ET.SubElement(v_band_se, 'UseElectricalParametersForBeamswitchingServicePatterns')
-                    )
-                    use_elec_params_for_bs_service_patterns_se.text = xml_bool(
-                        v_band['use_elec_params_for_bs_service_patterns']
-                    )
-
-                    beamforming_element_patterns_se = ET.SubElement(v_band_se, 'AttachedBeamformingElementPatterns')
-
-                    beamswitching_service_patterns_se = ET.SubElement(v_band_se, 'AttachedBeamswitchingServicePatterns')
+                    xml.start('VirtualBand')
+                    xml.element('MinimumFrequencyMHz', str(v_band['min_freq']))
+                    xml.element('MaximumFrequencyMHz', str(v_band['max_freq']))
+                    xml.element('SupportsElectricalTilt', xml_bool(v_band['supp_elec_tilt']))
+                    xml.element('SupportsElectricalAzimuth', xml_bool(v_band['supp_elec_azimuth']))
+                    xml.element('SupportsElectricalBeamwidth', xml_bool(v_band['supp_elec_beamwidth']))
+                    xml.element('ContinuouslyAdjustableElectricalTilt', xml_bool(v_band['cont_adj_elec_tilt']))
 
                     # add patterns
+                    xml.start('AttachedBroadcastPatterns')
                     for pattern in v_band['broadcast_patterns']:
-                        pattern_se = ET.SubElement(broadcast_patterns_se, 'PatternName')
-                        pattern_se.text = pattern
+                        xml.element('PatternName', pattern)
+                    xml.end()
 
+                    xml.element('ElectricalControllerName', v_band['electrical_controller_name'])
+                    xml.element(
+                        'UseElectricalParametersForBeamswitchingServicePatterns',
+                        xml_bool(v_band['use_elec_params_for_bs_service_patterns']),
+                    )
+
+                    xml.start('AttachedBeamformingElementPatterns')
                     for pattern in v_band['beamforming_element_patterns']:
-                        pattern_se = ET.SubElement(beamforming_element_patterns_se, 'string')
-                        pattern_se.text = pattern
+                        xml.element('string', pattern)
+                    xml.end()
 
+                    xml.start('AttachedBeamswitchingServicePatterns')
                     for beamswitching_service_name in v_band['beamswitching_service_patterns'].keys():
-                        beamswitching_service_pattern_se = ET.SubElement(beamswitching_service_patterns_se,
-                                                                         'BeamswitchingServicePattern')
-                        service_pattern_name_se = ET.SubElement(beamswitching_service_pattern_se, 'ServicePatternName')
-                        service_pattern_name_se.text = beamswitching_service_name
-                        service_patterns_se = ET.SubElement(beamswitching_service_pattern_se, 'ServicePatterns')
+                        xml.start('BeamswitchingServicePattern')
+                        xml.element('ServicePatternName', beamswitching_service_name)
+                        xml.start('ServicePatterns')
 
                         beam_id_counter = 0
                         for pattern in v_band['beamswitching_service_patterns'][beamswitching_service_name]:
-                            beamswitchting_pattern_se = ET.SubElement(service_patterns_se, 'BeamswitchingPattern')
-                            beam_id_se = ET.SubElement(beamswitchting_pattern_se, 'BeamID')
                             beam_id_counter += 1
-                            beam_id_se.text = str(beam_id_counter)
-                            horiz_angle_se = ET.SubElement(beamswitchting_pattern_se, 'HorizontalAngle')
-                            horiz_angle_se.text = str(pattern['horiz_angle'])
-                            vert_angle_se = ET.SubElement(beamswitchting_pattern_se, 'VerticalAngle')
-                            vert_angle_se.text = str(pattern['vert_angle'])
-                            pattern_name_se = ET.SubElement(beamswitchting_pattern_se, 'BeamswitchingPatternName')
-                            pattern_name_se.text = pattern['pattern_name']
-
-        xmlstr = minidom.parseString(ET.tostring(antenna_model_se)).toprettyxml(indent="  ", encoding="utf-8")
-        with open(path, 'wb') as f:
-            f.write(xmlstr)
+                            xml.start('BeamswitchingPattern')
+                            xml.element('BeamID', str(beam_id_counter))
+                            xml.element('HorizontalAngle', str(pattern['horiz_angle']))
+                            xml.element('VerticalAngle', str(pattern['vert_angle']))
+                            xml.element('BeamswitchingPatternName', pattern['pattern_name'])
+                            xml.end()
 
-    @staticmethod
-    def generate_pafx(src_dir: str, output_path: str):
-        try:
-            with ZipFile(output_path, 'w') as zipObj:
-                for folder_name, sub_folders, file_names in os.walk(src_dir):
-                    for file_name in file_names:
-                        file_path = os.path.join(folder_name, file_name)
-                        zipObj.write(file_path, os.path.basename(file_path))
-            print('')
-            print('===============================================================')
-            print('The .pafx file was generated successfully')
-            print('--> ' + os.path.basename(output_path))
-            print('===============================================================')
+                        xml.end()
+                        xml.end()
+                    xml.end()
 
-        except Exception as e:
-            print('')
-            print('===============================================================')
-            print('[Error] Could not generate .pafx file')
-            print('')
-            print('Details:')
-            print(e)
-            print('===============================================================')
+                    xml.end()
+                xml.end()
+
+                xml.end()
+            xml.end()
+
+            xml.element('IsBeamswitching', xml_bool(beamforming_config['is_beamswitching']))
+            xml.end()
+
+        xml.end()
 
     def get_uid(self) -> str:
         self.uid_counter += 1
@@ -0,0 +1,123 @@
+import json
+import zipfile
+
+import numpy as np
+
+from .msi_parser import MSI_PARSER_VERSION
+from .pattern_gains_parser import PATTERN_GAINS_PARSER_VERSION
+
+# Name of the manifest entry inside the .pafx archive
+PAFX_MANIFEST_ENTRY = 'manifest.json'
+
+# Bump whenever the .pap serialization or the recorded pattern values change, so that previous ones are not reused
+PAFX_MANIFEST_VERSION = 2
+
+# Pattern values computed by the parser, recorded so that unchanged source files are not parsed again
+PAFX_MANIFEST_PAYLOAD_FIELDS = [
+    'boresight_gain',
+    'boresight_gain_unit',
+    'horiz_beamwidth_deg',
+    'vert_beamwidth_deg',
+    'horiz_boresight_deg',
+    'vert_boresight_deg',
+    'front_to_back_ratio_db',
+]
+
+
+def to_json_value(value):
+    """
+    numpy scalars (gain analysis results) as Python numbers
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+class PafxManifest:
+    """
+    Manifest embedded in .pafx files generated in incremental mode. For every
+    source file it records its hash, the values computed from its content (gain
+    analysis results and payload extractor values) and the digest of its .pap
+    content, and for every .pap content digest the archive entry holding it.
+    """
+
+    def __init__(self, compress_level: int | None = None):
+        """
+        :param compress_level: DEFLATE level of the archive entries, None if stored uncompressed
+        """
+        self.version = f'{PAFX_MANIFEST_VERSION}.{MSI_PARSER_VERSION}.{PATTERN_GAINS_PARSER_VERSION}'
+        self.compress_level = compress_level
+        # source file --> {'src_digest': str, 'pap_digest': str | None, 'payload': dict, 'payload_values': dict}
+        self.patterns: dict[str, dict] = {}
+        # .pap content digest --> archive entry name
+        self.entries: dict[str, str] = {}
+
+    def add_pattern(self, pattern: dict, pap_digest: str | None = None, entry_name: str | None = None):
+        """
+        :param pattern: Pattern processed in incremental mode (with its src_digest and payload_values)
+        :param pap_digest: Digest of its .pap content, None if no entry was written for it
+        :param entry_name: Archive entry holding its .pap content
+        """
+        self.patterns[pattern['src_file']] = {
+            'src_digest': pattern['src_digest'],
+            'pap_digest': pap_digest,
+            'payload': {field: pattern[field] for field in PAFX_MANIFEST_PAYLOAD_FIELDS},
+            'payload_values': pattern['payload_values'],
+        }
+        if pap_digest is not None:
+            self.entries.setdefault(pap_digest, entry_name)
+
+    def get_pattern(self, src_file: str, src_digest: str) -> dict | None:
+        """
+        Recorded values of a source file that did not change since this manifest was written, and whose .pap entry
+        can be reused, else None
+        """
+        previous = self.patterns.get(src_file)
+        if previous is None or previous['src_digest'] != src_digest or previous['pap_digest'] not in self.entries:
+            return None
+        return previous
+
+    def get_pap_digest(self, pattern: dict) -> str | None:
+        """
+        .pap content digest of a pattern whose source file did not change since this manifest was written, else None
+        """
+        previous = self.get_pattern(pattern['src_file'], pattern['src_digest'])
+        return previous['pap_digest'] if previous is not None else None
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'version': self.version,
+            'compress_level': self.compress_level,
+            'patterns': self.patterns,
+            'entries': self.entries,
+        }, indent=1, default=to_json_value)
+
+    @staticmethod
+    def read(pafx_file: zipfile.ZipFile, compress_level: int | None) -> 'PafxManifest | None':
+        """
+        Reads the manifest of a previously generated .pafx. Returns None if there is no manifest, or if its entries
+        can't be reused (written by other parser versions or with another compression level).
+        :param pafx_file: Previous .pafx archive
+        :param compress_level: DEFLATE level of the archive being generated
+        """
+        try:
+            data = json.loads(pafx_file.read(PAFX_MANIFEST_ENTRY))
+        except (KeyError, ValueError):
+            return None
+
+        manifest = PafxManifest(compress_level)
+        if data.get('version') != manifest.version or data.get('compress_level') != compress_level:
+            return None
+        manifest.patterns = data['patterns']
+        manifest.entries = data['entries']
+        return manifest
+
+    @staticmethod
+    def read_file(path: str, compress_level: int | None) -> 'PafxManifest | None':
+        """
+        Same as read(), from the path of the previous .pafx. Returns None if there is no such archive
+        """
+        if not zipfile.is_zipfile(path):
+            return None
+        with zipfile.ZipFile(path) as pafx_file:
+            return PafxManifest.read(pafx_file, compress_level)
@@ -0,0 +1,359 @@
+import math
+import xml.etree.ElementTree as ET
+import zlib
+from zipfile import BadZipFile, ZipFile, ZipInfo, ZIP_DEFLATED, ZIP_STORED
+
+import numpy as np
+
+from .consts import PATTERN_TYPE__BROADCAST, PATTERN_TYPE__BEAMFORMING_ELEMENT, PATTERN_TYPE__BEAMSWITCHING_SERVICE
+from .pafx_archive_writer import read_raw_entry
+from .pap_parser import PapParser
+from .pattern_data import PapData, PapPatternData
+
+# Name of the model entry inside the .pafx archive
+PAF_ENTRY = 'antenna.paf'
+
+# <Pattern> element --> (pattern field, numeric)
+PAF_PATTERN_FIELDS = {
+    'Name': ('name', False),
+    'MinimumFrequencyMHz': ('min_freq', True),
+    'MaximumFrequencyMHz': ('max_freq', True),
+    'MeasurementFrequencyMHz': ('center_freq', True),
+    'Polarization': ('polarization', False),
+    'PolarizationType': ('polarization_type', False),
+    'ElectricalTiltDegrees': ('electrical_tilt', True),
+    'ElectricalAzimuthDegrees': ('electrical_azimuth', True),
+    'ElectricalBeamwidthDegrees': ('electrical_beamwidth', True),
+    'BoresightGain': ('boresight_gain', True),
+    'BoresightGainUnit': ('boresight_gain_unit', False),
+    'HorizontalBeamwidthDegrees': ('horiz_beamwidth_deg', True),
+    'VerticalBeamwidthDegrees': ('vert_beamwidth_deg', True),
+    'HorizontalBoresightDegrees': ('horiz_boresight_deg', True),
+    'VerticalBoresightDegrees': ('vert_boresight_deg', True),
+    'FrontToBackRatioDB': ('front_to_back_ratio_db', True),
+    'AntennaPatternsEntryName': ('entry_name', False),
+}
+
+# .pap cut element --> cut field
+PAP_CUT_FIELDS = {
+    b'Inclination': 'inclination',
+    b'Orientation': 'orientation',
+    b'StartAngle': 'start_angle',
+    b'EndAngle': 'end_angle',
+    b'Step': 'step',
+}
+
+
+def to_float(text: str | None) -> float:
+    """
+    Numeric value of an element, NaN if it is empty or not a number (e.g. 'None' for a missing value)
+    """
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def to_columns(rows: list[dict], fields: dict[str, bool]) -> dict[str, np.ndarray]:
+    """
+    :param rows: Records
+    :param fields: Field --> numeric. Numeric columns are float64 (NaN if missing), the others object arrays
+    """
+    columns = {}
+    for field, numeric in fields.items():
+        values = [row.get(field) for row in rows]
+        if numeric:
+            columns[field] = np.array([to_float(value) for value in values], dtype=np.float64)
+        else:
+            columns[field] = np.empty(len(values), dtype=object)
+            columns[field][:] = values
+    return columns
+
+
+def parse_gains(texts: list[bytes]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Converts the gains of many cuts at once
+    :param texts: ';' separated gains of each cut
+    :return: Gain matrix (one row per cut, padded with NaN) and number of gains of each cut
+    """
+    num_gains = np.array([text.count(b';') + 1 for text in texts], dtype=np.int64)
+    values = np.array(b';'.join(texts).decode('ascii').split(';'), dtype=np.float64)
+
+    gains = np.full((len(texts), int(num_gains.max(initial=0))), np.nan)
+    gains[np.arange(gains.shape[1]) < num_gains[:, None]] = values
+    return gains, num_gains
+
+
+class PafxModel:
+    """
+    Contents of a .pafx archive, as arrays.
+
+    Every table is a dict of columns (field --> array with one row per record):
+    - patterns: one row per <Pattern> of antenna.paf, with the .pap cut geometry
+      (horiz_start_angle, vert_step, ...) and number of gains (horiz_num_gains, ...)
+    - scenarios: one row per beamforming configuration
+    - v_ports: one row per virtual port, scenario_id is its scenarios row
+    - v_bands: one row per virtual band, v_port_id is its v_ports row
+    - assignments: one row per pattern attached to a virtual band, v_band_id is its
+      v_bands row and pattern_id its patterns row (-1 if the pattern is missing)
+    The gains of the cuts are kept in matrices, one row per pattern.
+    """
+
+    def __init__(self):
+        # scalar elements of AntennaModel (Version, Name, Manufacturer, ...)
+        self.header: dict[str, str | None] = {}
+        self.electrical_controllers: list[dict[str, str | None]] = []
+        self.patterns: dict[str, np.ndarray] = {}
+        self.scenarios: dict[str, np.ndarray] = {}
+        self.v_ports: dict[str, np.ndarray] = {}
+        self.v_bands: dict[str, np.ndarray] = {}
+        self.assignments: dict[str, np.ndarray] = {}
+        # (patterns, max number of gains) matrices, padded with NaN
+        self.horiz_gains = np.empty((0, 0))
+        self.vert_gains = np.empty((0, 0))
+        # pattern name --> patterns row
+        self.pattern_ids: dict[str, int] = {}
+
+    @property
+    def num_patterns(self) -> int:
+        return len(self.horiz_gains)
+
+    def get_pap_data(self, pattern_id: int) -> PapData:
+        """
+        Cuts of a pattern, e.g. to plot them with pattern_visualizer.plot_patterns
+        """
+        data = PapData()
+        data.horiz_pap_pattern = self.get_pap_pattern(pattern_id, 'horiz')
+        data.vert_pap_pattern = self.get_pap_pattern(pattern_id, 'vert')
+        return data
+
+    def get_pap_pattern(self, pattern_id: int, cut: str) -> PapPatternData:
+        pattern = PapPatternData()
+        for field in PAP_CUT_FIELDS.values():
+            value = self.patterns[cut + '_' + field][pattern_id]
+            setattr(pattern, field, int(value) if not math.isnan(value) else None)
+        gains = self.horiz_gains if cut == 'horiz' else self.vert_gains
+        pattern.gains = gains[pattern_id, :self.patterns[cut + '_num_gains'][pattern_id]].copy()
+        return pattern
+
+
+class PafxReader:
+    """
+    Loads a generated .pafx (model and every .pap entry) straight from the archive,
+    without extracting it and without the source pattern files.
+
+    antenna.paf is read with iterparse, clearing each record once converted. The
+    .pap entries are read in archive order, their fields are located without
+    building the XML tree (PapParser.scan_cut_fields), and the gains of all the
+    cuts are converted to floats in a single call. Entries shared by several
+    patterns (dedup_pap_files) are read once.
+    """
+
+    def __init__(self):
+        self.pap_parser = PapParser()
+
+    def read(self, path: str) -> PafxModel:
+        """
+        :param path: Path of the .pafx file
+        """
+        model = PafxModel()
+        with ZipFile(path) as zip_file:
+            with zip_file.open(PAF_ENTRY) as paf_file:
+                self.read_paf(paf_file, model)
+            self.read_pap_entries(zip_file, model)
+        return model
+
+    def read_paf(self, paf_file, model: PafxModel):
+        patterns = []
+        scenarios = []
+        v_ports = []
+        v_bands = []
+        assignments = []
+
+        root = None
+        for event, elem in ET.iterparse(paf_file):
+            if elem.tag == 'Pattern':
+                fields = {child.tag: child.text for child in elem}
+                patterns.append({
+                    field: fields.get(tag) for tag, (field, numeric) in PAF_PATTERN_FIELDS.items()
+                })
+                elem.clear()
+            elif elem.tag == 'ElectricalController':
+                model.electrical_controllers.append({child.tag: child.text for child in elem})
+                elem.clear()
+            elif elem.tag == 'BeamformingConfiguration':
+                self.read_beamforming_configuration(elem, scenarios, v_ports, v_bands, assignments)
+                elem.clear()
+            # the last element to end is the root
+            root = elem
+
+        for child in root:
+            if len(child) == 0 and child.tag not in ('Ports', 'Patterns', 'ElectricalControllers', 'Beamforming'):
+                model.header[child.tag] = child.text
+
+        model.patterns = to_columns(patterns, dict(PAF_PATTERN_FIELDS.values()))
+        model.pattern_ids = {}
+        for i, name in enumerate(model.patterns['name']):
+            model.pattern_ids.setdefault(name, i)
+
+        model.scenarios = to_columns(scenarios, {
+            'uid': False,
+            'name': False,
+            'horiz_number_of_elements': True,
+            'horiz_sep_dist_cm': True,
+            'vert_number_of_elements': True,
+            'vert_sep_dist_cm': True,
+            'is_beamswitching': False,
+        })
+        model.v_ports = to_columns(v_ports, {
+            'scenario_id': True,
+            'uid': False,
+            'name': False,
+            'number_of_ports': True,
+            'polarization': False,
+            'polarization_type': False,
+        })
+        model.v_bands = to_columns(v_bands, {
+            'v_port_id': True,
+            'min_freq': True,
+            'max_freq': True,
+            'supp_elec_tilt': False,
+            'supp_elec_azimuth': False,
+            'supp_elec_beamwidth': False,
+            'cont_adj_elec_tilt': False,
+            'electrical_controller_name': False,
+            'use_elec_params_for_bs_service_patterns': False,
+        })
+        model.assignments = to_columns(assignments, {
+            'v_band_id': True,
+            'pattern_type': False,
+            'pattern_name': False,
+            'beamswitching_service_name': False,
+            'beam_id': True,
+            'horiz_angle': True,
+            'vert_angle': True,
+        })
+        for table, id_field in [(model.v_ports, 'scenario_id'), (model.v_bands, 'v_port_id'), (model.assignments, 'v_band_id')]:
+            table[id_field] = table[id_field].astype(np.int64)
+        model.assignments['pattern_id'] = np.array(
+            [model.pattern_ids.get(name, -1) for name in model.assignments['pattern_name']], dtype=np.int64
+        )
+
+    @staticmethod
+    def read_beamforming_configuration(
+            node: ET.Element,
+            scenarios: list[dict],
+            v_ports: list[dict],
+            v_bands: list[dict],
+            assignments: list[dict],
+    ):
+        scenario_id = len(scenarios)
+        scenarios.append({
+            'uid': node.findtext('Uid'),
+            'name': node.findtext('Name'),
+            'horiz_number_of_elements': node.findtext('HorizontalNumberOfElements'),
+            'horiz_sep_dist_cm': node.findtext('HorizontalSeparationDistanceCm'),
+            'vert_number_of_elements': node.findtext('VerticalNumberOfElements'),
+            'vert_sep_dist_cm': node.findtext('VerticalSeparationDistanceCm'),
+            'is_beamswitching': node.findtext('IsBeamswitching'),
+        })
+        for v_port_node in node.iterfind('VirtualPorts/VirtualPort'):
+            v_port_id = len(v_ports)
+            v_ports.append({
+                'scenario_id': scenario_id,
+                'uid': v_port_node.findtext('Uid'),
+                'name': v_port_node.findtext('Name'),
+                'number_of_ports': v_port_node.findtext('NumberOfPorts'),
+                'polarization': v_port_node.findtext('Polarization'),
+                'polarization_type': v_port_node.findtext('PolarizationType'),
+            })
+            for v_band_node in v_port_node.iterfind('VirtualBands/VirtualBand'):
+                v_band_id = len(v_bands)
+                v_bands.append({
+                    'v_port_id': v_port_id,
+                    'min_freq': v_band_node.findtext('MinimumFrequencyMHz'),
+                    'max_freq': v_band_node.findtext('MaximumFrequencyMHz'),
+                    'supp_elec_tilt': v_band_node.findtext('SupportsElectricalTilt'),
+                    'supp_elec_azimuth': v_band_node.findtext('SupportsElectricalAzimuth'),
+                    'supp_elec_beamwidth': v_band_node.findtext('SupportsElectricalBeamwidth'),
+                    'cont_adj_elec_tilt': v_band_node.findtext('ContinuouslyAdjustableElectricalTilt'),
+                    'electrical_controller_name': v_band_node.findtext('ElectricalControllerName'),
+                    'use_elec_params_for_bs_service_patterns': v_band_node.findtext(
+                        'UseElectricalParametersForBeamswitchingServicePatterns'
+                    ),
+                })
+                for name_node in v_band_node.iterfind('AttachedBroadcastPatterns/PatternName'):
+                    assignments.append({
+                        'v_band_id': v_band_id,
+                        'pattern_type': PATTERN_TYPE__BROADCAST,
+                        'pattern_name': name_node.text,
+                    })
+                for name_node in v_band_node.iterfind('AttachedBeamformingElementPatterns/string'):
+                    assignments.append({
+                        'v_band_id': v_band_id,
+                        'pattern_type': PATTERN_TYPE__BEAMFORMING_ELEMENT,
+                        'pattern_name': name_node.text,
+                    })
+                for service_node in v_band_node.iterfind('AttachedBeamswitchingServicePatterns/BeamswitchingServicePattern'):
+                    service_name = service_node.findtext('ServicePatternName')
+                    for beam_node in service_node.iterfind('ServicePatterns/BeamswitchingPattern'):
+                        assignments.append({
+                            'v_band_id': v_band_id,
+                            'pattern_type': PATTERN_TYPE__BEAMSWITCHING_SERVICE,
+                            'pattern_name': beam_node.findtext('BeamswitchingPatternName'),
+                            'beamswitching_service_name': service_name,
+                            'beam_id': beam_node.findtext('BeamID'),
+                            'horiz_angle': beam_node.findtext('HorizontalAngle'),
+                            'vert_angle': beam_node.findtext('VerticalAngle'),
+                        })
+
+    def read_pap_entries(self, zip_file: ZipFile, model: PafxModel):
+        entry_names = model.patterns['entry_name']
+        # .pap entry --> row of the entry matrices, entries shared by several patterns are read once
+        entry_ids = {}
+        pattern_entry_ids = np.array([entry_ids.setdefault(name, len(entry_ids)) for name in entry_names], dtype=np.int64)
+
+        infos = [zip_file.getinfo(name) for name in entry_ids]
+        cuts = {'horiz': [None] * len(infos), 'vert': [None] * len(infos)}
+        # read in archive order
+        for entry_id in sorted(range(len(infos)), key=lambda i: infos[i].header_offset):
+            content = self.read_entry(zip_file, infos[entry_id])
+            fields = self.pap_parser.scan_cut_fields(content)
+            if fields is None:
+                # other layout: parse the XML tree
+                data = self.pap_parser.parse_content(content)
+                fields = tuple(self.get_cut_fields(pattern) for pattern in [data.horiz_pap_pattern, data.vert_pap_pattern])
+            cuts['horiz'][entry_id], cuts['vert'][entry_id] = fields
+
+        for cut in ['horiz', 'vert']:
+            gains, num_gains = parse_gains([fields[b'Gains'] for fields in cuts[cut]])
+            if cut == 'horiz':
+                model.horiz_gains = gains[pattern_entry_ids]
+            else:
+                model.vert_gains = gains[pattern_entry_ids]
+            model.patterns[cut + '_num_gains'] = num_gains[pattern_entry_ids]
+            for tag, field in PAP_CUT_FIELDS.items():
+                values = np.array([to_float(fields.get(tag)) for fields in cuts[cut]], dtype=np.float64)
+                model.patterns[cut + '_' + field] = values[pattern_entry_ids]
+
+    @staticmethod
+    def get_cut_fields(pattern: PapPatternData) -> dict[bytes, bytes]:
+        fields = {
+            tag: str(getattr(pattern, field)).encode() for tag, field in PAP_CUT_FIELDS.items()
+            if getattr(pattern, field) is not None
+        }
+        fields[b'Gains'] = pattern.serialize_gains().encode()
+        return fields
+
+    @staticmethod
+    def read_entry(zip_file: ZipFile, info: ZipInfo) -> bytes:
+        # stored and DEFLATE entries are read raw, skipping zipfile's per-entry stream setup
+        if info.compress_type == ZIP_STORED:
+            data = read_raw_entry(zip_file, info)
+        elif info.compress_type == ZIP_DEFLATED:
+            data = zlib.decompress(read_raw_entry(zip_file, info), -15)
+        else:
+            return zip_file.read(info)
+        if zlib.crc32(data) != info.CRC:
+            raise BadZipFile('Bad CRC-32 for file ' + repr(info.filename))
+        return data
@@ -1,16 +1,27 @@
 import re
 import xml.etree.ElementTree as ET
 
+import numpy as np
+
 from .pattern_data import PapData, PapPatternData
 
+# Leaf elements of a .pap cut (horizontal or vertical pattern)
+PAP_CUT_FIELD_RE = re.compile(rb'<(Inclination|Orientation|StartAngle|EndAngle|Step|Gains)>([^<]*)</\1>')
+
 
 class PapParser:
 
     def parse(self, src_file: str) -> PapData:
-        data = PapData()
+        return self.parse_root(ET.parse(src_file).getroot())
 
-        tree = ET.parse(src_file)
-        root = tree.getroot()
+    def parse_content(self, content: bytes) -> PapData:
+        """
+        Parses a .pap file already read, e.g. a member of a .pafx archive
+        """
+        return self.parse_root(ET.fromstring(content))
+
+    def parse_root(self, root: ET.Element) -> PapData:
+        data = PapData()
         horiz_pattern = root.find('HorizontalPatterns')[0]
         vert_pattern = root.find('VerticalPatterns')[0]
         data.horiz_pap_pattern = self.parse_pattern_xml(horiz_pattern)
@@ -19,10 +30,31 @@ class PapParser:
 
     def parse_pattern_xml(self, node: ET.Element) -> PapPatternData:
         pattern = PapPatternData()
-        pattern.inclination = int(node.find('Inclination').text) if node.find('Inclination') is not None else None
-        pattern.orientation = int(node.find('Orientation').text) if node.find('Orientation') is not None else None
-        pattern.start_angle = int(node.find('StartAngle').text) if node.find('StartAngle') is not None else None
-        pattern.end_angle = int(node.find('EndAngle').text) if node.find('EndAngle') is not None else None
-        pattern.step = int(node.find('Step').text) if node.find('Step') is not None else None
-        pattern.gains = node.find('Gains').text if node.find('Gains') is not None else None
+        fields = {child.tag: child.text for child in node}
+        pattern.inclination = int(fields['Inclination']) if 'Inclination' in fields else None
+        pattern.orientation = int(fields['Orientation']) if 'Orientation' in fields else None
+        pattern.start_angle = int(fields['StartAngle']) if 'StartAngle' in fields else None
+        pattern.end_angle = int(fields['EndAngle']) if 'EndAngle' in fields else None
+        pattern.step = int(fields['Step']) if 'Step' in fields else None
+        pattern.gains = np.array(fields['Gains'].split(';'), dtype=np.float64) if 'Gains' in fields else None
         return pattern
+
+    @staticmethod
+    def scan_cut_fields(content: bytes) -> tuple[dict[bytes, bytes], dict[bytes, bytes]] | None:
+        """
+        Fast path for .pap files laid out as PafxFileWriter writes them (one cut per section, no attributes): raw
+        text of the fields of the horizontal and vertical cuts, found without building the XML tree. The gains are
+        left as text, so that the gains of many cuts can be converted at once.
+        Returns None if the content has another layout: it must be parsed with parse_content.
+        """
+        vert_start = content.find(b'<VerticalPatterns>')
+        if vert_start < 0:
+            return None
+        horiz_fields = PAP_CUT_FIELD_RE.findall(content, 0, vert_start)
+        vert_fields = PAP_CUT_FIELD_RE.findall(content, vert_start)
+        horiz = dict(horiz_fields)
+        vert = dict(vert_fields)
+        # a field repeated means more than one cut per section
+        if len(horiz) != len(horiz_fields) or len(vert) != len(vert_fields) or b'Gains' not in horiz or b'Gains' not in vert:
+            return None
+        return horiz, vert
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from .msi_parser import MSI_PARSER_VERSION
+from .pattern_gains_parser import PATTERN_GAINS_PARSER_VERSION
+from .pattern_data import MsiData, PapPatternData
+
+MSI_DATA_METRICS = [
+    'boresight_gain',
+    'boresight_gain_unit',
+    'horiz_beamwidth_deg',
+    'vert_beamwidth_deg',
+    'horiz_boresight_deg',
+    'vert_boresight_deg',
+    'front_to_back_ratio_db',
+]
+
+PAP_PATTERN_FIELDS = ['inclination', 'orientation', 'start_angle', 'end_angle', 'step']
+
+
+class ParseCache:
+    """
+    Persistent cache of parsed pattern files, stored in a single SQLite file.
+
+    Entries are keyed by the file content hash plus the parser/analyzer versions,
+    so renamed or copied files are still hits. A path -> (mtime, size, hash) table
+    avoids re-hashing files that did not change since the previous run. The
+    digest of a file is computed once with get_digest() and passed explicitly to
+    has() / get() / put(), so the entry read or written is always the one of the
+    content that was hashed.
+    """
+
+    def __init__(self, db_path: str, max_size_mb: float = 512):
+        """
+        :param db_path: Path of the SQLite cache file (created if missing)
+        :param max_size_mb: Size limit of the cached payloads; least recently used entries are evicted beyond it
+        """
+        self.db_path = db_path
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.version = f'{MSI_PARSER_VERSION}.{PATTERN_GAINS_PARSER_VERSION}'
+
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                digest TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                header TEXT NOT NULL,
+                metrics TEXT NOT NULL,
+                horiz_pattern TEXT NOT NULL,
+                horiz_gains BLOB NOT NULL,
+                vert_pattern TEXT NOT NULL,
+                vert_gains BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+        ''')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def has(self, digest: str) -> bool:
+        """
+        :param digest: Content digest of the pattern file (see get_digest)
+        """
+        row = self.db.execute('SELECT 1 FROM entries WHERE key = ?', (self.get_key(digest),)).fetchone()
+        return row is not None
+
+    def get(self, src_file: str, digest: str) -> MsiData | None:
+        """
+        :param src_file: Path of the pattern file, set on the returned payload
+        :param digest: Content digest of the pattern file (see get_digest)
+        """
+        key = self.get_key(digest)
+        row = self.db.execute(
+            'SELECT header, metrics, horiz_pattern, horiz_gains, vert_pattern, vert_gains FROM entries WHERE key = ?',
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        self.db.execute('UPDATE entries SET last_used = ? WHERE key = ?', (time.time(), key))
+
+        data = MsiData()
+        data.src_file = src_file
+        data.header = json.loads(row[0])
+        for name, value in json.loads(row[1]).items():
+            setattr(data, name, value)
+        data.horiz_pap_pattern = self.load_pap_pattern(row[2], row[3])
+        data.vert_pap_pattern = self.load_pap_pattern(row[4], row[5])
+        return data
+
+    def put(self, digest: str, data: MsiData):
+        """
+        :param digest: Content digest of the parsed pattern file (see get_digest)
+        :param data: Parsed pattern file
+        """
+        header = json.dumps(data.header)
+        metrics = json.dumps({name: getattr(data, name) for name in MSI_DATA_METRICS})
+        horiz_pattern, horiz_gains = self.dump_pap_pattern(data.horiz_pap_pattern)
+        vert_pattern, vert_gains = self.dump_pap_pattern(data.vert_pap_pattern)
+        size = len(header) + len(metrics) + len(horiz_pattern) + len(horiz_gains) + len(vert_pattern) + len(vert_gains)
+
+        self.db.execute(
+            'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (self.get_key(digest), header, metrics, horiz_pattern, horiz_gains, vert_pattern, vert_gains, size,
+             time.time()),
+        )
+
+    def commit(self):
+        """
+        Evicts the least recently used entries above the size limit and persists the changes
+        """
+        total_size = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total_size > self.max_size_bytes:
+            freed = 0
+            evicted = []
+            for key, size in self.db.execute('SELECT key, size FROM entries ORDER BY last_used'):
+                if total_size - freed <= self.max_size_bytes:
+                    break
+                evicted.append((key,))
+                freed += size
+            self.db.executemany('DELETE FROM entries WHERE key = ?', evicted)
+        self.db.commit()
+
+    def close(self):
+        self.commit()
+        self.db.close()
+
+    def get_key(self, digest: str) -> str:
+        return digest + ':' + self.version
+
+    def get_digest(self, src_file: str, content: bytes | None = None) -> str:
+        """
+        Content hash of a pattern file. Files on disk whose mtime and size did not change reuse their stored hash.
+        :param src_file: Path of the pattern file
+        :param content: File contents, when not read from the filesystem (e.g. archive members)
+        """
+        if content is not None:
+            return hashlib.sha256(content).hexdigest()
+
+        # Cheap check first: unchanged mtime and size --> reuse the stored hash
+        stat = os.stat(src_file)
+        row = self.db.execute('SELECT mtime_ns, size, digest FROM files WHERE path = ?', (src_file,)).fetchone()
+        if row is not None and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+            digest = row[2]
+        else:
+            with open(src_file, 'rb') as file:
+                digest = hashlib.sha256(file.read()).hexdigest()
+            self.db.execute(
+                'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)',
+                (src_file, stat.st_mtime_ns, stat.st_size, digest),
+            )
+        return digest
+
+    @staticmethod
+    def dump_pap_pattern(pattern: PapPatternData) -> tuple[str, bytes]:
+        fields = json.dumps({name: getattr(pattern, name) for name in PAP_PATTERN_FIELDS})
+        gains = pattern.gains.astype(np.float64, copy=False).tobytes()
+        return fields, gains
+
+    @staticmethod
+    def load_pap_pattern(fields: str, gains: bytes) -> PapPatternData:
+        pattern = PapPatternData()
+        for name, value in json.loads(fields).items():
+            setattr(pattern, name, value)
+        pattern.gains = np.frombuffer(gains, dtype=np.float64)
+        return pattern
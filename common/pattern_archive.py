@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+
+from .src_file_scanner import SrcFileEntry
+
+# Nested archives up to this size (bytes, uncompressed) are extracted into memory, larger ones into a temporary file
+NESTED_ARCHIVE_MAX_MEMORY_SIZE = 256 * 1024 * 1024
+
+
+class PatternArchive:
+    """
+    Read-only view of a pattern library shipped as a .zip archive (including .zip
+    archives nested inside it). Members are indexed from the central directories
+    and read on demand, the pattern files are never extracted to disk.
+
+    Each nested archive is extracted once from the enclosing archive, into memory
+    or into a temporary file beyond NESTED_ARCHIVE_MAX_MEMORY_SIZE, so that its
+    members can be read in any order (seeking back in a compressed member would
+    decompress it again from the start). The archives are opened on the first
+    read and stay open until close(): reading again
+    after close() reopens them, so the archive can be closed whenever the
+    library is not being read (e.g. between generator runs, so that the file is
+    not kept locked).
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Path of the .zip archive
+        """
+        self.path = path
+
+        # nested archive chain (member names, outermost first) --> open zip file, () is the archive itself
+        self.zip_files: dict[tuple[str, ...], zipfile.ZipFile] = {}
+        # nested archive chain --> extracted nested archive
+        self.buffers: dict[tuple[str, ...], tempfile.SpooledTemporaryFile] = {}
+
+        # relative path (os.sep separated, nested archives included) --> (nested archive chain, member)
+        self.members: dict[str, tuple[tuple[str, ...], zipfile.ZipInfo]] = {}
+        try:
+            self.index_members((), '')
+        finally:
+            self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_zip_file(self, chain: tuple[str, ...]) -> zipfile.ZipFile:
+        """
+        Opens the archive, or a nested archive, if it's not open yet
+        :param chain: Member names of the nested archives, outermost first
+        """
+        if chain not in self.zip_files:
+            if len(chain) == 0:
+                self.zip_files[chain] = zipfile.ZipFile(self.path)
+            else:
+                buffer = tempfile.SpooledTemporaryFile(max_size=NESTED_ARCHIVE_MAX_MEMORY_SIZE)
+                self.buffers[chain] = buffer
+                with self.get_zip_file(chain[:-1]).open(chain[-1]) as member:
+                    shutil.copyfileobj(member, buffer)
+                buffer.seek(0)
+                self.zip_files[chain] = zipfile.ZipFile(buffer)
+        return self.zip_files[chain]
+
+    def index_members(self, chain: tuple[str, ...], prefix: str):
+        for info in self.get_zip_file(chain).infolist():
+            if info.is_dir():
+                continue
+            member_path = prefix + info.filename.replace('/', os.sep)
+            if info.filename.lower().endswith('.zip'):
+                self.index_members(chain + (info.filename,), member_path + os.sep)
+            else:
+                self.members[member_path] = (chain, info)
+
+    def list_files(self) -> list[str]:
+        return list(self.members.keys())
+
+    def get_entry(self, member_path: str) -> SrcFileEntry:
+        """
+        Uncompressed size and modification time (from the zip entry header) of a member
+        """
+        info = self.members[member_path][1]
+        return SrcFileEntry(member_path, info.file_size, time.mktime(info.date_time + (0, 0, -1)))
+
+    def read(self, member_path: str) -> bytes:
+        chain, info = self.members[member_path]
+        return self.get_zip_file(chain).read(info)
+
+    def close(self):
+        for chain, zip_file in self.zip_files.items():
+            zip_file.close()
+            if chain in self.buffers:
+                self.buffers[chain].close()
+        self.zip_files = {}
+        self.buffers = {}
+
+    @staticmethod
+    def is_archive(path: str) -> bool:
+        return os.path.isfile(path) and zipfile.is_zipfile(path)
@@ -0,0 +1,240 @@
+"""
+Headless batch rendering of pattern cuts into contact sheets, for visual QA of large libraries.
+
+The patterns are grouped by scenario / virtual port, and each group is rendered by a
+worker process into a multi-page PDF (or one PNG per page) on the Agg backend:
+
+    render_generator_contact_sheets(generator, 'output/AQQN_64T64R_sheets')
+"""
+import math
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from typing import Iterable
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+from .pattern_data import PapPatternData
+from .polar_plot import PLOT_GRID_RADII, get_grid_segments, get_pattern_xy
+
+# Cut colors, as in pattern_visualizer.plot_patterns
+HORIZ_CUT_COLOR = '#228b22'
+VERT_CUT_COLOR = '#ff0000'
+
+CONTACT_SHEET_FORMATS = ['pdf', 'png']
+
+
+def get_group_key(pattern: dict) -> tuple[str, str]:
+    """
+    (scenario, virtual port) of a pattern: the extracted ones, else the first selected ones
+    """
+    scenarios = [pattern['scenario']] + pattern.get('selected_scenarios', [])
+    v_port_names = [pattern['v_port_name']] + pattern.get('selected_v_port_names', [])
+    scenario = next((str(value) for value in scenarios if value is not None), '-')
+    v_port_name = next((str(value) for value in v_port_names if value is not None), '-')
+    return scenario, v_port_name
+
+
+def get_sheet_basename(group_key: tuple[str, str]) -> str:
+    return re.sub(r'[^\w.-]+', '_', '__'.join(group_key))
+
+
+class ContactSheetPage:
+    """
+    Page figure of a contact sheet. The axes, the grid collection and the cut lines
+    are created once and reused for every page of the group: only the line data and
+    titles change from page to page.
+    """
+
+    def __init__(self, rows: int, cols: int):
+        self.fig = Figure(figsize=(cols * 2.6, rows * 2.8))
+        FigureCanvasAgg(self.fig)
+        self.cells = []
+        r_lim = max(PLOT_GRID_RADII) + 2
+        for i in range(rows * cols):
+            ax = self.fig.add_subplot(rows, cols, i + 1)
+            ax.add_collection(LineCollection(get_grid_segments(), colors='lightgray', linewidths=0.6))
+            ax.set_xlim(-r_lim, r_lim)
+            ax.set_ylim(-r_lim, r_lim)
+            ax.set_aspect('equal')
+            ax.set_axis_off()
+            self.cells.append({
+                'ax': ax,
+                'horiz': ax.plot([], [], color=HORIZ_CUT_COLOR, linewidth=1.0)[0],
+                'vert': ax.plot([], [], color=VERT_CUT_COLOR, linewidth=1.0)[0],
+                'horiz_boresight': ax.plot([], [], color=HORIZ_CUT_COLOR, linewidth=0.8, linestyle='--')[0],
+                'vert_boresight': ax.plot([], [], color=VERT_CUT_COLOR, linewidth=0.8, linestyle='--')[0],
+                'title': ax.set_title('', fontsize=6),
+            })
+        self.fig.subplots_adjust(left=0.01, right=0.99, bottom=0.01, top=0.93, wspace=0.05, hspace=0.25)
+        self.suptitle = self.fig.suptitle('', fontsize=10)
+
+    def update(self, title: str, items: list[tuple[str, PapPatternData, PapPatternData]]):
+        """
+        :param title: Page title
+        :param items: (name, horizontal cut, vertical cut) of each cell, at most rows * cols
+        """
+        self.suptitle.set_text(title)
+        for i, cell in enumerate(self.cells):
+            cell['ax'].set_visible(i < len(items))
+            if i >= len(items):
+                continue
+            name, horiz_pattern, vert_pattern = items[i]
+            horiz_boresight_deg = self.update_cut(cell['horiz'], cell['horiz_boresight'], horiz_pattern, False)
+            vert_boresight_deg = self.update_cut(cell['vert'], cell['vert_boresight'], vert_pattern, True)
+            cell['title'].set_text('{}\nH: {:0.1f}°  V: {:0.1f}°'.format(name, horiz_boresight_deg, vert_boresight_deg))
+
+    @staticmethod
+    def update_cut(line, boresight_line, pattern: PapPatternData | None, clockwise: bool) -> float:
+        if pattern is None:
+            line.set_data([], [])
+            boresight_line.set_data([], [])
+            return math.nan
+        line.set_data(*get_pattern_xy(pattern, clockwise))
+        boresight_deg = pattern.get_boresight_deg()
+        boresight = boresight_deg * math.pi / 180
+        r = max(PLOT_GRID_RADII)
+        boresight_line.set_data([0, r * math.cos(boresight)], [0, r * (-1 if clockwise else 1) * math.sin(boresight)])
+        return boresight_deg
+
+
+def render_sheet(
+        group_key: tuple[str, str],
+        items: list[tuple[str, PapPatternData, PapPatternData]],
+        output_dir: str,
+        file_format: str,
+        rows: int,
+        cols: int,
+        dpi: int,
+) -> list[str]:
+    """
+    Renders the contact sheet of a group: a multi-page PDF, or a PNG per page
+    :return: Paths of the written files
+    """
+    page = ContactSheetPage(rows, cols)
+    basename = get_sheet_basename(group_key)
+    page_size = rows * cols
+    num_pages = math.ceil(len(items) / page_size)
+
+    def iter_pages():
+        for i in range(num_pages):
+            title = '{} / {}  ({} patterns, page {}/{})'.format(*group_key, len(items), i + 1, num_pages)
+            page.update(title, items[i * page_size:(i + 1) * page_size])
+            yield i
+
+    if file_format == 'pdf':
+        output_path = os.path.join(output_dir, basename + '.pdf')
+        with PdfPages(output_path) as pdf:
+            for _ in iter_pages():
+                pdf.savefig(page.fig)
+        return [output_path]
+
+    output_paths = []
+    for i in iter_pages():
+        output_path = os.path.join(output_dir, '{}_{:03d}.png'.format(basename, i + 1))
+        page.fig.savefig(output_path, dpi=dpi)
+        output_paths.append(output_path)
+    return output_paths
+
+
+def render_contact_sheets(
+        patterns: Iterable[dict],
+        output_dir: str,
+        file_format: str = 'pdf',
+        rows: int = 4,
+        cols: int = 6,
+        dpi: int = 100,
+        num_workers: int | None = None,
+) -> list[str]:
+    """
+    Renders the horizontal (green) and vertical (red) cuts of every pattern into contact sheets, one per
+    scenario / virtual port. The groups are rendered in parallel, one worker process per group at a time.
+    The cuts of every pattern are held in memory: see render_generator_contact_sheets for streaming mode.
+    :param patterns: Patterns with their gain data (horiz_pap_pattern / vert_pap_pattern)
+    :param output_dir: Directory of the contact sheets
+    :param file_format: 'pdf' (a multi-page file per group) or 'png' (a file per page)
+    :param rows: Pattern rows per page
+    :param cols: Pattern columns per page
+    :param dpi: Resolution of the PNG pages
+    :param num_workers: Worker processes, None uses all CPU cores
+    :return: Paths of the written files
+    """
+    # (scenario, v_port_name) --> (name, horizontal cut, vertical cut) of its patterns, in pattern order
+    groups: dict[tuple[str, str], list[tuple[str, PapPatternData, PapPatternData]]] = {}
+    for pattern in patterns:
+        groups.setdefault(get_group_key(pattern), []).append(get_sheet_item(pattern))
+
+    return render_groups(groups.items(), output_dir, file_format, rows, cols, dpi, num_workers)
+
+
+def render_groups(
+        groups: Iterable[tuple[tuple[str, str], list[tuple[str, PapPatternData, PapPatternData]]]],
+        output_dir: str,
+        file_format: str = 'pdf',
+        rows: int = 4,
+        cols: int = 6,
+        dpi: int = 100,
+        num_workers: int | None = None,
+) -> list[str]:
+    """
+    Renders the contact sheet of each group in a process pool. The groups are taken from the iterable as workers
+    become free (at most two per worker are pending), so a lazy iterable keeps only those groups in memory.
+    :param groups: (group key, (name, horizontal cut, vertical cut) of its patterns)
+    :return: Paths of the written files, in groups order (see render_contact_sheets for the other params)
+    """
+    if file_format not in CONTACT_SHEET_FORMATS:
+        print('[ERROR] file_format must be one of the following: ' + ', '.join(CONTACT_SHEET_FORMATS))
+        return []
+
+    os.makedirs(output_dir, exist_ok=True)
+    group_keys = []
+    output_paths = {}
+    max_pending = 2 * (num_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        pending = {}
+        for group_key, items in groups:
+            group_keys.append(group_key)
+            pending[executor.submit(render_sheet, group_key, items, output_dir, file_format, rows, cols, dpi)] = group_key
+            while len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    output_paths[pending.pop(future)] = future.result()
+        for future in as_completed(pending):
+            output_paths[pending[future]] = future.result()
+
+    return [path for group_key in group_keys for path in output_paths[group_key]]
+
+
+def get_sheet_item(pattern: dict) -> tuple[str, PapPatternData, PapPatternData]:
+    return str(pattern['name']), pattern['horiz_pap_pattern'], pattern['vert_pap_pattern']
+
+
+def render_generator_contact_sheets(generator, output_dir: str, **kwargs) -> list[str]:
+    """
+    Renders the contact sheets of every pattern of a generator run (see render_contact_sheets for the kwargs).
+    In streaming mode the source files are parsed again one group at a time, as the workers take the groups,
+    so only the cuts of the groups being rendered are held in memory.
+    :param generator: BeamformingAntennaGenerator
+    :param output_dir: Directory of the contact sheets
+    """
+    if not generator.analyzed:
+        # header scan mode: the gain data is not available yet
+        generator.process_patterns()
+    if not generator.params.get('streaming', False):
+        return render_contact_sheets(generator.patterns, output_dir, **kwargs)
+
+    # gain data is not kept in memory: group the pattern metadata, then parse each group when it's rendered
+    group_patterns: dict[tuple[str, str], list[dict]] = {}
+    for pattern in generator.patterns:
+        group_patterns.setdefault(get_group_key(pattern), []).append(pattern)
+    groups = (
+        (group_key, [get_sheet_item(pattern) for pattern in generator.iter_pap_patterns(patterns)])
+        for group_key, patterns in group_patterns.items()
+    )
+    try:
+        return render_groups(groups, output_dir, **kwargs)
+    finally:
+        generator.close_archive()
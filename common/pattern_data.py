@@ -1,23 +1,77 @@
 import json
 import math
 
+import numpy as np
+
+
+class PayloadNotAnalyzedError(AttributeError):
+    """
+    Raised when accessing gain analysis results of a payload read in header scan mode
+    """
+
 
 class PapPatternData:
+    """
+    Pattern cut in .pap form. The gains [dB] are held as a float array, the
+    ';'-joined text form is only produced when the pattern is serialized.
+    """
+    __slots__ = ('inclination', 'orientation', 'start_angle', 'end_angle', 'step', '_gains', '_boresight_deg')
+
     inclination: int
     orientation: int
     start_angle: int
     end_angle: int
     step: int
-    gains: str
+
+    def __init__(self):
+        self.inclination = None
+        self.orientation = None
+        self.start_angle = None
+        self.end_angle = None
+        self.step = None
+        self._gains = None
+        self._boresight_deg = {}
+
+    @property
+    def gains(self) -> np.ndarray | None:
+        return self._gains
+
+    @gains.setter
+    def gains(self, value: np.ndarray | str | None):
+        """
+        :param value: Gains array, or its ';'-joined text form
+        """
+        if isinstance(value, str):
+            value = np.array(value.split(';'), dtype=np.float64)
+        self._gains = value
+        self._boresight_deg = {}
+
+    def serialize_gains(self) -> str | None:
+        if self._gains is None:
+            return None
+        return ';'.join([str(g) for g in self._gains.tolist()])
+
+    def to_dict(self) -> dict:
+        return {
+            'inclination': self.inclination,
+            'orientation': self.orientation,
+            'start_angle': self.start_angle,
+            'end_angle': self.end_angle,
+            'step': self.step,
+            'gains': self.serialize_gains(),
+        }
 
     def __str__(self):
         return self.to_json()
 
     def to_json(self):
-        return json.dumps(self, default=lambda o: o.__dict__)
+        return json.dumps(self.to_dict())
 
     def get_boresight_deg(self, min_gain_db = -5.0) -> float:
-        gains = [float(g) for g in self.gains.split(';')]
+        if min_gain_db in self._boresight_deg:
+            return self._boresight_deg[min_gain_db]
+
+        gains = self._gains.tolist()
         max_gain = max(gains)
         angles = [a for a in range(self.start_angle, self.end_angle + self.step, self.step)]
         weighted_avg_angle_num = 0
@@ -29,8 +83,14 @@ class PapPatternData:
                 gain_linear = math.pow(10, g / 10.0)
                 weighted_avg_angle_num += gain_linear * angle
                 weighted_avg_angle_denom += gain_linear
-        # return weighted average angle
-        return weighted_avg_angle_num / weighted_avg_angle_denom
+        # weighted average angle
+        boresight_deg = weighted_avg_angle_num / weighted_avg_angle_denom
+        self._boresight_deg[min_gain_db] = boresight_deg
+        return boresight_deg
+
+
+def to_json_default(o):
+    return o.to_dict() if isinstance(o, PapPatternData) else o.__dict__
 
 
 class PapData:
@@ -41,7 +101,7 @@ class PapData:
         return self.to_json()
 
     def to_json(self):
-        return json.dumps(self, default=lambda o: o.__dict__, indent=2)
+        return json.dumps(self, default=to_json_default, indent=2)
 
 
 class MsiData:
@@ -61,4 +121,14 @@ class MsiData:
         return self.to_json()
 
     def to_json(self):
-        return json.dumps(self, default=lambda o: o.__dict__, indent=2)
+        return json.dumps(self, default=to_json_default, indent=2)
+
+
+class MsiHeaderData(MsiData):
+    """
+    MsiData with only the header section read (header scan mode). The gain
+    analysis fields are not available.
+    """
+
+    def __getattr__(self, name):
+        raise PayloadNotAnalyzedError(name + ' is not available in header scan mode')
@@ -0,0 +1,66 @@
+from .pattern_data import MsiData, PayloadNotAnalyzedError
+from .pattern_name_param_extractor import PatternNameParamExtractor
+from .pattern_payload_param_extractor import PatternPayloadParamExtractor
+
+
+class PatternExtractionPlan:
+    """
+    Extracts every parameter of a pattern with a fixed set of extractors.
+
+    Name extractors share a per-pattern cache: the path part of the pattern name
+    is computed once, each pre-processing function object runs once per path part,
+    and each distinct regex is matched once per pre-processed name, handing its
+    groups to every extractor using it. Regexes are compiled once, by the
+    extractors. Pre-processing functions are expected to have no side effects.
+    """
+
+    def __init__(self, extractors: dict[str, PatternNameParamExtractor | PatternPayloadParamExtractor]):
+        """
+        :param extractors: Extractor of each parameter, in extraction order
+        """
+        self.extractors = extractors
+        # params extracted from the payload, whose values only change with the source file content
+        self.payload_param_names = [
+            param_name for param_name, extractor in extractors.items()
+            if isinstance(extractor, PatternPayloadParamExtractor)
+        ]
+
+    def extract(
+            self,
+            src_file: str,
+            payload: MsiData | None,
+            payload_values: dict[str, str | int | float | None] | None = None,
+    ) -> dict[str, str | int | float | None]:
+        """
+        :param src_file: Source file path, relative to the source folder (the pattern name)
+        :param payload: Parsed source file
+        :param payload_values: Values of the payload params, already extracted from an unchanged source file. The
+                               payload is not used then
+        :return: Value of each parameter, None when it could not be extracted
+        """
+        cache = {}
+        return {
+            param_name: payload_values[param_name] if payload_values is not None and param_name in payload_values
+            else self.extract_param(extractor, src_file, payload, cache)
+            for param_name, extractor in self.extractors.items()
+        }
+
+    @staticmethod
+    def extract_param(
+            extractor: PatternNameParamExtractor | PatternPayloadParamExtractor,
+            src_file: str,
+            payload: MsiData,
+            cache: dict | None = None,
+    ) -> str | int | float | None:
+        if isinstance(extractor, PatternNameParamExtractor):
+            return extractor.extract(src_file, cache)
+
+        elif isinstance(extractor, PatternPayloadParamExtractor):
+            try:
+                return extractor.extract(payload)
+            except PayloadNotAnalyzedError:
+                # header scan mode: the value needs the gain analysis
+                return None
+
+        print('[ERROR] Extractor type not supported')
+        return None
@@ -1,9 +1,12 @@
 from math import sin, cos, pi
-import collections
+
+import numpy as np
 
 from .pattern_data import PapPatternData
-from .geom.vector_2d import Vector2d
-from .geom.geom import are_vectors2d_on_same_half_plane, get_angle_range_boundaries
+from .geom.versor_array import are_versors_on_same_half_plane, get_angle_range_boundaries
+
+# Bump whenever the analysis output changes, to invalidate cached results
+PATTERN_GAINS_PARSER_VERSION = 1
 
 # A gain value in the pattern is considered to be a max (lobe max)
 # when it's close within a threshold to the pattern's global max gain
@@ -35,10 +38,19 @@ class PatternGainsParser:
         'front_to_back_ratio_db': None,
     }
 
-    def __init__(self, angle_loss_dict: dict):
+    def __init__(self, angle_loss_dict: dict | None = None, angle_loss_array: np.ndarray | None = None):
+        """
+        :param angle_loss_dict: Pattern losses [dB] keyed by angle
+        :param angle_loss_array: Alternatively, a (n, 2) array of [angle, loss] rows
+        """
         self.angle_loss_dict = angle_loss_dict
-        self.angles = list(self.angle_loss_dict.keys())
-        self.gains = [-float(v) for v in list(self.angle_loss_dict.values())]
+        if angle_loss_array is not None:
+            self.angles = angle_loss_array[:, 0].tolist()
+            self.gains_array = -angle_loss_array[:, 1]
+        else:
+            self.angles = list(self.angle_loss_dict.keys())
+            self.gains_array = -np.array(list(self.angle_loss_dict.values()), dtype=np.float64)
+        self.gains = self.gains_array.tolist()
         self.extract_lobes()
         self.extract_pattern_params()
 
@@ -49,8 +61,7 @@ class PatternGainsParser:
         return self.pattern_params['boresight_deg']
 
     def get_pap_pattern(self) -> PapPatternData:
-        gains = collections.deque(self.gains)
-        gains.rotate(round(len(gains) / 2))
+        gains = np.roll(self.gains_array, round(len(self.gains_array) / 2))
         step = 360.0 / len(gains)
 
         pap = PapPatternData()
@@ -59,84 +70,64 @@ class PatternGainsParser:
         pap.start_angle = -180
         pap.end_angle = round(180 - step)
         pap.step = round(step)
-        pap.gains = ';'.join([str(g) for g in gains])
+        pap.gains = gains
         return pap
 
     def get_front_to_back_ratio_db(self) -> float:
         return self.pattern_params['front_to_back_ratio_db']
 
     def extract_lobes(self):
-        angles = self.angles
-        gains = self.gains
-        step = 360 / len(angles)
+        gains = self.gains_array
+        step = 360 / len(self.angles)
 
         # Obtain the global max gain [dB]
-        global_max_gain_db = gains[0]
-
-        for i in range(0, len(gains)):
-            if gains[i] > global_max_gain_db:
-                global_max_gain_db = gains[i]
+        global_max_gain_db = float(gains.max())
 
         # Obtain all gains greater than the global max minus a tolerance threshold
         thres_gain_db = global_max_gain_db - MAX_GAIN_TOLERANCE_THRES_DB
-
-        max_gains = []
-
-        for i, angle in enumerate(angles):
-            gain = gains[i]
-            if gain >= thres_gain_db:
-                max_gains.append({
-                    'index': i,
-                    'angle': angle,
-                    'gain_db': gain,
-                })
+        i_max_gains = np.flatnonzero(gains >= thres_gain_db)
 
         # Obtain distinct pattern lobes
         lobe_edge_gain_db = global_max_gain_db - LOBE_GAIN_FALL_THRES_DB
         bw_edge_gain_db = global_max_gain_db - BEAMWIDTH_GAIN_FALL_THRES_DB
 
-        lobes = {}
+        # Segment the circular pattern into lobes: runs of samples above the
+        # lobe edge, delimited by the samples that fall below it. Only the runs
+        # holding a max gain are lobes, each one is analyzed once.
+        i_lobe_crossings = np.flatnonzero(gains < lobe_edge_gain_db)
+        i_bw_crossings = np.flatnonzero(gains <= bw_edge_gain_db)
+
+        if len(i_lobe_crossings) == 0:
+            # No lobe edge at all: every max gain is its own (360°) lobe
+            i_lobe_maxs = i_max_gains
+            i_lobe_starts = i_max_gains
+            i_lobe_ends = i_max_gains
+        else:
+            # The run of a sample is the number of crossings before it, the run
+            # after the last crossing wraps around into the first one
+            max_gain_runs = np.cumsum(gains < lobe_edge_gain_db)[i_max_gains] % len(i_lobe_crossings)
+            runs, i_first = np.unique(max_gain_runs, return_index=True)
+            i_last = len(max_gain_runs) - 1 - np.unique(max_gain_runs[::-1], return_index=True)[1]
+            # Lobes are listed in order of their first max gain
+            order = np.argsort(i_first)
+            runs = runs[order]
+            i_lobe_maxs = i_max_gains[i_last[order]]
+            i_lobe_starts = i_lobe_crossings[runs - 1]
+            i_lobe_ends = i_lobe_crossings[runs]
+
+        # Beamwidth edges: the crossings enclosing the lobe. Every max gain of the
+        # lobe leads to the same ones, except when the pattern never falls to the
+        # beamwidth edge: then the lobe's last max gain is taken as both edges.
+        i_bw_starts, i_bw_ends = self.find_enclosing_crossings(i_lobe_maxs, i_bw_crossings)
 
-        for max_gain in max_gains:
-            # Max gain index
-            i_max = max_gain['index']
-
-            i_lobe_start = i_max
-            i_lobe_end = i_max
-
-            i_bw_start = i_max
-            i_bw_end = i_max
-
-            num_gains = len(gains)
-
-            # Lobe start (i_lobe_start)
-            for k in range(1, num_gains):
-                i = (i_max - k) % num_gains
-                if gains[i] < lobe_edge_gain_db:
-                    i_lobe_start = i
-                    break
-
-            # Lobe end (i_lobe_end)
-            for k in range(1, num_gains):
-                i = (i_max + k) % num_gains
-                if gains[i] < lobe_edge_gain_db:
-                    i_lobe_end = i
-                    break
-
-            # Beamwidth start (i_bw_start)
-            for k in range(1, num_gains):
-                i = (i_max - k) % num_gains
-                if gains[i] <= bw_edge_gain_db:
-                    i_bw_start = i
-                    break
-
-            # Beamwidth end (i_bw_end)
-            for k in range(1, num_gains):
-                i = (i_max + k) % num_gains
-                if gains[i] <= bw_edge_gain_db:
-                    i_bw_end = i
-                    break
+        lobes = {}
 
+        for i_lobe_start, i_lobe_end, i_bw_start, i_bw_end in zip(
+                i_lobe_starts.tolist(),
+                i_lobe_ends.tolist(),
+                i_bw_starts.tolist(),
+                i_bw_ends.tolist(),
+        ):
             ang_lobe_start = (step * i_lobe_start) % 360
             ang_lobe_end = (step * i_lobe_end) % 360
             lobe_width = min_beamwidth(ang_lobe_start, ang_lobe_end)
@@ -165,20 +156,34 @@ class PatternGainsParser:
             'lobes': lobes,
         }
 
+    @staticmethod
+    def find_enclosing_crossings(i_samples: np.ndarray, i_crossings: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        For each sample index, finds the closest crossing index before and after
+        it on the circular pattern. Without crossings, the sample itself is used.
+        :param i_samples: Indexes of the samples (none of them a crossing)
+        :param i_crossings: Sorted indexes of the samples beyond the threshold
+        """
+        if len(i_crossings) == 0:
+            return i_samples, i_samples
+
+        # Position of each sample among the crossings: the previous crossing is
+        # the one before it (wrapping to the last), the next one is at it
+        # (wrapping to the first)
+        pos = np.searchsorted(i_crossings, i_samples)
+        return i_crossings[pos - 1], i_crossings[pos % len(i_crossings)]
+
     def extract_pattern_params(self):
-        vectors = []
         lobes = list(self.lobes['lobes'].values())
-
-        for lobe in lobes:
-            vectors.append(Vector2d(
-                lobe['center_versor']['x'],
-                lobe['center_versor']['y'],
-            ))
+        versors = np.array(
+            [[lobe['center_versor']['x'], lobe['center_versor']['y']] for lobe in lobes],
+            dtype=np.float64,
+        ).reshape(-1, 2)
 
         # Examine the lobes' center versors and determine if they are all in
         # the same half-plane. In case they are not, the beamwidth is assumed
         # to be 360° (omnidirectional).
-        if not are_vectors2d_on_same_half_plane(vectors):
+        if not are_versors_on_same_half_plane(versors):
             self.pattern_params = {
                 'boresight_deg': 0,
                 'beamwidth_deg': 360,
@@ -187,7 +192,7 @@ class PatternGainsParser:
             }
             return
 
-        angle_range_bounds_indexes = get_angle_range_boundaries(vectors)
+        angle_range_bounds_indexes = get_angle_range_boundaries(versors)
         start_lobe = lobes[angle_range_bounds_indexes[0]]
         end_lobe = lobes[angle_range_bounds_indexes[1]]
 
@@ -31,28 +31,61 @@ class PatternNameParamExtractor:
         self.pre_capture_proc = pre_capture_proc
         self.post_capture_proc = post_capture_proc
 
-    def extract(self, pattern_name: str) -> str | int | float | None:
+        # an invalid regex is reported when extracting, as a failed match
         try:
-            proc_pattern_name = pattern_name
-            if self.path_part == 'basename':
-                proc_pattern_name = basename(pattern_name)
-            elif self.path_part == 'dirname':
-                proc_pattern_name = dirname(pattern_name)
+            self.compiled_re = re.compile(extract_re) if extract_re is not None else None
+        except re.error:
+            self.compiled_re = None
+
+        # keys of the intermediate results in the cache shared by the extractors of a pattern. Pre-processing
+        # functions are keyed by identity: only the same function object (e.g. the default one) shares its results
+        self.pre_capture_key = (path_part, pre_capture_proc)
+        self.match_key = self.pre_capture_key + (extract_re,)
+
+    def extract(self, pattern_name: str, cache: dict | None = None) -> str | int | float | None:
+        """
+        :param pattern_name: Pattern name (source file path)
+        :param cache: Path parts, pre-processed names and regex matches of pattern_name already computed by other
+                      extractors, updated with the ones computed here. None to compute them all
+        """
+        if cache is None:
+            cache = {}
+
+        try:
+            proc_pattern_name = cache.get(self.path_part)
+            if proc_pattern_name is None:
+                proc_pattern_name = pattern_name
+                if self.path_part == 'basename':
+                    proc_pattern_name = basename(pattern_name)
+                elif self.path_part == 'dirname':
+                    proc_pattern_name = dirname(pattern_name)
+                cache[self.path_part] = proc_pattern_name
             if proc_pattern_name == '' or proc_pattern_name is None:
                 raise ''
         except:
             print('[ERROR] The pattern name is an invalid path: ' + pattern_name)
             return None
 
-        try:
-            proc_pattern_name = self.pre_capture_proc(proc_pattern_name)
-        except:
+        # (pre-processed name,) or () if pre-processing failed
+        pre_captured = cache.get(self.pre_capture_key)
+        if pre_captured is None:
+            try:
+                pre_captured = (self.pre_capture_proc(proc_pattern_name),)
+            except:
+                pre_captured = ()
+            cache[self.pre_capture_key] = pre_captured
+        if len(pre_captured) == 0:
             print('[ERROR] Error pre-processing pattern name: ' + proc_pattern_name)
             return None
+        proc_pattern_name = pre_captured[0]
 
         try:
             if self.extract_re is not None:
-                match = re.match(self.extract_re, proc_pattern_name)
+                if self.match_key in cache:
+                    match = cache[self.match_key]
+                else:
+                    match = self.compiled_re.match(proc_pattern_name)
+                    cache[self.match_key] = match
                 param = match.group('cg')
             else:
                 param = proc_pattern_name
@@ -20,21 +20,41 @@ class PatternNameParamSelector:
         self.select_re = select_re
         self.pre_capture_proc = pre_capture_proc
 
-    def select(self, pattern_name: str, values: list[str]) -> list[str]:
+        # pre-processed candidate values, see set_values()
+        self.proc_values: list[str] = []
+        # selection regex --> selected values
+        self.selections: dict[str, list[str]] = {}
+
+    def select(self, pattern_name: str, values: list[str] | None = None) -> list[str]:
+        """
+        :param pattern_name: Pattern name the selection regex is built from
+        :param values: Candidate values. They are pre-processed on every call: when selecting for many patterns, set
+                       them once with set_values() and leave this empty
+        """
         pattern_select_re = self.select_re(pattern_name)
         if pattern_select_re is None:
             # no selection regex defined for current pattern
             return []
 
-        result = []
+        if values is not None:
+            self.set_values(values)
+
+        result = self.selections.get(pattern_select_re)
+        if result is None:
+            regex = re.compile(pattern_select_re)
+            result = [proc_value for proc_value in self.proc_values if regex.match(proc_value) is not None]
+            self.selections[pattern_select_re] = result
+
+        return list(result)
+
+    def set_values(self, values: list[str]):
+        """
+        Pre-processes the candidate values once, and drops the selections made on previous ones
+        """
+        self.proc_values = []
+        self.selections = {}
         for value in values:
             try:
-                proc_value = self.pre_capture_proc(value)
+                self.proc_values.append(self.pre_capture_proc(value))
             except:
                 print('[ERROR] Error pre-processing parameter value: ' + value)
-                continue
-
-            if re.match(pattern_select_re, proc_value) is not None:
-                result.append(proc_value)
-
-        return result
@@ -1,5 +1,5 @@
 from typing import Callable
-from .pattern_data import MsiData
+from .pattern_data import MsiData, PayloadNotAnalyzedError
 
 
 class PatternPayloadParamExtractor:
@@ -19,6 +19,8 @@ class PatternPayloadParamExtractor:
     def extract(self, payload: MsiData) -> str | int | float | None:
         try:
             param = self.extract_fn(payload)
+        except PayloadNotAnalyzedError:
+            raise
         except Exception as e:
             print(
                 '[ERROR] Error extracting param from pattern payload. Source file: '
@@ -0,0 +1,183 @@
+import os
+
+import numpy as np
+
+# Tags listed by BeamformingAntennaGenerator.list_extracted_tags, in listing order
+PATTERN_TAGS = [
+    'scenario',
+    'v_port_name',
+    'pattern_type',
+    'freq_band',
+    'electrical_tilt',
+    'polarization',
+    'polarization_type',
+    'v_port_number_of_ports',
+    'horiz_number_of_elements',
+    'horiz_sep_dist_cm',
+    'vert_number_of_elements',
+    'vert_sep_dist_cm',
+    'beamswitching_service_name',
+    'beamswitching_horiz_angle',
+    'beamswitching_vert_angle',
+]
+
+# Scalar pattern fields kept as columns
+PATTERN_TABLE_FIELDS = [
+    'src_file',
+    'output_file_basename',
+    'name',
+    'scenario',
+    'v_port_name',
+    'pattern_type',
+    'center_freq',
+    'min_freq',
+    'max_freq',
+    'electrical_tilt',
+    'polarization',
+    'polarization_type',
+    'v_port_number_of_ports',
+    'horiz_number_of_elements',
+    'horiz_sep_dist_cm',
+    'vert_number_of_elements',
+    'vert_sep_dist_cm',
+    'beamswitching_service_name',
+    'beamswitching_horiz_angle',
+    'beamswitching_vert_angle',
+    'boresight_gain',
+    'boresight_gain_unit',
+    'horiz_beamwidth_deg',
+    'vert_beamwidth_deg',
+    'horiz_boresight_deg',
+    'vert_boresight_deg',
+    'front_to_back_ratio_db',
+]
+
+
+def to_column(values: list) -> np.ndarray:
+    """
+    Numeric array if every value is a number, else object array (strings, missing values)
+    """
+    if all(issubclass(value_type, (int, float, np.number)) for value_type in set(map(type, values))):
+        return np.array(values)
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+class PatternTable:
+    """
+    Columnar view of the pattern metadata: one array per field, indexed by
+    pattern id (position in the patterns list).
+
+    Tags are stored as categorical codes, as (pattern id, value code) pairs, since
+    a pattern may have several values of a tag (the scenario and virtual port are
+    the extracted one plus the selected ones). An inverted index groups the
+    pattern ids of each tag value, so counts, detailed listings and filter
+    queries don't walk the patterns.
+    """
+
+    def __init__(self, patterns: list[dict]):
+        """
+        :param patterns: Patterns extracted by BeamformingAntennaGenerator.process_patterns
+        """
+        self.num_patterns = len(patterns)
+        # field --> value of each pattern
+        self.columns: dict[str, np.ndarray] = {
+            field: to_column([pattern[field] for pattern in patterns]) for field in PATTERN_TABLE_FIELDS
+        }
+        self.src_file_basenames = to_column([os.path.basename(pattern['src_file']) for pattern in patterns])
+
+        # tag --> distinct values, in order of first appearance (the code of a value is its position)
+        self.tag_values: dict[str, list] = {}
+        # tag --> code of each distinct value
+        self.tag_value_codes: dict[str, dict] = {}
+        # tag --> pattern id / value code of each (pattern, value) pair, in pattern order
+        self.tag_rows: dict[str, np.ndarray] = {}
+        self.tag_codes: dict[str, np.ndarray] = {}
+        # inverted index: tag --> pattern ids of the pairs grouped by value code, and start of each group
+        self.index_rows: dict[str, np.ndarray] = {}
+        self.index_offsets: dict[str, np.ndarray] = {}
+
+        for tag in PATTERN_TAGS:
+            rows, values = self.get_tag_pairs(tag, patterns)
+            self.add_tag(tag, rows, values)
+
+    @staticmethod
+    def get_tag_pairs(tag: str, patterns: list[dict]) -> tuple[list[int], list]:
+        if tag == 'scenario' or tag == 'v_port_name':
+            selected_field = 'selected_scenarios' if tag == 'scenario' else 'selected_v_port_names'
+            rows = []
+            values = []
+            for i, pattern in enumerate(patterns):
+                for value in [pattern[tag]] + pattern[selected_field]:
+                    if value is not None:
+                        rows.append(i)
+                        values.append(value)
+            return rows, values
+
+        rows = list(range(len(patterns)))
+        if tag == 'freq_band':
+            return rows, [str(pattern['min_freq']) + '-' + str(pattern['max_freq']) for pattern in patterns]
+        return rows, [pattern[tag] for pattern in patterns]
+
+    def add_tag(self, tag: str, rows: list[int], values: list):
+        codes_by_value = {value: code for code, value in enumerate(dict.fromkeys(values))}
+        codes = list(map(codes_by_value.__getitem__, values))
+
+        self.tag_values[tag] = list(codes_by_value.keys())
+        self.tag_value_codes[tag] = codes_by_value
+        self.tag_rows[tag] = np.array(rows, dtype=np.int64)
+        self.tag_codes[tag] = np.array(codes, dtype=np.int64)
+
+        order = np.argsort(self.tag_codes[tag], kind='stable')
+        self.index_rows[tag] = self.tag_rows[tag][order]
+        self.index_offsets[tag] = np.concatenate(
+            ([0], np.cumsum(np.bincount(self.tag_codes[tag], minlength=len(codes_by_value))))
+        )
+
+    def get_value_code(self, tag: str, value) -> int | None:
+        return self.tag_value_codes[tag].get(value)
+
+    def get_pattern_ids(self, tag: str, value) -> np.ndarray:
+        """
+        Ids of the patterns with the given tag value, in pattern order. A pattern appears once per matching pair
+        (e.g. a scenario both extracted and selected)
+        """
+        code = self.get_value_code(tag, value)
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        offsets = self.index_offsets[tag]
+        return self.index_rows[tag][offsets[code]:offsets[code + 1]]
+
+    def get_counts(self, tag: str) -> dict:
+        """
+        Number of (pattern, value) pairs of each tag value
+        """
+        counts = np.diff(self.index_offsets[tag]).tolist()
+        return dict(zip(self.tag_values[tag], counts))
+
+    def get_src_files(self, tag: str, full_path: bool = False) -> dict:
+        """
+        Source files (or their basenames) of each tag value, in pattern order
+        """
+        src_files = (self.columns['src_file'] if full_path else self.src_file_basenames)[self.index_rows[tag]].tolist()
+        offsets = self.index_offsets[tag].tolist()
+        return {
+            value: src_files[offsets[code]:offsets[code + 1]]
+            for code, value in enumerate(self.tag_values[tag])
+        }
+
+    def filter(self, **tag_values) -> np.ndarray:
+        """
+        Ids of the patterns matching every given tag, e.g. filter(scenario='8T8R', pattern_type=['a', 'b'])
+        :param tag_values: Tag --> value, or list of accepted values
+        """
+        mask = np.ones(self.num_patterns, dtype=bool)
+        for tag, values in tag_values.items():
+            if not isinstance(values, (list, tuple, set)):
+                values = [values]
+            codes = [code for code in (self.get_value_code(tag, value) for value in values) if code is not None]
+            tag_mask = np.zeros(self.num_patterns, dtype=bool)
+            tag_mask[self.tag_rows[tag][np.isin(self.tag_codes[tag], codes)]] = True
+            mask &= tag_mask
+        return np.flatnonzero(mask)
@@ -0,0 +1,64 @@
+"""
+Polar plot geometry of the pattern cuts, shared by pattern_visualizer and pattern_contact_sheets
+"""
+import functools
+import math
+
+import numpy as np
+
+from .pattern_data import PapPatternData
+
+# Polar plot scale: gains are clamped at PLOT_R_CLAMP dB and drawn at radius gain - PLOT_R_MIN
+PLOT_R_MIN = -60
+PLOT_R_CLAMP = -50
+PLOT_GRID_RADII = (15, 30, 45, 60)
+
+
+def get_pattern_angles(pattern: PapPatternData) -> np.ndarray:
+    """
+    Angle of each gain of the cut, in radians
+    """
+    return np.arange(pattern.start_angle, pattern.end_angle, pattern.step) * math.pi / 180
+
+
+def get_pattern_xy(pattern: PapPatternData, clockwise: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cartesian coordinates of the cut on the polar plot, closed (the first point is repeated at the end)
+    """
+    ang = get_pattern_angles(pattern)
+    r = np.maximum(PLOT_R_CLAMP, pattern.gains[:len(ang)]) - PLOT_R_MIN
+    x = r * np.cos(ang)
+    y = r * np.sin(ang)
+    if clockwise:
+        y = -y
+    return np.append(x, x[:1]), np.append(y, y[:1])
+
+
+@functools.lru_cache(maxsize=None)
+def get_grid_circles(start_angle: float, end_angle: float, step: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Coordinates of the grid circles (one closed circle per column), sampled at the angles of a cut. Cached, since
+    every cut of a library usually shares the same angles. The arrays are shared: don't modify them.
+    """
+    ang = np.arange(start_angle, end_angle, step) * math.pi / 180
+    ang = np.append(ang, ang[:1])
+    radii = np.array(PLOT_GRID_RADII, dtype=np.float64)
+    return np.cos(ang)[:, None] * radii, np.sin(ang)[:, None] * radii
+
+
+@functools.lru_cache(maxsize=None)
+def get_grid_segments() -> list[np.ndarray]:
+    """
+    Polylines of the complete grid (circles every degree, axes and diagonals), to be drawn as a single collection
+    """
+    x, y = get_grid_circles(0, 360, 1)
+    r_max = max(PLOT_GRID_RADII)
+    r_diag = r_max / math.sqrt(2)
+    lines = [np.column_stack((x[:, i], y[:, i])) for i in range(len(PLOT_GRID_RADII))]
+    lines += [
+        np.array([[-r_max, 0], [r_max, 0]]),
+        np.array([[0, -r_max], [0, r_max]]),
+        np.array([[-r_diag, -r_diag], [r_diag, r_diag]]),
+        np.array([[-r_diag, r_diag], [r_diag, -r_diag]]),
+    ]
+    return lines
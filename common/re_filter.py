@@ -1,19 +1,49 @@
+import os
 import re
 
+# Constructs whose result may change when more characters are appended after the matched text
+# (end anchors, word boundaries, lookaheads). Deny regexes using them are not used to prune directories.
+END_SENSITIVE_RE = re.compile(r'\$|\\[bBZ]|\(\?[=!]')
+
+# Constructs that depend on group numbering or global flags, which break when regexes are merged
+UNMERGEABLE_RE = re.compile(r'\\[1-9]|\(\?P=|\(\?\(|\(\?[aiLmsux]+\)')
+
+
+def compile_alternation(regexes: list[str]) -> list[re.Pattern]:
+    """
+    Compiles a list of regexes into a single alternation, which matches when any of
+    them does. Falls back to one compiled pattern per regex when they can't be merged.
+    """
+    if len(regexes) == 0:
+        return []
+    if not any(UNMERGEABLE_RE.search(regex) for regex in regexes):
+        try:
+            return [re.compile('|'.join(['(?:' + regex + ')' for regex in regexes]))]
+        except re.error:
+            pass
+    return [re.compile(regex) for regex in regexes]
+
 
 class ReFilter:
+    """
+    Allow/deny filter of paths. A path passes when it matches no deny regex and
+    at least one allow regex (re.match semantics). Each list is compiled into a
+    single alternation.
+    """
+
     def __init__(self, allow: list[str], deny: list[str]):
         self.allow = allow
         self.deny = deny
+        self.allow_patterns = compile_alternation(allow)
+        self.deny_patterns = compile_alternation(deny)
+        # deny regexes that, once matched by a directory prefix, match every path under it
+        self.dir_deny_patterns = [re.compile(regex) for regex in deny if END_SENSITIVE_RE.search(regex) is None]
 
     def eval(self, value: str) -> bool:
-        for regex in self.deny:
-            if re.match(regex, value) is not None:
-                return False
-        for regex in self.allow:
-            if re.match(regex, value) is not None:
-                return True
-        return False
+        return (
+            not any(pattern.match(value) for pattern in self.deny_patterns)
+            and any(pattern.match(value) for pattern in self.allow_patterns)
+        )
 
     def apply(self, values: list[str]):
         result = []
@@ -21,3 +51,11 @@ class ReFilter:
             if self.eval(value):
                 result.append(value)
         return result
+
+    def is_dir_denied(self, dir_path: str) -> bool:
+        """
+        True if every path under the directory is denied, so the whole subtree can be skipped
+        :param dir_path: Directory path, in the same form as the filtered paths (e.g. relative to the source folder)
+        """
+        prefix = dir_path + os.sep
+        return any(pattern.match(prefix) for pattern in self.dir_deny_patterns)
@@ -0,0 +1,132 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .consts import SRC_FILES_ORDER__SORTED, SRC_FILES_ORDER__WALK
+from .re_filter import ReFilter
+
+# Directories listed at once by default. Listing a directory on a network share is bound by
+# the round-trip latency, not by the CPU, so more threads than cores pay off
+SCAN_DEFAULT_NUM_WORKERS = 16
+
+
+class SrcFileEntry:
+    """
+    Source file found by SrcFileScanner
+    """
+    __slots__ = ('path', 'size', 'mtime')
+
+    def __init__(self, path: str, size: int | None, mtime: float | None):
+        """
+        :param path: Path relative to the source folder
+        :param size: Size in bytes, None if it could not be read
+        :param mtime: Last modification time (seconds since the epoch), None if it could not be read
+        """
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+
+    def __repr__(self):
+        return f'SrcFileEntry({self.path!r}, size={self.size}, mtime={self.mtime})'
+
+
+class SrcFileScanner:
+    """
+    Lists the source files of a folder that pass the file filter, with their
+    size and modification time.
+
+    Directories are listed with os.scandir in a thread pool: every subdirectory
+    found is submitted right away, so the listings of a level overlap instead of
+    waiting for each other. Subtrees denied by the filter are not listed, nor
+    symbolic links to directories followed. The files are returned sorted by
+    relative path, or in the same order as a top-down os.walk (files of a
+    directory in listing order, then its subdirectories).
+    """
+
+    def __init__(
+            self,
+            src_folder: str,
+            re_filter: ReFilter,
+            num_workers: int = SCAN_DEFAULT_NUM_WORKERS,
+            order: str = SRC_FILES_ORDER__SORTED,
+    ):
+        """
+        :param src_folder: Folder to scan
+        :param re_filter: Filter of the file paths, relative to src_folder
+        :param num_workers: Directories listed at once
+        :param order: SRC_FILES_ORDER__SORTED (by relative path) or SRC_FILES_ORDER__WALK (os.walk order, which
+                      depends on the file system)
+        """
+        if order not in (SRC_FILES_ORDER__SORTED, SRC_FILES_ORDER__WALK):
+            raise ValueError('Unsupported source files order: ' + str(order))
+        self.src_folder = src_folder
+        self.re_filter = re_filter
+        self.num_workers = num_workers
+        self.order = order
+
+    def scan(self) -> list[SrcFileEntry]:
+        # relative directory path --> (subdirectories to scan, accepted files), in listing order
+        listings: dict[str, tuple[list[str], list[SrcFileEntry]]] = {}
+
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            pending = {executor.submit(self.scan_dir, ''): ''}
+            while len(pending) > 0:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rel_dir = pending.pop(future)
+                    listings[rel_dir] = future.result()
+                    for rel_subdir in listings[rel_dir][0]:
+                        pending[executor.submit(self.scan_dir, rel_subdir)] = rel_subdir
+
+        if self.order == SRC_FILES_ORDER__SORTED:
+            return sorted((entry for _, files in listings.values() for entry in files), key=lambda e: e.path)
+
+        # assemble the listings in os.walk order (pre-order, depth first)
+        entries = []
+        stack = ['']
+        while len(stack) > 0:
+            rel_subdirs, files = listings[stack.pop()]
+            entries.extend(files)
+            stack.extend(reversed(rel_subdirs))
+        return entries
+
+    def scan_dir(self, rel_dir: str) -> tuple[list[str], list[SrcFileEntry]]:
+        """
+        Lists a directory: the subdirectories to scan (not denied by the filter, not
+        symbolic links) and the files accepted by the filter. Unreadable directories
+        are skipped, like os.walk does.
+        :param rel_dir: Directory path, relative to the source folder ('' for the source folder itself)
+        """
+        rel_subdirs = []
+        files = []
+        try:
+            with os.scandir(os.path.join(self.src_folder, rel_dir)) as it:
+                for entry in it:
+                    rel_path = os.path.join(rel_dir, entry.name)
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+
+                    if is_dir:
+                        try:
+                            is_symlink = entry.is_symlink()
+                        except OSError:
+                            is_symlink = False
+                        # skip the subtrees whose paths are all denied by the filter
+                        if not is_symlink and not self.re_filter.is_dir_denied(rel_path):
+                            rel_subdirs.append(rel_path)
+                    elif self.re_filter.eval(rel_path):
+                        files.append(self.get_entry(rel_path, entry))
+        except OSError:
+            pass
+
+        return rel_subdirs, files
+
+    @staticmethod
+    def get_entry(rel_path: str, entry: os.DirEntry) -> SrcFileEntry:
+        # the directory listing already holds the stat on Windows, elsewhere it costs one stat call
+        try:
+            stat = entry.stat()
+        except OSError:
+            return SrcFileEntry(rel_path, None, None)
+        return SrcFileEntry(rel_path, stat.st_size, stat.st_mtime)
@@ -0,0 +1,72 @@
+import io
+from typing import BinaryIO
+
+
+def escape_xml(data: str) -> str:
+    return data.replace('&', '&amp;').replace('<', '&lt;').replace('"', '&quot;').replace('>', '&gt;')
+
+
+class XmlStreamWriter:
+    """
+    Incremental XML writer: elements are written to the output as they are
+    opened, so the document is never held in memory. With indentation, the
+    layout matches minidom's toprettyxml (one element per line, text-only
+    elements inline, empty elements self-closed).
+    """
+
+    def __init__(self, file: BinaryIO, indent: str | None = '  '):
+        """
+        :param file: Binary output stream, left open by close()
+        :param indent: Indentation of each nesting level, or None to write the document on a single line
+        """
+        self.out = io.TextIOWrapper(file, encoding='utf-8', newline='')
+        self.indent = indent or ''
+        self.newline = '\n' if indent is not None else ''
+        self.open_tags: list[str] = []
+        # True while the last start tag is not yet closed with '>' (it may still become self-closing)
+        self.start_tag_pending = False
+
+        self.out.write('<?xml version="1.0" encoding="utf-8"?>' + self.newline)
+
+    def start(self, tag: str, attrs: dict[str, str] | None = None):
+        self.close_pending_start_tag()
+        self.out.write(self.indent * len(self.open_tags) + '<' + tag + self.format_attrs(attrs))
+        self.open_tags.append(tag)
+        self.start_tag_pending = True
+
+    def end(self):
+        tag = self.open_tags.pop()
+        if self.start_tag_pending:
+            self.out.write('/>' + self.newline)
+            self.start_tag_pending = False
+        else:
+            self.out.write(self.indent * len(self.open_tags) + '</' + tag + '>' + self.newline)
+
+    def element(self, tag: str, text: str | None = None, attrs: dict[str, str] | None = None):
+        """
+        Writes a leaf element. Elements without text are self-closed.
+        """
+        self.close_pending_start_tag()
+        line = self.indent * len(self.open_tags) + '<' + tag + self.format_attrs(attrs)
+        if text:
+            line += '>' + escape_xml(text) + '</' + tag + '>'
+        else:
+            line += '/>'
+        self.out.write(line + self.newline)
+
+    def close(self):
+        while self.open_tags:
+            self.end()
+        self.out.flush()
+        self.out.detach()
+
+    def close_pending_start_tag(self):
+        if self.start_tag_pending:
+            self.out.write('>' + self.newline)
+            self.start_tag_pending = False
+
+    @staticmethod
+    def format_attrs(attrs: dict[str, str] | None) -> str:
+        if not attrs:
+            return ''
+        return ''.join([' ' + name + '="' + escape_xml(value) + '"' for name, value in attrs.items()])
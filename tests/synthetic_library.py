@@ -0,0 +1,195 @@
+"""
+Synthetic .msi pattern libraries for the tests, laid out like the vendor libraries:
+<root>/<scenario>/<tilt>/AQQN-3500-<tilt>-ap00-<scenario>-<beam>.msi
+"""
+import contextlib
+import io
+import os
+import random
+import zipfile
+
+from common.beamforming_antenna_generator import BeamformingAntennaGenerator
+from common.consts import (
+    PATTERN_FILE_FORMAT__MSI,
+    PATTERN_TYPE__BEAMFORMING_ELEMENT,
+    PATTERN_TYPE__BEAMSWITCHING_SERVICE,
+    PATTERN_TYPE__BROADCAST,
+)
+from common.msi_parser import MsiParser
+from common.pattern_name_param_extractor import PatternNameParamExtractor
+from common.pattern_name_param_selector import PatternNameParamSelector
+from common.pattern_payload_param_extractor import PatternPayloadParamExtractor
+from common.re_filter import ReFilter
+
+LINE_ENDINGS = {'lf': '\n', 'crlf': '\r\n', 'cr': '\r'}
+
+
+def get_cut(rng: random.Random, azimuth: float, width: float, num_lobes: int = 1) -> list[float]:
+    """
+    Loss [dB] of a synthetic cut every degree: main lobes at azimuth (and every 360 / num_lobes), noisy back side
+    """
+    losses = []
+    for angle in range(360):
+        d = min(abs((angle - azimuth - k * 360 / num_lobes + 180) % 360 - 180) for k in range(num_lobes))
+        loss = min(40.0, 12 * (d / width) ** 2) + (rng.uniform(0, 3) if d > 90 else 0)
+        losses.append(round(loss, 2))
+    return losses
+
+
+def write_msi(path: str, name: str, horiz_losses: list[float], vert_losses: list[float], line_ending: str = 'lf',
+              gain: str = '24.5 dBi'):
+    lines = [
+        'NAME {}'.format(name),
+        'MAKE Synthetic',
+        'FREQUENCY 3500',
+        'GAIN {}'.format(gain),
+        'TILT ELECTRICAL',
+        'COMMENT synthetic  pattern',
+        'HORIZONTAL 360',
+    ]
+    lines += ['{}\t{}'.format(angle, loss) for angle, loss in enumerate(horiz_losses)]
+    lines.append('VERTICAL 360')
+    lines += ['{}.0 {}'.format(angle, loss) for angle, loss in enumerate(vert_losses)]
+    nl = LINE_ENDINGS[line_ending]
+    with open(path, 'w', newline='') as file:
+        file.write(nl.join(lines) + nl)
+
+
+def make_library(root: str, num_scenarios: int = 2, tilts: tuple = (-2, 0, 6), num_beams: int = 8, seed: int = 1):
+    """
+    Writes a library of Envelope, Element and RefBeam<n> patterns
+    :return: Paths of the written files
+    """
+    rng = random.Random(seed)
+    paths = []
+    for s in range(num_scenarios):
+        scenario = '{}deg-H{}V1'.format(65 + 15 * s, s + 1)
+        for tilt in tilts:
+            tilt_tag = ('p' if tilt >= 0 else 'n') + str(abs(tilt))
+            folder = os.path.join(root, scenario, tilt_tag)
+            os.makedirs(folder, exist_ok=True)
+            beams = [('Envelope', 0, 30), ('Element', 0, 40)] + [('RefBeam{}'.format(b), (b - num_beams // 2) * 12, 8) for b in range(num_beams)]
+            for beam, azimuth, width in beams:
+                path = os.path.join(folder, 'AQQN-3500-{}-ap00-{}-{}.msi'.format(tilt_tag, scenario, beam))
+                write_msi(
+                    path, beam,
+                    get_cut(rng, azimuth % 360, width),
+                    get_cut(rng, 90 + tilt, 6),
+                    line_ending=list(LINE_ENDINGS)[len(paths) % len(LINE_ENDINGS)],
+                )
+                paths.append(path)
+    return paths
+
+
+def get_pattern_type(basename: str) -> str:
+    if 'Envelope' in basename:
+        return PATTERN_TYPE__BROADCAST
+    if 'Element' in basename:
+        return PATTERN_TYPE__BEAMFORMING_ELEMENT
+    return PATTERN_TYPE__BEAMSWITCHING_SERVICE
+
+
+def get_params(src_folder: str, **extra_params) -> dict:
+    """
+    Generator configuration of a library written by make_library
+    :param src_folder: Library folder or .zip archive
+    :param extra_params: Parameters added or replaced
+    """
+    params = {
+        'src_folder': src_folder,
+        'pattern_file_format': PATTERN_FILE_FORMAT__MSI,
+        'version': '7.4',
+        'filename': 'SYN.pafx',
+        'name': 'SYN',
+        'type': 'Cellular',
+        'comment': 'synthetic',
+        'manufacturer': 'Nokia',
+        'cost': 0,
+        'cost_unit': 'USD',
+        'length_cm': 100.1,
+        'width_cm': 44.8,
+        'depth_cm': 11.3,
+        'weight_kg': 36,
+        'wind_load_factor': 587,
+        'supp_elec_tilt': True,
+        'supp_elec_azimuth': False,
+        'supp_elec_beamwidth': False,
+        'cont_adj_elec_tilt': False,
+        'src_file_re_filter': ReFilter(allow=[r'.*(Envelope|Element|RefBeam).*\.msi$'], deny=[]),
+        'pattern_name_extractor': PatternNameParamExtractor(path_part='basename', extract_re=r'(?P<cg>.+)\..{3}$'),
+        'scenario_extractor': PatternNameParamExtractor(
+            path_part='basename', extract_re=r'.*-(?P<cg>\d+deg.+)-(Envelope|RefBeam).*'
+        ),
+        'v_port_name_extractor': PatternNameParamExtractor(
+            path_part='basename', extract_re=r'.*-(?P<cg>\d+deg.+)-(Envelope|RefBeam).*'
+        ),
+        'pattern_type_extractor': PatternNameParamExtractor(path_part='basename', post_capture_proc=get_pattern_type),
+        'center_freq_extractor': PatternPayloadParamExtractor(extract_fn=lambda p: int(float(p.header['FREQUENCY']))),
+        'min_freq_extractor': PatternPayloadParamExtractor(extract_fn=lambda p: int(float(p.header['FREQUENCY'])) - 100),
+        'max_freq_extractor': PatternPayloadParamExtractor(extract_fn=lambda p: int(float(p.header['FREQUENCY'])) + 100),
+        'electrical_tilt_extractor': PatternNameParamExtractor(
+            path_part='basename', extract_re=r'.*-(?P<cg>(p|n)\d+)-.*',
+            post_capture_proc=lambda r: int(r.replace('p', '').replace('n', '-')),
+        ),
+        'polarization_extractor': PatternNameParamExtractor(post_capture_proc=lambda r: 'Vertical'),
+        'polarization_type_extractor': PatternNameParamExtractor(post_capture_proc=lambda r: None),
+        'v_port_number_of_ports_extractor': PatternNameParamExtractor(post_capture_proc=lambda r: 1),
+        'horiz_number_of_elements_extractor': PatternNameParamExtractor(post_capture_proc=lambda r: 4),
+        'horiz_sep_dist_cm_extractor': PatternNameParamExtractor(post_capture_proc=lambda r: 4.3),
+        'vert_number_of_elements_extractor': PatternNameParamExtractor(post_capture_proc=lambda r: 8),
+        'vert_sep_dist_cm_extractor': PatternNameParamExtractor(post_capture_proc=lambda r: 17.7),
+        'beamswitching_service_name_extractor': PatternNameParamExtractor(
+            post_capture_proc=lambda r: 'PDSCH' if 'RefBeam' in r else 'None'
+        ),
+        'beamswitching_horiz_angle_extractor': PatternPayloadParamExtractor(
+            extract_fn=lambda p: p.horiz_pap_pattern.get_boresight_deg()
+        ),
+        'beamswitching_vert_angle_extractor': PatternPayloadParamExtractor(
+            extract_fn=lambda p: p.vert_pap_pattern.get_boresight_deg()
+        ),
+        'scenario_selector': PatternNameParamSelector(select_re=lambda n: '.*' if 'Element' in n else None),
+        'v_port_name_selector': PatternNameParamSelector(select_re=lambda n: '.*' if 'Element' in n else None),
+    }
+    params.update(extra_params)
+    return params
+
+
+class CountingParser(MsiParser):
+    """
+    MsiParser recording the files it parses
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.parsed = []
+
+    def parse(self, src_file: str, content: bytes | None = None):
+        self.parsed.append(os.path.basename(src_file))
+        return super().parse(src_file, content)
+
+
+def build_generator(params: dict) -> BeamformingAntennaGenerator:
+    """
+    BeamformingAntennaGenerator of the params, its log discarded
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return BeamformingAntennaGenerator(params)
+
+
+def generate_pafx(generator: BeamformingAntennaGenerator, output_dir: str, seed: int | None = 0) -> dict[str, bytes]:
+    """
+    Generates the .pafx of a generator, its log discarded
+    :param seed: Seed of the beam angle noise, so that antenna.paf can be compared. None leaves it unseeded
+    :return: Archive entry name --> content
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if seed is not None:
+        random.seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert generator.generate(output_dir)
+    return read_archive_entries(os.path.join(output_dir, generator.params['filename']))
+
+
+def read_archive_entries(path: str) -> dict[str, bytes]:
+    with zipfile.ZipFile(path) as zip_file:
+        return {name: zip_file.read(name) for name in zip_file.namelist()}
@@ -0,0 +1,44 @@
+import glob
+import os
+
+from common.batch_generator import generate_model, load_model_params
+from tests.synthetic_library import get_params, make_library
+
+CONFIGS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'antenna_scripts', 'configs')
+
+
+def write_config(path: str, src_folder: str):
+    with open(path, 'w') as file:
+        file.write('from tests.synthetic_library import get_params\n\n')
+        file.write('params = get_params({!r})\n'.format(src_folder))
+
+
+def test_generate_model(tmp_path):
+    make_library(str(tmp_path / 'lib'), num_beams=3)
+    config = str(tmp_path / 'model.py')
+    write_config(config, str(tmp_path / 'lib'))
+
+    result = generate_model(config, str(tmp_path))
+    assert result['status'] == 'ok', result['error']
+    assert os.path.isfile(result['output_path'])
+    assert os.path.isfile(result['log_path'])
+
+
+def test_generate_model_write_error(tmp_path):
+    make_library(str(tmp_path / 'lib'), num_beams=3)
+    config = str(tmp_path / 'model.py')
+    write_config(config, str(tmp_path / 'lib'))
+    # the .pafx path is taken by a directory: the writer can't create the file
+    os.makedirs(tmp_path / get_params('')['filename'])
+
+    result = generate_model(config, str(tmp_path))
+    assert result['status'] == 'error'
+    assert 'was not generated' in result['error']
+
+
+def test_catalogue_configs():
+    configs = sorted(glob.glob(os.path.join(CONFIGS_DIR, '*.py')))
+    assert len(configs) > 0
+    for config in configs:
+        params = load_model_params(config)
+        assert params['filename'] == os.path.splitext(os.path.basename(config))[0] + '.pafx'
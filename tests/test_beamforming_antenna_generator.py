@@ -0,0 +1,91 @@
+import os
+import zipfile
+
+import pytest
+
+from common.consts import SRC_FILES_ORDER__WALK
+from tests.synthetic_library import build_generator, generate_pafx, get_params, make_library
+
+
+def get_pattern_values(generator) -> list[dict]:
+    """
+    Patterns without their gain data, to be compared
+    """
+    return [
+        {field: value for field, value in pattern.items() if field not in ['horiz_pap_pattern', 'vert_pap_pattern']}
+        for pattern in generator.patterns
+    ]
+
+
+@pytest.mark.parametrize('num_workers', [2, None])
+def test_parallel_parsing(tmp_path, num_workers):
+    make_library(str(tmp_path / 'lib'), num_beams=6)
+    serial = build_generator(get_params(str(tmp_path / 'lib')))
+    parallel = build_generator(get_params(str(tmp_path / 'lib'), num_workers=num_workers))
+
+    assert get_pattern_values(parallel) == get_pattern_values(serial)
+    for serial_pattern, parallel_pattern in zip(serial.patterns, parallel.patterns):
+        for cut in ['horiz_pap_pattern', 'vert_pap_pattern']:
+            assert parallel_pattern[cut].gains.tolist() == serial_pattern[cut].gains.tolist()
+    assert generate_pafx(parallel, str(tmp_path / 'parallel')) == generate_pafx(serial, str(tmp_path / 'serial'))
+
+
+def test_streaming(tmp_path):
+    make_library(str(tmp_path / 'lib'), num_beams=6)
+    default = build_generator(get_params(str(tmp_path / 'lib')))
+    streaming = build_generator(get_params(str(tmp_path / 'lib'), streaming=True))
+
+    # only the metadata is kept
+    assert get_pattern_values(streaming) == get_pattern_values(default)
+    assert all(
+        pattern['horiz_pap_pattern'] is None and pattern['vert_pap_pattern'] is None for pattern in streaming.patterns
+    )
+
+    # the gains are produced again, in pattern order, when writing
+    for pattern, pap_pattern in zip(default.patterns, streaming.iter_pap_patterns(), strict=True):
+        assert pap_pattern['src_file'] == pattern['src_file']
+        assert pap_pattern['horiz_pap_pattern'].gains.tolist() == pattern['horiz_pap_pattern'].gains.tolist()
+    assert generate_pafx(streaming, str(tmp_path / 'streaming')) == generate_pafx(default, str(tmp_path / 'default'))
+
+
+def test_header_scan(tmp_path):
+    make_library(str(tmp_path / 'lib'), num_beams=4)
+    default = build_generator(get_params(str(tmp_path / 'lib')))
+    header_scan = build_generator(get_params(str(tmp_path / 'lib'), header_scan=True))
+    assert not header_scan.analyzed
+
+    # same tags, the values that need the gain analysis are left empty
+    tags = header_scan.list_extracted_tags(log=False)
+    default_tags = default.list_extracted_tags(log=False)
+    for tag in ['beamswitching_horiz_angle', 'beamswitching_vert_angle']:
+        assert tags.pop(tag) == {None: len(default.patterns)}
+        default_tags.pop(tag)
+    assert tags == default_tags
+    for pattern, default_pattern in zip(header_scan.patterns, default.patterns, strict=True):
+        assert pattern['center_freq'] == default_pattern['center_freq']
+        assert pattern['boresight_gain'] == default_pattern['boresight_gain']
+        for field in ['horiz_beamwidth_deg', 'front_to_back_ratio_db', 'beamswitching_horiz_angle', 'horiz_pap_pattern']:
+            assert pattern[field] is None
+
+    # generate() runs the full analysis first
+    assert generate_pafx(header_scan, str(tmp_path / 'header_scan')) == generate_pafx(default, str(tmp_path / 'default'))
+    assert header_scan.analyzed
+    assert get_pattern_values(header_scan) == get_pattern_values(default)
+
+
+def test_src_files_order(tmp_path):
+    lib_folder = str(tmp_path / 'lib')
+    paths = make_library(lib_folder, num_beams=3)
+    src_files = [os.path.relpath(path, lib_folder) for path in paths]
+    # archive members written in reverse order
+    archive_path = str(tmp_path / 'lib.zip')
+    with zipfile.ZipFile(archive_path, 'w') as zip_file:
+        for src_file in reversed(src_files):
+            zip_file.write(os.path.join(lib_folder, src_file), src_file)
+
+    # the same sorted paths from a folder or an archive
+    assert build_generator(get_params(lib_folder)).src_files == sorted(src_files)
+    assert build_generator(get_params(archive_path)).src_files == sorted(src_files)
+    assert build_generator(get_params(archive_path, src_files_order=SRC_FILES_ORDER__WALK)).src_files == list(
+        reversed(src_files)
+    )
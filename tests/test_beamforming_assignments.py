@@ -0,0 +1,120 @@
+import itertools
+import random
+
+import pytest
+
+from common.beamforming_assignments import BeamformingAssignments, add_rand_noise
+from common.consts import PATTERN_TYPE__BROADCAST, PATTERN_TYPE__BEAMFORMING_ELEMENT, \
+    PATTERN_TYPE__BEAMSWITCHING_SERVICE
+
+PARAMS = {
+    'supp_elec_tilt': True,
+    'supp_elec_azimuth': False,
+    'supp_elec_beamwidth': False,
+    'cont_adj_elec_tilt': False,
+}
+
+
+def get_pattern(name: str, pattern_type: str, scenario: str | None, v_port_name: str | None,
+                selected_scenarios: list[str] = (), selected_v_port_names: list[str] = (), **fields) -> dict:
+    return {
+        'name': name,
+        'pattern_type': pattern_type,
+        'scenario': scenario,
+        'v_port_name': v_port_name,
+        'selected_scenarios': list(selected_scenarios),
+        'selected_v_port_names': list(selected_v_port_names),
+        'min_freq': 3400,
+        'max_freq': 3800,
+        'horiz_number_of_elements': 8,
+        'horiz_sep_dist_cm': 4.2,
+        'vert_number_of_elements': 4,
+        'vert_sep_dist_cm': 5.0,
+        'v_port_number_of_ports': 2,
+        'polarization': '+45',
+        'polarization_type': 'Slant',
+        'beamswitching_service_name': None,
+        'beamswitching_horiz_angle': None,
+        'beamswitching_vert_angle': None,
+    } | fields
+
+
+def get_beam(name: str, scenario: str, v_port_name: str, service: str, horiz_angle: float) -> dict:
+    return get_pattern(
+        name, PATTERN_TYPE__BEAMSWITCHING_SERVICE, scenario, v_port_name, beamswitching_service_name=service,
+        beamswitching_horiz_angle=horiz_angle, beamswitching_vert_angle=0.0
+    )
+
+
+def build(patterns: list[dict]) -> BeamformingAssignments:
+    uids = itertools.count()
+    return BeamformingAssignments(PARAMS, patterns, 'controller', lambda: f'uid{next(uids)}')
+
+
+def test_extracted_assignments():
+    random.seed(0)
+    assignments = build([
+        get_pattern('env', PATTERN_TYPE__BROADCAST, 'S1', 'P1'),
+        get_pattern('elem', PATTERN_TYPE__BEAMFORMING_ELEMENT, 'S1', 'P1'),
+        get_beam('b0', 'S1', 'P1', 'SSB', -30.0),
+        get_beam('b1', 'S1', 'P1', 'SSB', 30.0),
+        get_beam('c0', 'S1', 'P2', 'CSI', 0.0),
+        get_pattern('other', PATTERN_TYPE__BROADCAST, 'S2', 'P1', min_freq=2500, max_freq=2700),
+    ])
+    assert list(assignments.scenarios) == ['S1', 'S2']
+    s1 = assignments.scenarios['S1']
+    assert [s1['uid'], s1['v_ports']['P1']['uid'], s1['v_ports']['P2']['uid']] == ['uid0', 'uid1', 'uid2']
+    assert s1['horiz_number_of_elements'] == 8 and s1['v_ports']['P1']['number_of_ports'] == 2
+
+    v_band = s1['v_ports']['P1']['v_bands']['3400-3800']
+    assert assignments.v_bands[('S1', 'P1', '3400-3800')] is v_band
+    assert v_band['broadcast_patterns'] == ['env']
+    assert v_band['beamforming_element_patterns'] == ['elem']
+    assert v_band['electrical_controller_name'] == 'controller'
+    assert v_band['supp_elec_tilt'] is True and v_band['supp_elec_azimuth'] is False
+    beams = v_band['beamswitching_service_patterns']['SSB']
+    assert [beam['pattern_name'] for beam in beams] == ['b0', 'b1']
+    assert [round(beam['horiz_angle']) for beam in beams] == [-30, 30]
+    assert all(beam['horiz_angle'] not in (-30.0, 30.0) for beam in beams)
+
+    assert list(s1['v_ports']['P2']['v_bands']['3400-3800']['beamswitching_service_patterns']) == ['CSI']
+    assert list(assignments.scenarios['S2']['v_ports']['P1']['v_bands']) == ['2500-2700']
+
+
+def test_selected_assignments():
+    assignments = build([
+        get_beam('b0', 'S1', 'P1', 'SSB', 0.0),
+        get_beam('b1', 'S2', 'P1', 'SSB', 0.0),
+        get_beam('b2', 'S2', 'P2', 'SSB', 0.0),
+        # shared by every scenario and virtual port, the missing S3 ignored
+        get_pattern('env', PATTERN_TYPE__BROADCAST, None, None, ['S1', 'S2', 'S3'], ['P1', 'P2']),
+        # extracted S1 / P1, also selected for S2: attached once to S1 / P1
+        get_pattern('elem', PATTERN_TYPE__BEAMFORMING_ELEMENT, 'S1', 'P1', ['S1', 'S2'], ['P1']),
+        # selected for a scenario only: combined with the extracted virtual port; beams are not deduplicated, so
+        # it is attached again to its extracted S1 / P1
+        get_beam('shared', 'S1', 'P1', 'SSB', 10.0) | {'selected_scenarios': ['S2']},
+    ])
+    v_bands = {key[:2]: v_band for key, v_band in assignments.v_bands.items()}
+    assert list(v_bands) == [('S1', 'P1'), ('S2', 'P1'), ('S2', 'P2')]
+    assert [v_band['broadcast_patterns'] for v_band in v_bands.values()] == [['env']] * 3
+    assert [v_band['beamforming_element_patterns'] for v_band in v_bands.values()] == [['elem'], ['elem'], []]
+    assert [
+        [beam['pattern_name'] for beam in v_band['beamswitching_service_patterns']['SSB']]
+        for v_band in v_bands.values()
+    ] == [['b0', 'shared', 'shared'], ['b1', 'shared'], ['b2']]
+
+
+def test_unassigned_patterns_are_ignored():
+    assignments = build([
+        get_pattern('env', PATTERN_TYPE__BROADCAST, None, 'P1'),
+        get_pattern('elem', PATTERN_TYPE__BEAMFORMING_ELEMENT, 'S1', None, ['S1'], ['P1']),
+    ])
+    assert assignments.scenarios == {} and assignments.v_bands == {}
+
+
+@pytest.mark.parametrize('v', [-90.0, 0.0, 12.345])
+def test_add_rand_noise(v):
+    random.seed(0)
+    noisy = [add_rand_noise(v) for _ in range(100)]
+    assert all(abs(n - v) <= 0.01 for n in noisy)
+    assert len(set(noisy)) > 1
@@ -0,0 +1,121 @@
+"""
+MsiParser bulk reader against the former line-by-line reader. Run as a script for the speed comparison:
+
+    python -m tests.test_msi_parser
+"""
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from common.msi_parser import MsiParser
+from tests.synthetic_library import get_cut, make_library, write_msi
+
+
+def extract_msi_data_by_line(src_file: str) -> dict:
+    """
+    Reference: the line-by-line reader MsiParser used before the bulk reader (text mode, universal newlines)
+    """
+    data = {
+        'header': {},
+        'horizontal': {},
+        'vertical': {},
+    }
+
+    with open(src_file, 'r') as file:
+        lines = file.readlines()
+
+    section = 'header'
+    for line in lines:
+        if str.isspace(line) or line is None or line == '':
+            continue
+        r = MsiParser.parse_msi_line(line)
+        key = r['key']
+        value = r['value']
+
+        # Detect current section
+        if key == 'HORIZONTAL':
+            section = 'horizontal'
+        if key == 'VERTICAL':
+            section = 'vertical'
+
+        # Header section
+        if section == 'header':
+            data['header'][key] = value
+
+        # Horizontal pattern section
+        elif section == 'horizontal':
+            if key == 'HORIZONTAL':
+                data['header'][key] = value
+            else:
+                data['horizontal'][key] = float(value)
+
+        # Vertical pattern section
+        elif section == 'vertical':
+            if key == 'VERTICAL':
+                data['header'][key] = value
+            else:
+                data['vertical'][key] = float(value)
+
+    return data
+
+
+def assert_same_msi_data(reference: dict, data: dict):
+    # the line-by-line reader keeps the line ending in the header values
+    assert {key: value.rstrip('\r\n') for key, value in reference['header'].items()} == data['header']
+    for cut in ['horizontal', 'vertical']:
+        assert [float(angle) for angle in reference[cut]] == data[cut][:, 0].tolist()
+        assert list(reference[cut].values()) == data[cut][:, 1].tolist()
+
+
+def test_read_msi_data_matches_line_reader(tmp_path):
+    parser = MsiParser()
+    paths = make_library(str(tmp_path), num_scenarios=1, tilts=(0,), num_beams=5)
+    for path in paths:
+        assert_same_msi_data(extract_msi_data_by_line(path), parser.read_msi_data(path))
+
+
+def test_line_endings(tmp_path):
+    parser = MsiParser()
+    rng = random.Random(0)
+    horiz_losses = get_cut(rng, 0, 10)
+    vert_losses = get_cut(rng, 90, 6)
+    parsed = {}
+    for line_ending in ['lf', 'crlf', 'cr']:
+        path = str(tmp_path / (line_ending + '.msi'))
+        write_msi(path, 'beam', horiz_losses, vert_losses, line_ending=line_ending)
+        data = parser.read_msi_data(path)
+        assert data['horizontal'].shape == (360, 2)
+        assert data['vertical'].shape == (360, 2)
+        assert_same_msi_data(extract_msi_data_by_line(path), data)
+
+        with open(path, 'rb') as file:
+            content = file.read()
+        header = parser.parse_header(path)
+        assert header.header == parser.parse_header(path, content).header
+        assert 'HORIZONTAL' not in header.header
+        parsed[line_ending] = parser.parse(path)
+
+    for line_ending in ['crlf', 'cr']:
+        assert parsed[line_ending].header == parsed['lf'].header
+        assert parsed[line_ending].horiz_boresight_deg == parsed['lf'].horiz_boresight_deg
+        assert parsed[line_ending].vert_beamwidth_deg == parsed['lf'].vert_beamwidth_deg
+        assert np.array_equal(parsed[line_ending].horiz_pap_pattern.gains, parsed['lf'].horiz_pap_pattern.gains)
+
+
+def benchmark(num_repeats: int = 3):
+    parser = MsiParser()
+    with tempfile.TemporaryDirectory() as root:
+        paths = make_library(root, num_scenarios=6, tilts=(-2, 0, 3, 6))
+        for name, read in [('line-by-line', extract_msi_data_by_line), ('bulk', parser.read_msi_data)]:
+            start_time = time.perf_counter()
+            for _ in range(num_repeats):
+                for path in paths:
+                    read(path)
+            seconds = (time.perf_counter() - start_time) / num_repeats / len(paths)
+            print('{:<14} {:>6.0f} us/file ({} files)'.format(name, seconds * 1e6, len(paths)))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,66 @@
+import os
+import zipfile
+
+import pytest
+
+from common import pafx_archive_writer
+from common.pafx_archive_writer import PafxArchiveWriter, read_raw_entry, supports_raw_entries
+
+ENTRIES = {f'pattern_{i}.pap': (b'%d\t-3.5\n' % i) * (100 + i) for i in range(20)}
+
+
+def write_archive(path: str, compress_level: int | None, src_path: str | None = None) -> None:
+    writer = PafxArchiveWriter(path, compress_level=compress_level, num_workers=4)
+    for name, data in ENTRIES.items():
+        writer.write(name, lambda f, data=data: f.write(data))
+    if src_path is not None:
+        with zipfile.ZipFile(src_path) as src_zip_file:
+            for name in src_zip_file.namelist():
+                writer.copy_entry('copy_' + name, src_zip_file, name)
+    writer.close()
+
+
+def read_archive(path: str) -> dict[str, bytes]:
+    with zipfile.ZipFile(path) as zip_file:
+        assert zip_file.testzip() is None
+        return {name: zip_file.read(name) for name in zip_file.namelist()}
+
+
+def test_supports_raw_entries(tmp_path):
+    # the zipfile internals used by append_raw_entry, on the running interpreter
+    with zipfile.ZipFile(tmp_path / 'a.zip', 'w') as zip_file:
+        assert supports_raw_entries(zip_file)
+
+
+@pytest.mark.parametrize('raw_entries', [True, False])
+@pytest.mark.parametrize('compress_level', [None, 1, 6])
+def test_write_and_copy(tmp_path, monkeypatch, raw_entries, compress_level):
+    if not raw_entries:
+        monkeypatch.setattr(pafx_archive_writer, 'supports_raw_entries', lambda zip_file: False)
+    src_path = str(tmp_path / 'src.zip')
+    write_archive(src_path, compress_level)
+    path = str(tmp_path / 'copy.zip')
+    write_archive(path, compress_level, src_path)
+
+    expected = ENTRIES | {'copy_' + name: data for name, data in ENTRIES.items()}
+    entries = read_archive(path)
+    assert list(entries) == list(expected)
+    assert entries == expected
+    if compress_level is not None:
+        assert os.path.getsize(path) < sum(len(data) for data in expected.values())
+
+
+def test_read_raw_entry(tmp_path):
+    path = str(tmp_path / 'a.zip')
+    write_archive(path, None)
+    with zipfile.ZipFile(path) as zip_file:
+        for name, data in ENTRIES.items():
+            assert read_raw_entry(zip_file, zip_file.getinfo(name)) == data
+
+
+def test_duplicate_name(tmp_path):
+    writer = PafxArchiveWriter(str(tmp_path / 'a.zip'))
+    writer.write('a.pap', lambda f: f.write(b'a'))
+    with pytest.raises(ValueError):
+        writer.write('a.pap', lambda f: f.write(b'b'))
+    writer.close()
@@ -0,0 +1,98 @@
+import contextlib
+import copy
+import io
+import os
+
+import numpy as np
+
+from common.beamforming_antenna_generator import BeamformingAntennaGenerator
+from common.pafx_diff import PafxDiff, diff_pafx, main
+from common.pafx_reader import PafxReader
+from tests.synthetic_library import get_params, make_library
+
+
+def generate(lib_folder: str, output_dir: str) -> str:
+    """
+    Generates the synthetic model, random noise of the beam angles not seeded
+    :return: Path of the .pafx file
+    """
+    os.makedirs(output_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        BeamformingAntennaGenerator(get_params(lib_folder)).generate(output_dir)
+    return os.path.join(output_dir, 'SYN.pafx')
+
+
+def test_regenerated_model_has_no_changes(tmp_path):
+    lib_folder = str(tmp_path / 'lib')
+    make_library(lib_folder, num_beams=4)
+    old_path = generate(lib_folder, str(tmp_path / 'old'))
+    new_path = generate(lib_folder, str(tmp_path / 'new'))
+
+    # the beam angles do differ, by the noise only
+    exact_diff = diff_pafx(old_path, new_path, angle_tolerance=0)
+    assert len(exact_diff.v_band_changes) > 0
+    assert all(
+        len(names) == 0
+        for changes in exact_diff.v_band_changes.values()
+        for change, names in changes.items() if change != 'beam_changed'
+    )
+
+    diff = diff_pafx(old_path, new_path)
+    assert not diff.has_changes
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert main([old_path, new_path]) == 0
+        assert main([old_path, new_path, '--angle-tolerance', '0']) == 1
+
+
+def test_duplicate_assignments(tmp_path):
+    lib_folder = str(tmp_path / 'lib')
+    make_library(lib_folder, num_scenarios=1, num_beams=3)
+    old = PafxReader().read(generate(lib_folder, str(tmp_path / 'old')))
+
+    # the first beam assigned twice to its virtual band and service, as a new beam id
+    i = int(np.flatnonzero(~np.isnan(old.assignments['beam_id']))[0])
+    new = copy.deepcopy(old)
+    new.assignments = {field: np.append(column, column[i:i + 1]) for field, column in old.assignments.items()}
+    new.assignments['beam_id'][-1] = np.nanmax(old.assignments['beam_id']) + 1
+    pattern_name = old.assignments['pattern_name'][i]
+
+    diff = PafxDiff(old, new)
+    assert diff.has_changes
+    [changes] = diff.v_band_changes.values()
+    assert changes['reassigned_in'] == [pattern_name]
+    assert all(len(names) == 0 for change, names in changes.items() if change != 'reassigned_in')
+
+    # and back: the duplicate is removed, the other beam is unchanged
+    [changes] = PafxDiff(new, old).v_band_changes.values()
+    assert changes['reassigned_out'] == [pattern_name]
+    assert all(len(names) == 0 for change, names in changes.items() if change != 'reassigned_out')
+
+    # a duplicate beam moved beyond the tolerance
+    moved = copy.deepcopy(new)
+    moved.assignments['horiz_angle'][-1] += 1
+    [changes] = PafxDiff(new, moved).v_band_changes.values()
+    assert changes['beam_changed'] == [pattern_name]
+
+
+def test_removed_beam(tmp_path):
+    lib_folder = str(tmp_path / 'lib')
+    paths = make_library(lib_folder, num_scenarios=1, tilts=(0,), num_beams=6)
+    old_path = generate(lib_folder, str(tmp_path / 'old'))
+    # a beam in the middle removed: the beam ids of the following ones are renumbered
+    removed_path = next(path for path in paths if path.endswith('RefBeam2.msi'))
+    os.remove(removed_path)
+    new_path = generate(lib_folder, str(tmp_path / 'new'))
+
+    old = PafxReader().read(old_path)
+    new = PafxReader().read(new_path)
+    old_beam_ids = {name: beam_id for name, beam_id in zip(old.assignments['pattern_name'], old.assignments['beam_id'])}
+    new_beam_ids = {name: beam_id for name, beam_id in zip(new.assignments['pattern_name'], new.assignments['beam_id'])}
+    assert any(old_beam_ids[name] != beam_id for name, beam_id in new_beam_ids.items() if 'RefBeam' in name)
+
+    removed_name = os.path.basename(removed_path)[:-len('.msi')]
+    diff = PafxDiff(old, new)
+    assert diff.removed_patterns == [removed_name]
+    assert diff.added_patterns == []
+    [changes] = diff.v_band_changes.values()
+    assert changes['removed'] == [removed_name]
+    assert all(len(names) == 0 for change, names in changes.items() if change != 'removed')
@@ -0,0 +1,113 @@
+import contextlib
+import io
+import os
+import random
+import shutil
+import zipfile
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from common.beamforming_antenna_generator import BeamformingAntennaGenerator
+from common.pafx_file_writer import PafxFileWriter
+from tests.synthetic_library import build_generator, generate_pafx, get_cut, get_params, make_library, write_msi
+
+
+def iter_failing(patterns: list[dict], error: Exception):
+    """
+    Yields the first patterns, then fails as a source file read would
+    """
+    yield from patterns[:3]
+    raise error
+
+
+@pytest.mark.parametrize('error', [OSError('disk full'), ValueError('bad gains')])
+def test_incremental_failure_removes_temp_file(tmp_path, error):
+    make_library(str(tmp_path / 'lib'), num_beams=3)
+    params = get_params(str(tmp_path / 'lib'), incremental=True)
+    output_path = str(tmp_path / params['filename'])
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = BeamformingAntennaGenerator(params)
+        generator.generate(str(tmp_path))
+    with open(output_path, 'rb') as file:
+        previous_content = file.read()
+
+    # every entry is rewritten: the new archive goes to the temp file, and fails half way
+    params['pafx_compress_level'] = 1
+    writer = PafxFileWriter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if isinstance(error, OSError):
+            writer.write_beamforming_antenna(output_path, params, generator.patterns, iter_failing(generator.patterns, error))
+        else:
+            with pytest.raises(ValueError):
+                writer.write_beamforming_antenna(output_path, params, generator.patterns, iter_failing(generator.patterns, error))
+
+    assert not os.path.exists(output_path + '.tmp')
+    with open(output_path, 'rb') as file:
+        assert file.read() == previous_content
+
+
+def get_entry_names(antenna_paf: bytes) -> dict[str, str]:
+    """
+    Pattern name --> .pap entry name, from antenna.paf
+    """
+    root = ET.fromstring(antenna_paf)
+    return {
+        pattern.findtext('Name'): pattern.findtext('AntennaPatternsEntryName')
+        for pattern in root.iter('Pattern')
+    }
+
+
+def test_dedup_pap_files(tmp_path):
+    paths = make_library(str(tmp_path / 'lib'), num_scenarios=1, tilts=(0,), num_beams=3)
+    # the same envelope, twice more under other names
+    for suffix in ['Copy1', 'Copy2']:
+        shutil.copy(paths[0], paths[0].replace('Envelope', 'Envelope' + suffix))
+
+    params = get_params(str(tmp_path / 'lib'))
+    entries = generate_pafx(build_generator(params), str(tmp_path / 'default'))
+    dedup_entries = generate_pafx(build_generator(params | {'dedup_pap_files': True}), str(tmp_path / 'dedup'))
+
+    pap_names = [name for name in entries if name.endswith('.pap')]
+    dedup_pap_names = [name for name in dedup_entries if name.endswith('.pap')]
+    assert len(dedup_pap_names) == len(pap_names) - 2
+    assert set(dedup_pap_names) < set(pap_names)
+
+    # every pattern points to an entry with its content
+    entry_names = get_entry_names(entries['antenna.paf'])
+    dedup_entry_names = get_entry_names(dedup_entries['antenna.paf'])
+    assert entry_names.keys() == dedup_entry_names.keys()
+    for name, entry_name in entry_names.items():
+        assert dedup_entries[dedup_entry_names[name]] == entries[entry_name]
+    # the three envelopes share the entry of the first one written
+    envelope_entry_names = {entry_name for name, entry_name in dedup_entry_names.items() if 'Envelope' in name}
+    assert len(envelope_entry_names) == 1
+    assert len({entry_name for name, entry_name in entry_names.items() if 'Envelope' in name}) == 3
+
+
+@pytest.mark.parametrize('params', [{}, {'dedup_pap_files': True}, {'pafx_compress_level': 1}, {'streaming': True}])
+def test_duplicate_basenames(tmp_path, params):
+    paths = make_library(str(tmp_path / 'lib'), num_scenarios=1, tilts=(0,), num_beams=3)
+    # a source file in another folder with the same basename as a library one
+    basename = os.path.basename(paths[-1])
+    os.makedirs(tmp_path / 'lib' / 'extra')
+    rng = random.Random(5)
+    write_msi(str(tmp_path / 'lib' / 'extra' / basename), 'other', get_cut(rng, 100, 20), get_cut(rng, 90, 6))
+
+    generator = build_generator(get_params(str(tmp_path / 'lib'), **params))
+    output_path = str(tmp_path / 'SYN.pafx')
+    with contextlib.redirect_stdout(io.StringIO()) as stdout:
+        assert generator.generate(str(tmp_path))
+    assert '1 source files share their .pap entry name' in stdout.getvalue()
+
+    # as when the entries were written to a folder: a single entry, from the last source file
+    with zipfile.ZipFile(output_path) as zip_file:
+        names = zip_file.namelist()
+        assert len(names) == len(set(names)) == len(paths) + 1
+        pap_name = basename.replace('.msi', '.pap')
+        last_pattern = [pattern for pattern in generator.patterns if pattern['output_file_basename'] == pap_name][-1]
+        expected = io.BytesIO()
+        PafxFileWriter().write_pap_file(expected, next(generator.iter_pap_patterns([last_pattern])))
+        assert zip_file.read(pap_name) == expected.getvalue()
+        # both patterns are still listed in antenna.paf
+        assert zip_file.read('antenna.paf').count(('<AntennaPatternsEntryName>' + pap_name).encode()) == 2
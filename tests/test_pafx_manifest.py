@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+from common.parse_cache import ParseCache
+from common.pafx_manifest import PAFX_MANIFEST_ENTRY
+from tests.synthetic_library import CountingParser, build_generator, generate_pafx, get_params, make_library, \
+    write_msi
+
+
+def generate_incremental(params: dict, output_dir: str) -> tuple[list[str], dict[str, bytes], list[dict]]:
+    """
+    Generates the .pafx in incremental mode
+    :return: Basenames of the parsed source files, archive entries, patterns
+    """
+    generator = build_generator(params)
+    generator.parser = CountingParser()
+    entries = generate_pafx(generator, output_dir)
+    return generator.parser.parsed, entries, generator.patterns
+
+
+def get_pattern_values(patterns: list[dict]) -> list[dict]:
+    return [
+        {key: value for key, value in pattern.items() if not key.endswith('_pap_pattern')}
+        for pattern in patterns
+    ]
+
+
+@pytest.mark.parametrize('params', [{}, {'streaming': True}, {'pafx_compress_level': 1}, {'dedup_pap_files': True}])
+def test_unchanged_sources_are_not_parsed(tmp_path, params):
+    paths = make_library(str(tmp_path / 'lib'), num_beams=3)
+    basenames = [os.path.basename(path) for path in paths]
+    params = get_params(str(tmp_path / 'lib'), incremental=True, **params)
+    output_dir = str(tmp_path / 'out')
+
+    parsed, entries, patterns = generate_incremental(params, output_dir)
+    assert sorted(parsed) == sorted(basenames * (2 if params.get('streaming') else 1))
+
+    # nothing changed: no source file is parsed, the archive is the same
+    parsed, warm_entries, warm_patterns = generate_incremental(params, output_dir)
+    assert parsed == []
+    assert warm_entries == entries
+    assert get_pattern_values(warm_patterns) == get_pattern_values(patterns)
+
+    # only the changed source file is parsed
+    write_msi(paths[2], 'changed', [0.0] * 360, [0.0] * 360)
+    parsed, changed_entries, changed_patterns = generate_incremental(params, output_dir)
+    assert set(parsed) == {basenames[2]}
+    full_entries = generate_pafx(build_generator(params | {'incremental': False}), str(tmp_path / 'full'))
+    assert {name: data for name, data in changed_entries.items() if name != PAFX_MANIFEST_ENTRY} == full_entries
+    assert changed_entries[basenames[2].replace('.msi', '.pap')] != entries[basenames[2].replace('.msi', '.pap')]
+
+
+def test_manifest_values(tmp_path):
+    make_library(str(tmp_path / 'lib'), num_scenarios=1, tilts=(0,), num_beams=2)
+    params = get_params(str(tmp_path / 'lib'), incremental=True)
+    _, entries, patterns = generate_incremental(params, str(tmp_path / 'out'))
+
+    manifest = json.loads(entries[PAFX_MANIFEST_ENTRY])
+    assert list(manifest['patterns']) == [pattern['src_file'] for pattern in patterns]
+    for pattern in patterns:
+        recorded = manifest['patterns'][pattern['src_file']]
+        assert recorded['src_digest'] == pattern['src_digest']
+        assert manifest['entries'][recorded['pap_digest']] == pattern['output_file_basename']
+        assert recorded['payload']['horiz_beamwidth_deg'] == pattern['horiz_beamwidth_deg']
+        assert recorded['payload']['front_to_back_ratio_db'] == pattern['front_to_back_ratio_db']
+        # values of the payload extractors, the beam angles before rounding
+        payload_values = recorded['payload_values']
+        assert list(payload_values) == [
+            'center_freq', 'min_freq', 'max_freq', 'beamswitching_horiz_angle', 'beamswitching_vert_angle'
+        ]
+        assert [payload_values['center_freq'], payload_values['min_freq']] == [3500, 3400]
+        assert round(payload_values['beamswitching_horiz_angle'], 1) == pattern['beamswitching_horiz_angle']
+
+
+def test_parse_cache_digests(tmp_path, monkeypatch):
+    make_library(str(tmp_path / 'lib'), num_scenarios=1, tilts=(0,), num_beams=3)
+    with ParseCache(str(tmp_path / 'cache.sqlite')) as parse_cache:
+        params = get_params(str(tmp_path / 'lib'), incremental=True, parse_cache=parse_cache)
+        parsed, entries, _ = generate_incremental(params, str(tmp_path / 'out'))
+        assert len(parsed) == len(entries) - 2
+
+        # the parse cache digests of unchanged files on disk: no file is hashed again
+        hashed = []
+        monkeypatch.setattr('hashlib.sha256', lambda data: hashed.append(data) or hashlib.new('sha256', data))
+        parsed, warm_entries, _ = generate_incremental(params, str(tmp_path / 'out'))
+        assert parsed == [] and hashed == []
+        assert warm_entries == entries
@@ -0,0 +1,77 @@
+import struct
+import zipfile
+import zlib
+
+import numpy as np
+import pytest
+
+from common.pafx_reader import PafxReader, parse_gains
+from tests.synthetic_library import build_generator, generate_pafx, get_params, make_library
+
+# pattern fields written to antenna.paf as numbers
+NUMERIC_FIELDS = [
+    'min_freq', 'max_freq', 'center_freq', 'electrical_tilt', 'boresight_gain', 'horiz_beamwidth_deg',
+    'vert_beamwidth_deg', 'horiz_boresight_deg', 'vert_boresight_deg', 'front_to_back_ratio_db',
+]
+
+
+@pytest.mark.parametrize('params', [{}, {'pafx_compress_level': 6}, {'dedup_pap_files': True}])
+def test_round_trip(tmp_path, params):
+    make_library(str(tmp_path / 'lib'), num_beams=3)
+    generator = build_generator(get_params(str(tmp_path / 'lib'), **params))
+    generate_pafx(generator, str(tmp_path / 'out'))
+    model = PafxReader().read(str(tmp_path / 'out' / 'SYN.pafx'))
+
+    assert len(model.patterns['name']) == len(generator.patterns)
+    for pattern in generator.patterns:
+        i = model.pattern_ids[pattern['name']]
+        for field in NUMERIC_FIELDS:
+            assert model.patterns[field][i] == pattern[field], field
+        assert model.patterns['boresight_gain_unit'][i] == pattern['boresight_gain_unit']
+        if not params.get('dedup_pap_files'):
+            assert model.patterns['entry_name'][i] == pattern['output_file_basename']
+
+        pap_data = model.get_pap_data(i)
+        for cut in ['horiz_pap_pattern', 'vert_pap_pattern']:
+            expected = pattern[cut]
+            assert getattr(pap_data, cut).gains.tolist() == expected.gains.tolist()
+            for field in ['start_angle', 'end_angle', 'step']:
+                assert getattr(getattr(pap_data, cut), field) == getattr(expected, field)
+
+    # every assigned pattern is found, beams with their angles
+    assert (model.assignments['pattern_id'] >= 0).all()
+    beams = ~np.isnan(model.assignments['beam_id'])
+    assert beams.sum() == sum(1 for pattern in generator.patterns if 'RefBeam' in pattern['name'])
+    assert not np.isnan(model.assignments['horiz_angle'][beams]).any()
+
+
+@pytest.mark.parametrize('compress_level', [None, 6])
+def test_bad_crc(tmp_path, compress_level):
+    make_library(str(tmp_path / 'lib'), num_scenarios=1, tilts=(0,), num_beams=1)
+    generator = build_generator(get_params(str(tmp_path / 'lib'), pafx_compress_level=compress_level))
+    entries = generate_pafx(generator, str(tmp_path / 'out'))
+    path = str(tmp_path / 'out' / 'SYN.pafx')
+
+    # CRC-32 of a .pap entry changed, in its local and central directory headers
+    pap_name = next(name for name in entries if name.endswith('.pap'))
+    with zipfile.ZipFile(path) as zip_file:
+        crc = struct.pack('<L', zip_file.getinfo(pap_name).CRC)
+    with open(path, 'rb') as file:
+        content = file.read()
+    assert content.count(crc) == 2
+    with open(path, 'wb') as file:
+        file.write(content.replace(crc, struct.pack('<L', zlib.crc32(crc))))
+
+    with pytest.raises(zipfile.BadZipFile):
+        PafxReader().read(path)
+
+
+def test_parse_gains():
+    gains, num_gains = parse_gains([b'-1.5;0;2', b'3', b'-0.0;1e-3'])
+    assert num_gains.tolist() == [3, 1, 2]
+    assert gains.shape == (3, 3)
+    assert gains[0].tolist() == [-1.5, 0.0, 2.0]
+    assert gains[2, :2].tolist() == [-0.0, 0.001]
+    assert np.isnan(gains[1, 1:]).all() and np.isnan(gains[2, 2])
+    with pytest.raises(ValueError):
+        parse_gains([b'1;x'])
@@ -0,0 +1,98 @@
+import hashlib
+import os
+
+import pytest
+
+from common.msi_parser import MsiParser
+from common.parse_cache import ParseCache
+from tests.synthetic_library import CountingParser, build_generator, generate_pafx, get_params, make_library, \
+    write_msi
+
+
+def build_counting_generator(params: dict):
+    """
+    Generator whose parser counts the parsed files: the patterns are processed again with it
+    """
+    generator = build_generator(params | {'header_scan': True})
+    generator.parser = CountingParser()
+    generator.process_patterns()
+    return generator
+
+
+def test_warm_run_skips_parsing(tmp_path):
+    paths = make_library(str(tmp_path / 'lib'), num_beams=3)
+    with ParseCache(str(tmp_path / 'cache.sqlite')) as parse_cache:
+        params = get_params(str(tmp_path / 'lib'), parse_cache=parse_cache)
+        cold = build_counting_generator(params)
+        assert len(cold.parser.parsed) == len(paths)
+
+        warm = build_counting_generator(params)
+        assert warm.parser.parsed == []
+        assert generate_pafx(warm, str(tmp_path / 'warm')) == generate_pafx(cold, str(tmp_path / 'cold'))
+
+        # a changed file is parsed again, under the digest of its new content
+        write_msi(paths[0], 'changed', [0.0] * 360, [0.0] * 360)
+        changed = build_counting_generator(params)
+        assert changed.parser.parsed == [os.path.basename(paths[0])]
+        i = [pattern['src_file_basename'] for pattern in cold.patterns].index(os.path.basename(paths[0]))
+        assert changed.patterns[i]['horiz_beamwidth_deg'] != cold.patterns[i]['horiz_beamwidth_deg']
+        assert build_counting_generator(params).parser.parsed == []
+
+
+def test_unchanged_files_are_not_hashed(tmp_path, monkeypatch):
+    paths = make_library(str(tmp_path / 'lib'), num_scenarios=1, tilts=(0,), num_beams=3)
+    with ParseCache(str(tmp_path / 'cache.sqlite')) as parse_cache:
+        digests = [parse_cache.get_digest(path) for path in paths]
+        with open(paths[0], 'rb') as file:
+            assert digests[0] == hashlib.sha256(file.read()).hexdigest()
+
+        hashed = []
+        monkeypatch.setattr(
+            'common.parse_cache.hashlib.sha256', lambda data: hashed.append(data) or hashlib.new('sha256', data)
+        )
+        assert [parse_cache.get_digest(path) for path in paths] == digests
+        assert hashed == []
+
+        # new mtime and size: hashed again
+        with open(paths[1], 'ab') as file:
+            file.write(b'\n')
+        assert parse_cache.get_digest(paths[1]) != digests[1]
+        assert len(hashed) == 1
+
+        # contents read elsewhere (archive members) are hashed as given
+        assert parse_cache.get_digest('member.msi', b'content') == hashlib.new('sha256', b'content').hexdigest()
+
+
+def test_eviction(tmp_path):
+    make_library(str(tmp_path / 'lib'), num_scenarios=1, num_beams=8)
+    generator = build_generator(get_params(str(tmp_path / 'lib')))
+    db_path = str(tmp_path / 'cache.sqlite')
+
+    with ParseCache(db_path) as parse_cache:
+        payload = generator.parser.parse(os.path.join(generator.params['src_folder'], generator.src_files[0]))
+        parse_cache.put('a', payload)
+        parse_cache.commit()
+        entry_size = parse_cache.db.execute('SELECT size FROM entries').fetchone()[0]
+
+    # room for two entries: the least recently used ones are evicted
+    with ParseCache(db_path, max_size_mb=2.5 * entry_size / 1024 / 1024) as parse_cache:
+        parse_cache.put('b', payload)
+        parse_cache.put('c', payload)
+        parse_cache.get('x.msi', 'a')
+        parse_cache.commit()
+        assert parse_cache.has('a') and parse_cache.has('c') and not parse_cache.has('b')
+
+
+@pytest.mark.parametrize('field', ['header', 'horiz_beamwidth_deg', 'front_to_back_ratio_db', 'boresight_gain_unit'])
+def test_round_trip(tmp_path, field):
+    src_file = make_library(str(tmp_path / 'lib'), num_scenarios=1, tilts=(0,), num_beams=2)[-1]
+    payload = MsiParser().parse(src_file)
+    with ParseCache(str(tmp_path / 'cache.sqlite')) as parse_cache:
+        digest = parse_cache.get_digest(src_file)
+        parse_cache.put(digest, payload)
+        cached = parse_cache.get(src_file, digest)
+    assert getattr(cached, field) == getattr(payload, field)
+    assert cached.src_file == src_file
+    for cut in ['horiz_pap_pattern', 'vert_pap_pattern']:
+        assert getattr(cached, cut).gains.tolist() == getattr(payload, cut).gains.tolist()
+        assert getattr(cached, cut).step == getattr(payload, cut).step
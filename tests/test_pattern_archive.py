@@ -0,0 +1,94 @@
+import contextlib
+import io
+import os
+import zipfile
+
+import pytest
+
+from common.beamforming_antenna_generator import BeamformingAntennaGenerator
+from common.pattern_archive import NESTED_ARCHIVE_MAX_MEMORY_SIZE, PatternArchive
+from tests.synthetic_library import get_params, make_library
+
+
+def write_nested_archive(lib_folder: str, path: str, nested_compression: int):
+    """
+    Zips the library, each scenario folder as a .zip archive nested in the main one
+    """
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for scenario in sorted(os.listdir(lib_folder)):
+            nested = io.BytesIO()
+            with zipfile.ZipFile(nested, 'w', zipfile.ZIP_DEFLATED) as nested_zip_file:
+                scenario_folder = os.path.join(lib_folder, scenario)
+                for folder, _, files in os.walk(scenario_folder):
+                    for file in sorted(files):
+                        file_path = os.path.join(folder, file)
+                        nested_zip_file.write(file_path, os.path.relpath(file_path, scenario_folder).replace(os.sep, '/'))
+            zip_file.writestr(scenario + '.zip', nested.getvalue(), nested_compression)
+
+
+@pytest.mark.parametrize('nested_compression', [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+@pytest.mark.parametrize('max_memory_size', [NESTED_ARCHIVE_MAX_MEMORY_SIZE, 1024])
+def test_nested_archive(tmp_path, monkeypatch, nested_compression, max_memory_size):
+    # a small limit extracts the nested archives into temporary files
+    monkeypatch.setattr('common.pattern_archive.NESTED_ARCHIVE_MAX_MEMORY_SIZE', max_memory_size)
+    lib_folder = str(tmp_path / 'lib')
+    paths = make_library(lib_folder, num_beams=3)
+    archive_path = str(tmp_path / 'lib.zip')
+    write_nested_archive(lib_folder, archive_path, nested_compression)
+
+    # member path (scenario.zip/tilt/file) --> file on disk
+    src_files = {}
+    for path in paths:
+        scenario, member_path = os.path.relpath(path, lib_folder).split(os.sep, 1)
+        src_files[os.path.join(scenario + '.zip', member_path)] = path
+
+    with PatternArchive(archive_path) as archive:
+        assert sorted(archive.list_files()) == sorted(src_files)
+        # backwards too, to seek back inside the nested archives
+        for member_path in reversed(archive.list_files()):
+            with open(src_files[member_path], 'rb') as file:
+                assert archive.read(member_path) == file.read()
+        # each nested archive was extracted once
+        assert sorted(chain for chain in archive.buffers) == sorted(
+            (scenario + '.zip',) for scenario in os.listdir(lib_folder)
+        )
+        assert all(buffer._rolled == (max_memory_size == 1024) for buffer in archive.buffers.values())
+    assert archive.zip_files == {}
+
+    # reopened on demand after close()
+    member_path = archive.list_files()[0]
+    assert len(archive.read(member_path)) == archive.get_entry(member_path).size
+    archive.close()
+    assert archive.zip_files == {} and archive.buffers == {}
+
+
+def test_generator_closes_archive(tmp_path):
+    lib_folder = str(tmp_path / 'lib')
+    make_library(lib_folder, num_beams=3)
+    archive_path = str(tmp_path / 'lib.zip')
+    write_nested_archive(lib_folder, archive_path, zipfile.ZIP_DEFLATED)
+
+    output_dirs = []
+    for src_folder, params in [(lib_folder, {}), (archive_path, {}), (archive_path, {'streaming': True})]:
+        output_dir = str(tmp_path / 'output{}'.format(len(output_dirs)))
+        os.makedirs(output_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generator = BeamformingAntennaGenerator(get_params(src_folder, **params))
+            if generator.archive is not None:
+                assert generator.archive.zip_files == {}
+            generator.generate(output_dir)
+        if generator.archive is not None:
+            assert generator.archive.zip_files == {}
+        output_dirs.append(output_dir)
+
+    # the archive is released: it can be replaced right away
+    os.replace(archive_path, archive_path + '.old')
+
+    # same .pap entries from the folder and from the archive
+    pap_entries = []
+    for output_dir in output_dirs:
+        with zipfile.ZipFile(os.path.join(output_dir, 'SYN.pafx')) as zip_file:
+            pap_entries.append({name: zip_file.read(name) for name in zip_file.namelist() if name.endswith('.pap')})
+    assert len(pap_entries[0]) > 0
+    assert pap_entries[1] == pap_entries[0]
+    assert pap_entries[2] == pap_entries[0]
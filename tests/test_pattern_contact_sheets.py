@@ -0,0 +1,51 @@
+import contextlib
+import io
+
+from common.beamforming_antenna_generator import BeamformingAntennaGenerator
+from common.pattern_contact_sheets import get_group_key, render_generator_contact_sheets, render_groups
+from tests.synthetic_library import get_params, make_library
+
+
+def render(tmp_path, lib_folder: str, name: str, **params) -> dict[str, bytes]:
+    output_dir = tmp_path / name
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = BeamformingAntennaGenerator(get_params(lib_folder, **params))
+        paths = render_generator_contact_sheets(generator, str(output_dir), file_format='png', dpi=20, num_workers=1)
+    return {path.replace(str(output_dir), ''): open(path, 'rb').read() for path in paths}
+
+
+def test_streaming_matches_in_memory(tmp_path):
+    lib_folder = str(tmp_path / 'lib')
+    make_library(lib_folder, num_beams=3)
+
+    in_memory = render(tmp_path, lib_folder, 'in_memory')
+    streaming = render(tmp_path, lib_folder, 'streaming', streaming=True)
+    assert len(in_memory) > 1
+    assert list(streaming) == list(in_memory)
+    assert streaming == in_memory
+
+
+def test_render_groups_takes_groups_lazily(tmp_path):
+    lib_folder = str(tmp_path / 'lib')
+    make_library(lib_folder, num_scenarios=3, tilts=(0,), num_beams=2)
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = BeamformingAntennaGenerator(get_params(lib_folder))
+
+    group_patterns = {}
+    for pattern in generator.patterns:
+        group_patterns.setdefault(get_group_key(pattern), []).append(pattern)
+
+    taken = []
+
+    def iter_groups():
+        for group_key, patterns in group_patterns.items():
+            # at most two groups pending per worker
+            assert len(taken) - len(list((tmp_path / 'sheets').glob('*.png'))) <= 2
+            taken.append(group_key)
+            yield group_key, [
+                (p['name'], p['horiz_pap_pattern'], p['vert_pap_pattern']) for p in patterns
+            ]
+
+    paths = render_groups(iter_groups(), str(tmp_path / 'sheets'), file_format='png', dpi=20, num_workers=1)
+    assert taken == list(group_patterns)
+    assert len(paths) == len(group_patterns)
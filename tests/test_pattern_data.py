@@ -0,0 +1,41 @@
+import json
+
+import numpy as np
+
+from common.pattern_data import PapPatternData
+
+
+def get_pap_pattern(gains: np.ndarray | str) -> PapPatternData:
+    pattern = PapPatternData()
+    pattern.inclination = 0
+    pattern.orientation = 0
+    pattern.start_angle = -180
+    pattern.end_angle = 179
+    pattern.step = 1
+    pattern.gains = gains
+    return pattern
+
+
+def test_gains_text_round_trip():
+    text = ';'.join(['-0.0', '-12.5', '-3.14159', '-40.0'] + ['-20.25'] * 356)
+    pattern = get_pap_pattern(text)
+    assert pattern.gains.dtype == np.float64
+    assert pattern.gains[:4].tolist() == [-0.0, -12.5, -3.14159, -40.0]
+    assert pattern.serialize_gains() == text
+    assert json.loads(pattern.to_json())['gains'] == text
+
+    assert PapPatternData().serialize_gains() is None
+
+
+def test_boresight_memo():
+    gains = np.full(360, -30.0)
+    gains[170:191] = 0.0
+    pattern = get_pap_pattern(gains)
+    boresight_deg = pattern.get_boresight_deg()
+    assert boresight_deg == 0
+    assert pattern.get_boresight_deg() == boresight_deg
+    assert pattern.get_boresight_deg(-40.0) != boresight_deg
+
+    # replacing the gains drops the memo
+    pattern.gains = np.roll(gains, 10)
+    assert pattern.get_boresight_deg() == 10
@@ -0,0 +1,52 @@
+from common.pattern_extraction_plan import PatternExtractionPlan
+from common.pattern_name_param_extractor import PatternNameParamExtractor
+
+SRC_FILE = '65deg-H1V1/p0/AQQN-3500-p0-ap00-65deg-H1V1-RefBeam3.msi'
+
+
+def get_replace(old: str, new: str, calls: list):
+    def replace(name: str) -> str:
+        calls.append(old)
+        return name.replace(old, new)
+    return replace
+
+
+def test_closures_are_not_shared():
+    # same code, different closure cells: each one runs, with its own result
+    calls = []
+    plan = PatternExtractionPlan({
+        'a': PatternNameParamExtractor(
+            path_part='basename', extract_re=r'(?P<cg>.*)\.msi', pre_capture_proc=get_replace('AQQN', 'X', calls)
+        ),
+        'b': PatternNameParamExtractor(
+            path_part='basename', extract_re=r'(?P<cg>.*)\.msi', pre_capture_proc=get_replace('RefBeam', 'Y', calls)
+        ),
+    })
+    values = plan.extract(SRC_FILE, None)
+    assert values == {
+        'a': 'X-3500-p0-ap00-65deg-H1V1-RefBeam3',
+        'b': 'AQQN-3500-p0-ap00-65deg-H1V1-Y3',
+    }
+    assert calls == ['AQQN', 'RefBeam']
+
+
+def test_same_function_is_shared():
+    calls = []
+    lower = get_replace('', '', calls)
+    plan = PatternExtractionPlan({
+        'scenario': PatternNameParamExtractor(
+            path_part='basename', extract_re=r'.*-(?P<cg>\d+deg-H\d)V.*', pre_capture_proc=lower
+        ),
+        'beam': PatternNameParamExtractor(
+            path_part='basename', extract_re=r'.*RefBeam(?P<cg>\d+).*', pre_capture_proc=lower,
+            post_capture_proc=int,
+        ),
+        'tilt': PatternNameParamExtractor(path_part='dirname', extract_re=r'.*/(?P<cg>p\d+)$', pre_capture_proc=lower),
+        'name': PatternNameParamExtractor(path_part='basename', extract_re=r'(?P<cg>.+)\..{3}$'),
+    })
+    values = plan.extract(SRC_FILE, None)
+    assert values == {'scenario': '65deg-H1', 'beam': 3, 'tilt': 'p0', 'name': 'AQQN-3500-p0-ap00-65deg-H1V1-RefBeam3'}
+    # once per path part
+    assert len(calls) == 2
+    # as extracted one by one
+    assert {name: extractor.extract(SRC_FILE) for name, extractor in plan.extractors.items()} == values
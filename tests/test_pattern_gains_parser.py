@@ -0,0 +1,227 @@
+"""
+PatternGainsParser.extract_lobes against the former per-sample loop. Run as a script for the timing comparison:
+
+    python -m tests.test_pattern_gains_parser
+"""
+import time
+from math import sin, cos, pi
+
+import numpy as np
+import pytest
+
+from common.pattern_gains_parser import (
+    BEAMWIDTH_GAIN_FALL_THRES_DB,
+    LOBE_GAIN_FALL_THRES_DB,
+    MAX_GAIN_TOLERANCE_THRES_DB,
+    PatternGainsParser,
+    min_beamwidth,
+)
+
+
+class LoopPatternGainsParser(PatternGainsParser):
+    """
+    Reference: extract_lobes as it was before it was vectorized, walking the cut
+    sample by sample from every max gain to find the lobe and beamwidth edges
+    """
+
+    def extract_lobes(self):
+        angles = self.angles
+        gains = self.gains
+        step = 360 / len(angles)
+
+        # Obtain the global max gain [dB]
+        global_max_gain_db = gains[0]
+
+        for i in range(0, len(gains)):
+            if gains[i] > global_max_gain_db:
+                global_max_gain_db = gains[i]
+
+        # Obtain all gains greater than the global max minus a tolerance threshold
+        thres_gain_db = global_max_gain_db - MAX_GAIN_TOLERANCE_THRES_DB
+
+        max_gains = []
+
+        for i, angle in enumerate(angles):
+            gain = gains[i]
+            if gain >= thres_gain_db:
+                max_gains.append({
+                    'index': i,
+                    'angle': angle,
+                    'gain_db': gain,
+                })
+
+        # Obtain distinct pattern lobes
+        lobe_edge_gain_db = global_max_gain_db - LOBE_GAIN_FALL_THRES_DB
+        bw_edge_gain_db = global_max_gain_db - BEAMWIDTH_GAIN_FALL_THRES_DB
+
+        lobes = {}
+
+        for max_gain in max_gains:
+            # Max gain index
+            i_max = max_gain['index']
+
+            i_lobe_start = i_max
+            i_lobe_end = i_max
+
+            i_bw_start = i_max
+            i_bw_end = i_max
+
+            num_gains = len(gains)
+
+            # Lobe start (i_lobe_start)
+            for k in range(1, num_gains):
+                i = (i_max - k) % num_gains
+                if gains[i] < lobe_edge_gain_db:
+                    i_lobe_start = i
+                    break
+
+            # Lobe end (i_lobe_end)
+            for k in range(1, num_gains):
+                i = (i_max + k) % num_gains
+                if gains[i] < lobe_edge_gain_db:
+                    i_lobe_end = i
+                    break
+
+            # Beamwidth start (i_bw_start)
+            for k in range(1, num_gains):
+                i = (i_max - k) % num_gains
+                if gains[i] <= bw_edge_gain_db:
+                    i_bw_start = i
+                    break
+
+            # Beamwidth end (i_bw_end)
+            for k in range(1, num_gains):
+                i = (i_max + k) % num_gains
+                if gains[i] <= bw_edge_gain_db:
+                    i_bw_end = i
+                    break
+
+            ang_lobe_start = (step * i_lobe_start) % 360
+            ang_lobe_end = (step * i_lobe_end) % 360
+            lobe_width = min_beamwidth(ang_lobe_start, ang_lobe_end)
+            lobe_center = (ang_lobe_start + lobe_width / 2) % 360
+
+            ang_bw_start = (step * i_bw_start) % 360
+            ang_bw_end = (step * i_bw_end) % 360
+            beamwidth = min_beamwidth(ang_bw_start, ang_bw_end)
+
+            lobes[str(i_lobe_start) + ',' + str(i_lobe_end)] = {
+                'lobe_start_deg': ang_lobe_start,
+                'lobe_end_deg': ang_lobe_end,
+                'lobe_width_deg': lobe_width,
+                'center_ang_deg': lobe_center,
+                'center_versor': {
+                    'x': cos(lobe_center * pi / 180),
+                    'y': sin(lobe_center * pi / 180),
+                },
+                'beamwidth_start_deg': ang_bw_start,
+                'beamwidth_end_deg': ang_bw_end,
+                'beamwidth_deg': beamwidth,
+            }
+
+        self.lobes = {
+            'global_max_gain_db': global_max_gain_db,
+            'lobes': lobes,
+        }
+
+
+def get_random_losses(rng: np.random.Generator) -> np.ndarray:
+    """
+    Random cut losses [dB]: one to four lobes of random width over a noisy floor, rounded like the .msi files
+    """
+    num_samples = int(rng.choice([72, 180, 360, 720]))
+    i = np.arange(num_samples)
+    losses = np.full(num_samples, 40.0)
+    for _ in range(rng.integers(1, 5)):
+        center = rng.integers(num_samples)
+        width = rng.uniform(2, 60) * num_samples / 360
+        d = np.minimum((i - center) % num_samples, (center - i) % num_samples)
+        losses = np.minimum(losses, 12 * (d / width) ** 2 + rng.uniform(0, 1.5, num_samples))
+    return np.round(np.minimum(losses, 40), 2)
+
+
+def get_edge_case_losses() -> list[np.ndarray]:
+    losses = [
+        np.zeros(360),  # flat: no lobe nor beamwidth edge
+        np.full(72, 0.5),
+        np.where(np.arange(360) == 90, 0.0, 1.0),  # every sample within the max tolerance
+        np.where(np.arange(360) == 0, 0.0, 10.0),  # single sample lobe at the start
+        np.where(np.arange(360) == 359, 0.0, 10.0),  # single sample lobe at the end
+        np.where(np.arange(360) < 10, 0.0, 2.5),  # never falls to the beamwidth edge
+        np.where(np.arange(360) % 2 == 0, 0.0, 2.0),  # alternating samples at the exact lobe edge
+        np.where(np.arange(360) % 2 == 0, 0.0, 3.0),  # alternating samples at the exact beamwidth edge
+        np.where((np.arange(360) < 5) | (np.arange(360) > 354), 0.0, 20.0),  # lobe wrapping around 0°
+        np.where(np.arange(360) % 90 == 0, 0.0, 20.0),  # four lobes, omnidirectional
+        np.where(np.arange(360) < 180, 0.0, 20.0),  # half plane
+    ]
+    # plateaus at the exact thresholds
+    rng = np.random.default_rng(7)
+    for _ in range(20):
+        losses.append(rng.choice([0.0, 0.5, 1.0, 2.0, 2.5, 3.0, 10.0], size=int(rng.choice([72, 360]))))
+    return losses
+
+
+def get_analysis(cls, losses: np.ndarray):
+    angle_loss_array = np.column_stack((np.arange(len(losses)) * 360 / len(losses), losses))
+    try:
+        parser = cls(angle_loss_array=angle_loss_array)
+    except Exception as e:
+        # e.g. a boresight between samples: both implementations must fail alike
+        return type(e).__name__
+    return list(parser.lobes['lobes'].items()), parser.lobes['global_max_gain_db'], parser.pattern_params
+
+
+def assert_same_analysis(losses: np.ndarray):
+    assert get_analysis(PatternGainsParser, losses) == get_analysis(LoopPatternGainsParser, losses)
+
+
+@pytest.mark.parametrize('losses', get_edge_case_losses())
+def test_edge_cases(losses):
+    assert_same_analysis(losses)
+
+
+def test_random_cuts():
+    rng = np.random.default_rng(0)
+    for _ in range(2000):
+        assert_same_analysis(get_random_losses(rng))
+
+
+def test_find_enclosing_crossings():
+    i_crossings = np.array([2, 10, 20])
+    i_starts, i_ends = PatternGainsParser.find_enclosing_crossings(np.array([5, 15, 25, 1]), i_crossings)
+    # the samples before the first crossing and after the last one wrap around
+    assert i_starts.tolist() == [2, 10, 20, 20]
+    assert i_ends.tolist() == [10, 20, 2, 2]
+
+    i_starts, i_ends = PatternGainsParser.find_enclosing_crossings(np.array([5, 15]), np.array([], dtype=np.int64))
+    assert i_starts.tolist() == [5, 15] and i_ends.tolist() == [5, 15]
+
+
+def test_one_entry_per_lobe():
+    # two lobes of 5 max gain samples each, one of them wrapping around 0°
+    losses = np.full(360, 20.0)
+    losses[[358, 359, 0, 1, 2]] = 0.0
+    losses[[88, 89, 90, 91, 92]] = 0.5
+    lobes = get_analysis(PatternGainsParser, losses)[0]
+    assert [key for key, lobe in lobes] == ['357,3', '87,93']
+    assert [lobe['beamwidth_deg'] for key, lobe in lobes] == [6, 6]
+    assert [lobe['center_ang_deg'] for key, lobe in lobes] == [0, 90]
+
+
+def benchmark(num_cuts: int = 2000):
+    rng = np.random.default_rng(0)
+    cuts = [get_random_losses(rng) for _ in range(num_cuts)]
+    for name, cls in [('per-sample loop', LoopPatternGainsParser), ('vectorized', PatternGainsParser)]:
+        parser = cls.__new__(cls)
+        start_time = time.perf_counter()
+        for losses in cuts:
+            parser.gains_array = -losses
+            parser.gains = parser.gains_array.tolist()
+            parser.angles = (np.arange(len(losses)) * 360 / len(losses)).tolist()
+            parser.extract_lobes()
+        seconds = (time.perf_counter() - start_time) / num_cuts
+        print('{:<16} {:>6.0f} us/cut (extract_lobes, {} cuts)'.format(name, seconds * 1e6, num_cuts))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,41 @@
+from common.pattern_name_param_selector import PatternNameParamSelector
+
+VALUES = ['65deg-H1V1', '80deg-H2V1', '105deg-H4V1']
+
+
+def test_select():
+    selector = PatternNameParamSelector(select_re=lambda n: r'\d{2}deg' if 'Element' in n else None)
+    selector.set_values(VALUES)
+    assert selector.select('AQQN-Element.msi') == ['65deg-H1V1', '80deg-H2V1']
+    assert selector.select('AQQN-RefBeam1.msi') == []
+
+    # the values passed in the call replace the ones set before
+    assert selector.select('AQQN-Element.msi', ['90deg-H1V1', '120deg']) == ['90deg-H1V1']
+    assert selector.select('AQQN-Element.msi') == ['90deg-H1V1']
+
+
+def test_values_are_pre_processed_once():
+    processed = []
+    selector = PatternNameParamSelector(
+        select_re=lambda n: n,
+        pre_capture_proc=lambda v: processed.append(v) or v.lower(),
+    )
+    selector.set_values(VALUES + ['BAD'])
+    assert [selector.select(name) for name in ['.*h1', '.*h[24]', '.*h1', 'bad']] == [
+        ['65deg-h1v1'], ['80deg-h2v1', '105deg-h4v1'], ['65deg-h1v1'], ['bad']
+    ]
+    assert processed == VALUES + ['BAD']
+
+
+def test_selections_are_copies():
+    selector = PatternNameParamSelector(select_re=lambda n: '.*')
+    selector.set_values(VALUES)
+    selector.select('a').append('other')
+    assert selector.select('b') == VALUES
+
+
+def test_pre_processing_error(capsys):
+    selector = PatternNameParamSelector(select_re=lambda n: '.*', pre_capture_proc=lambda v: v.split('-')[1])
+    selector.set_values(['65deg-H1V1', 'none'])
+    assert selector.select('a') == ['H1V1']
+    assert '[ERROR] Error pre-processing parameter value: none' in capsys.readouterr().out
@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pytest
+
+from common.pattern_table import PATTERN_TAGS, PatternTable, to_column
+from tests.synthetic_library import build_generator, get_params, make_library
+
+
+@pytest.fixture(scope='module')
+def patterns(tmp_path_factory) -> list[dict]:
+    lib_folder = str(tmp_path_factory.mktemp('lib'))
+    make_library(lib_folder, num_beams=3)
+    return build_generator(get_params(lib_folder)).patterns
+
+
+def get_tag_values(pattern: dict, tag: str) -> list:
+    """
+    Values of a tag of a pattern, walking the pattern dict
+    """
+    if tag == 'scenario':
+        return [value for value in [pattern['scenario']] + pattern['selected_scenarios'] if value is not None]
+    if tag == 'v_port_name':
+        return [value for value in [pattern['v_port_name']] + pattern['selected_v_port_names'] if value is not None]
+    if tag == 'freq_band':
+        return [str(pattern['min_freq']) + '-' + str(pattern['max_freq'])]
+    return [pattern[tag]]
+
+
+@pytest.mark.parametrize('tag', PATTERN_TAGS)
+def test_counts_and_src_files(patterns, tag):
+    table = PatternTable(patterns)
+    src_files = {}
+    for pattern in patterns:
+        for value in get_tag_values(pattern, tag):
+            src_files.setdefault(value, []).append(pattern['src_file'])
+
+    assert table.get_counts(tag) == {value: len(files) for value, files in src_files.items()}
+    assert table.get_src_files(tag, full_path=True) == src_files
+    assert table.get_src_files(tag) == {
+        value: [os.path.basename(src_file) for src_file in files] for value, files in src_files.items()
+    }
+
+
+def test_selected_values(patterns):
+    table = PatternTable(patterns)
+    # the element patterns are selected for every scenario: listed under each one
+    scenarios = table.tag_values['scenario']
+    assert len(scenarios) == 2
+    element_ids = [i for i, pattern in enumerate(patterns) if 'Element' in pattern['src_file']]
+    for scenario in scenarios:
+        ids = table.get_pattern_ids('scenario', scenario).tolist()
+        assert ids == sorted(ids)
+        assert set(element_ids) <= set(ids)
+    assert table.get_pattern_ids('scenario', 'missing').tolist() == []
+
+
+def test_filter(patterns):
+    table = PatternTable(patterns)
+    scenario = table.tag_values['scenario'][0]
+    queries = [
+        {},
+        {'scenario': scenario},
+        {'scenario': scenario, 'electrical_tilt': [-2, 6]},
+        {'pattern_type': table.tag_values['pattern_type'][:2], 'electrical_tilt': 0},
+        {'electrical_tilt': 99},
+    ]
+    for query in queries:
+        expected = [
+            i for i, pattern in enumerate(patterns)
+            if all(
+                set(get_tag_values(pattern, tag)) & set(values if isinstance(values, list) else [values])
+                for tag, values in query.items()
+            )
+        ]
+        assert table.filter(**query).tolist() == expected, query
+
+
+def test_to_column():
+    assert to_column([1, 2.5, np.float64(3)]).dtype == np.float64
+    assert to_column([1, 2]).dtype.kind == 'i'
+    column = to_column(['a', None, 3])
+    assert column.dtype == object and column.tolist() == ['a', None, 3]
+    # lists are kept as values, not as a second dimension
+    assert to_column([[1, 2], [3]]).shape == (2,)
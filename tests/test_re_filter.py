@@ -0,0 +1,79 @@
+import os
+import re
+
+import pytest
+
+from common.re_filter import ReFilter, compile_alternation
+from common.src_file_scanner import SrcFileScanner
+
+PATHS = [
+    'AQQN-3500-p0-ap00-65deg-H1V1-Envelope.msi',
+    'AQQN-3500-p0-ap00-65deg-H1V1-RefBeam1.msi',
+    'AQQN-3500-p0-ap00-65deg-H1V1-RefBeam1.pdf',
+    os.path.join('TypeApproval', 'AQQN-3500-p0-ap00-65deg-H1V1-Envelope.msi'),
+    'AQQN-3500-p0-ap00-65deg-H1V1-Element.msi',
+]
+
+
+def eval_each(allow: list[str], deny: list[str], value: str) -> bool:
+    """
+    Filter result with the regexes matched one by one
+    """
+    return (
+        not any(re.match(regex, value) for regex in deny)
+        and any(re.match(regex, value) for regex in allow)
+    )
+
+
+@pytest.mark.parametrize('allow, deny', [
+    ([r'.*(Envelope|RefBeam).*\.msi$'], []),
+    ([r'.*Envelope.*', r'.*RefBeam\d\.msi$'], [r'.*TypeApproval.*']),
+    # group numbering: a backreference can't be merged into an alternation
+    ([r'(AQQN)-.*\1?.*\.msi$', r'.*Element.*'], [r'(?i).*typeapproval.*']),
+    ([], [r'.*']),
+])
+def test_eval_matches_each_regex(allow, deny):
+    re_filter = ReFilter(allow=allow, deny=deny)
+    for path in PATHS:
+        assert re_filter.eval(path) == eval_each(allow, deny, path), path
+    assert re_filter.apply(PATHS) == [path for path in PATHS if eval_each(allow, deny, path)]
+
+
+def test_compile_alternation():
+    assert compile_alternation([]) == []
+    assert len(compile_alternation([r'a.*', r'b.*'])) == 1
+    # unmergeable regexes are compiled one by one
+    assert len(compile_alternation([r'(a)\1', r'b.*'])) == 2
+    assert len(compile_alternation([r'(?i)a', r'b.*'])) == 2
+
+
+def test_is_dir_denied():
+    re_filter = ReFilter(allow=[r'.*'], deny=[r'.*TypeApproval.*', r'.*\.pdf$', r'Old\b.*'])
+    assert re_filter.is_dir_denied('TypeApproval')
+    assert re_filter.is_dir_denied(os.path.join('65deg', 'TypeApproval2'))
+    assert not re_filter.is_dir_denied('65deg')
+    # end sensitive deny regexes never prune a directory
+    assert not re_filter.is_dir_denied('docs.pdf')
+    assert not re_filter.is_dir_denied('Old')
+
+
+def test_scanner_skips_denied_dirs(tmp_path, monkeypatch):
+    for path in PATHS + [os.path.join('TypeApproval', 'sub', 'x.msi'), os.path.join('65deg', 'y.msi')]:
+        os.makedirs(os.path.dirname(tmp_path / path), exist_ok=True)
+        (tmp_path / path).write_bytes(b'')
+
+    re_filter = ReFilter(allow=[r'.*\.msi$'], deny=[r'.*TypeApproval.*'])
+    evaluated = []
+    monkeypatch.setattr(re_filter, 'eval', lambda value: evaluated.append(value) or ReFilter.eval(re_filter, value))
+    listed = []
+    scan_dir = SrcFileScanner.scan_dir
+    monkeypatch.setattr(
+        SrcFileScanner, 'scan_dir', lambda self, rel_dir: listed.append(rel_dir) or scan_dir(self, rel_dir)
+    )
+
+    entries = SrcFileScanner(str(tmp_path), re_filter, num_workers=2).scan()
+    assert sorted(entry.path for entry in entries) == sorted([
+        PATHS[0], PATHS[1], PATHS[4], os.path.join('65deg', 'y.msi')
+    ])
+    assert sorted(listed) == ['', '65deg']
+    assert not any('TypeApproval' in value for value in evaluated)
@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from common.consts import SRC_FILES_ORDER__WALK
+from common.re_filter import ReFilter
+from common.src_file_scanner import SrcFileScanner
+from tests.synthetic_library import make_library
+
+RE_FILTER = ReFilter(allow=[r'.*\.msi$'], deny=[r'.*RefBeam1.*'])
+
+
+def walk(src_folder: str) -> list[str]:
+    """
+    Relative paths accepted by the filter, in os.walk order
+    """
+    paths = []
+    for root, _, files in os.walk(src_folder):
+        for file in files:
+            path = os.path.relpath(os.path.join(root, file), src_folder)
+            if RE_FILTER.eval(path):
+                paths.append(path)
+    return paths
+
+
+@pytest.fixture(scope='module')
+def src_folder(tmp_path_factory) -> str:
+    src_folder = str(tmp_path_factory.mktemp('lib'))
+    make_library(src_folder, num_scenarios=3, num_beams=4)
+    with open(os.path.join(src_folder, 'readme.txt'), 'w') as file:
+        file.write('not a pattern')
+    return src_folder
+
+
+@pytest.mark.parametrize('num_workers', [1, 4, 16])
+def test_sorted_paths(src_folder, num_workers):
+    entries = SrcFileScanner(src_folder, RE_FILTER, num_workers).scan()
+    assert [entry.path for entry in entries] == sorted(walk(src_folder))
+
+
+@pytest.mark.parametrize('num_workers', [1, 4])
+def test_walk_order(src_folder, num_workers):
+    entries = SrcFileScanner(src_folder, RE_FILTER, num_workers, order=SRC_FILES_ORDER__WALK).scan()
+    assert [entry.path for entry in entries] == walk(src_folder)
+
+
+def test_entries(src_folder):
+    for entry in SrcFileScanner(src_folder, RE_FILTER).scan():
+        stat = os.stat(os.path.join(src_folder, entry.path))
+        assert (entry.size, entry.mtime) == (stat.st_size, stat.st_mtime)
+
+
+def test_missing_folder(tmp_path):
+    assert SrcFileScanner(str(tmp_path / 'missing'), RE_FILTER).scan() == []
+
+
+def test_unsupported_order(src_folder):
+    with pytest.raises(ValueError):
+        SrcFileScanner(src_folder, RE_FILTER, order='mtime')
@@ -0,0 +1,55 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from common.geom import geom
+from common.geom.vector_2d import Vector2d
+from common.geom.versor_array import are_versors_on_same_half_plane, get_angle_range_boundaries
+
+
+def get_random_angles(rng: random.Random) -> list[float]:
+    """
+    Lobe center angles [deg] on a grid, with duplicates and exactly opposite pairs
+    """
+    angles = [rng.choice(range(0, 360, rng.choice([1, 5, 45]))) for _ in range(rng.randint(1, 8))]
+    if rng.random() < 0.3:
+        angles.append(rng.choice(angles))
+    if rng.random() < 0.3:
+        angles.append((rng.choice(angles) + 180) % 360)
+    return angles
+
+
+def to_versors(angles: list[float]) -> tuple[list[Vector2d], np.ndarray]:
+    vectors = [Vector2d(math.cos(a * math.pi / 180), math.sin(a * math.pi / 180)) for a in angles]
+    return vectors, np.array([[v.x, v.y] for v in vectors], dtype=np.float64).reshape(-1, 2)
+
+
+def test_random_versor_sets():
+    rng = random.Random(0)
+    num_same_half_plane = 0
+    for _ in range(5000):
+        vectors, versors = to_versors(get_random_angles(rng))
+        same_half_plane = geom.are_vectors2d_on_same_half_plane(vectors)
+        assert are_versors_on_same_half_plane(versors) == same_half_plane
+        if same_half_plane:
+            num_same_half_plane += 1
+            assert get_angle_range_boundaries(versors) == geom.get_angle_range_boundaries(vectors)
+    assert num_same_half_plane > 1000
+
+
+@pytest.mark.parametrize('angles, expected', [
+    ([30], (0, 0)),
+    ([10, 80], (0, 1)),
+    ([80, 10], (1, 0)),
+    ([350, 10, 0], (0, 1)),  # range across 0°
+    ([0, 0, 60, 60], (0, 2)),  # coincident versors: lowest index
+])
+def test_angle_range_boundaries(angles, expected):
+    assert get_angle_range_boundaries(to_versors(angles)[1]) == expected
+
+
+def test_no_versors():
+    with pytest.raises(ValueError):
+        get_angle_range_boundaries(np.empty((0, 2)))
@@ -0,0 +1,79 @@
+import io
+import xml.etree.ElementTree as ET
+from xml.dom import minidom
+
+from common.xml_stream_writer import XmlStreamWriter
+
+# (tag, attrs, text or children)
+DOCUMENT = ('AntennaModel', {
+    'xmlns:xsd': 'http://www.w3.org/2001/XMLSchema',
+    'xmlns:xsi': 'http://www.w3.org/2001/XMLSchema-instance',
+    'a': 'x & "y" <z>',
+}, [
+    ('Name', {}, 'AQQN <64T64R> & "more"'),
+    ('Comment', {}, None),
+    ('QFactorDB', {'xsi:nil': 'true'}, None),
+    ('Ports', {}, []),
+    ('Patterns', {}, [
+        ('Pattern', {}, [
+            ('Name', {}, 'RefBeam0'),
+            ('Gains', {}, '-0.0;-1.5;-40.0'),
+        ]),
+        ('Pattern', {}, [('Name', {}, 'RefBeam1')]),
+    ]),
+])
+
+
+def write_minidom(document: tuple) -> bytes:
+    """
+    Reference: the ElementTree + minidom pretty print the writer used before
+    """
+    def build(parent, node):
+        tag, attrs, content = node
+        element = ET.Element(tag, attrs) if parent is None else ET.SubElement(parent, tag, attrs)
+        if isinstance(content, list):
+            for child in content:
+                build(element, child)
+        else:
+            element.text = content
+        return element
+
+    return minidom.parseString(ET.tostring(build(None, document))).toprettyxml(indent='  ', encoding='utf-8')
+
+
+def write_stream(document: tuple, indent: str | None = '  ') -> bytes:
+    def write(xml, node):
+        tag, attrs, content = node
+        if isinstance(content, list):
+            xml.start(tag, attrs)
+            for child in content:
+                write(xml, child)
+            xml.end()
+        else:
+            xml.element(tag, content, attrs)
+
+    buffer = io.BytesIO()
+    xml = XmlStreamWriter(buffer, indent)
+    write(xml, document)
+    xml.close()
+    return buffer.getvalue()
+
+
+def test_matches_minidom_pretty_print():
+    assert write_stream(DOCUMENT) == write_minidom(DOCUMENT)
+
+
+def test_single_line():
+    content = write_stream(DOCUMENT, indent=None)
+    assert b'\n' not in content
+    assert ET.canonicalize(content) == ET.canonicalize(write_minidom(DOCUMENT), strip_text=True)
+
+
+def test_close_leaves_stream_open():
+    buffer = io.BytesIO()
+    xml = XmlStreamWriter(buffer)
+    xml.start('A')
+    xml.start('B')
+    xml.close()
+    assert buffer.getvalue() == b'<?xml version="1.0" encoding="utf-8"?>\n<A>\n  <B/>\n</A>\n'
+    buffer.write(b'more')